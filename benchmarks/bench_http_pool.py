@@ -0,0 +1,67 @@
+"""
+Benchmark pooled vs. unpooled model backend throughput.
+
+Runs the stub Ollama server from the test suite locally and measures
+requests per second for the keep-alive connection pool against opening a
+new connection for every request, both sequentially and with concurrent
+inference workers.
+
+Usage:
+    python benchmarks/bench_http_pool.py --requests 2000 --workers 4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+sys.path.insert(0, str(root / "src"))
+sys.path.insert(0, str(root / "tests"))
+
+from muninn.inference import InferenceExecutor, OllamaBackend
+from stub_ollama import StubOllamaServer
+
+
+def bench_sequential(url: str, requests: int, pool_size: int) -> float:
+    """Return requests/sec for sequential generate() calls."""
+    backend = OllamaBackend(url, pool_size=pool_size)
+    start = time.perf_counter()
+    for _ in range(requests):
+        backend.generate("benchmark prompt")
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return requests / elapsed
+
+
+def bench_concurrent(url: str, requests: int, pool_size: int, workers: int) -> float:
+    """Return requests/sec through the batched InferenceExecutor."""
+    backend = OllamaBackend(url, pool_size=pool_size)
+    executor = InferenceExecutor(backend, workers=workers, batch_size=10)
+    start = time.perf_counter()
+    executor.run(["benchmark prompt"] * requests)
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent workers')
+    args = parser.parse_args()
+    
+    with StubOllamaServer() as server:
+        print(f"{'scenario':<24}{'unpooled req/s':>16}{'pooled req/s':>16}{'speedup':>10}")
+        for name, bench in (
+            ('sequential', lambda size: bench_sequential(server.url, args.requests, size)),
+            (f'concurrent x{args.workers}',
+             lambda size: bench_concurrent(server.url, args.requests, size, args.workers)),
+        ):
+            unpooled = bench(0)
+            pooled = bench(args.workers)
+            print(f"{name:<24}{unpooled:>16.0f}{pooled:>16.0f}{pooled / unpooled:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Reproducible benchmarks for the loader, summarizer and report generator.
+
+Synthetic collections (see ``muninn.synthetic``) are generated once per size
+and seed, then every scenario runs in a fresh worker process so peak RSS is
+measured per scenario:
+
+- ``load_json`` / ``load_jsonl``: streaming source iteration
+- ``load_validated``: streaming iteration with schema validation, to keep
+  the validator's overhead over plain parsing in check
+- ``load_table``: columnar ``SourceTable`` loading
+- ``dedup``: exact and near-duplicate removal
+- ``sentiment``: vectorized lexicon sentiment scoring and aggregation
+  (requires numpy)
+- ``summarize``: per-source analysis and hierarchical summary against a
+  stub model with fixed latency (no model server needed)
+- ``report``: streaming Markdown report generation
+- ``pipeline``: the whole asynchronous pipeline (``analyze_data``) against
+  the stub Ollama server with fixed latency; ``stage_seconds`` (the sum of
+  the stage timings) against the wall time shows how much the stages overlap
+
+Results (throughput, latency, wall/CPU time, peak RSS) are written as JSON.
+Passing a previous results file with ``--baseline`` fails the run when
+throughput drops or memory grows by more than ``--tolerance``.
+
+Usage:
+    python benchmarks/bench_pipeline.py --sizes 1000,100000 --output results.json
+    python benchmarks/bench_pipeline.py --sizes 1000,100000 --baseline results.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+root = Path(__file__).parent.parent
+sys.path.insert(0, str(root / "src"))
+sys.path.insert(0, str(root / "tests"))
+
+from muninn import __version__
+from muninn.data_loader import HuginDataLoader, load_huginn_data
+from muninn.dedup import deduplicate_sources
+from muninn.inference import ModelBackend
+from muninn.metrics import peak_rss_bytes
+from muninn.report_generator import ReportGenerator
+from muninn.schema import SchemaValidator
+from muninn.summarizer import IntelligenceSummarizer
+from muninn.synthetic import write_collection
+
+SCENARIOS = ('load_json', 'load_jsonl', 'load_validated', 'load_table', 'dedup', 'sentiment',
+             'embeddings', 'summarize', 'report', 'pipeline')
+
+# Scenarios making one model call per source
+MODEL_SCENARIOS = ('summarize', 'pipeline')
+
+STUB_RESPONSE = json.dumps({"findings": ["Ransomware activity reported"],
+                            "themes": ["ransomware"], "entities": ["LockBit"]})
+
+
+class StubBackend(ModelBackend):
+    """Model backend answering every prompt after a fixed delay."""
+
+    name = 'stub'
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.durations: List[float] = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, timeout=None):
+        start = time.perf_counter()
+        time.sleep(self.latency)
+        with self._lock:
+            self.durations.append(time.perf_counter() - start)
+        return STUB_RESPONSE
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def run_load(path: str, validate: bool = False) -> Dict[str, Any]:
+    validator = SchemaValidator(mode='reject') if validate else None
+    count = sum(1 for _ in HuginDataLoader(path, validator=validator).iter_sources())
+    result: Dict[str, Any] = {'sources': count}
+    if validator is not None:
+        result['invalid'] = validator.invalid
+    return result
+
+
+def run_load_table(path: str) -> Dict[str, Any]:
+    data = load_huginn_data(path, as_table=True)
+    return {'sources': len(data['sources']), 'table_bytes': data['sources'].nbytes()}
+
+
+def run_dedup(path: str) -> Dict[str, Any]:
+    sources = load_huginn_data(path)['sources']
+    start = time.perf_counter()
+    unique = deduplicate_sources(sources)
+    return {'sources': len(sources), 'unique': len(unique),
+            'timed_seconds': time.perf_counter() - start}
+
+
+def run_sentiment(path: str) -> Dict[str, Any]:
+    from muninn.sentiment import analyze_sentiment
+    sources = load_huginn_data(path)['sources']
+    start = time.perf_counter()
+    result = analyze_sentiment(sources)
+    return {'sources': len(sources), 'ambiguous': result['ambiguous'],
+            'timed_seconds': time.perf_counter() - start}
+
+
+def run_embeddings(path: str) -> Dict[str, Any]:
+    from muninn.embeddings import EmbeddingIndex, HashingEmbedder
+    sources = load_huginn_data(path)['sources']
+    embedder = HashingEmbedder()
+    with tempfile.TemporaryDirectory() as directory:
+        index = EmbeddingIndex(directory)
+        start = time.perf_counter()
+        index.add('bench', sources, embedder.embed(sources), embedder.name)
+        indexed = time.perf_counter()
+        queries = index.vectors[:min(100, index.rows)]
+        index.search(queries, k=5)
+        searched = time.perf_counter()
+        index.close()
+    return {'sources': len(sources), 'index_seconds': round(indexed - start, 3),
+            'search_ms': round((searched - indexed) * 1000 / max(len(queries), 1), 3),
+            'timed_seconds': searched - start}
+
+
+def run_summarize(path: str, latency: float, workers: int) -> Dict[str, Any]:
+    sources = load_huginn_data(path)['sources']
+    backend = StubBackend(latency)
+    config = {'model_type': 'stub', 'model': {}, 'analysis': {},
+              'performance': {'enable_cache': False, 'workers': workers, 'batch_size': 10}}
+    summarizer = IntelligenceSummarizer(config, backend=backend)
+    start = time.perf_counter()
+    analysis = summarizer.analyze_sources(sources)
+    summarizer.generate_summary(analysis, sources)
+    elapsed = time.perf_counter() - start
+    stats = summarizer.executor.stats
+    return {
+        'sources': len(sources),
+        'timed_seconds': elapsed,
+        'model_calls': len(backend.durations),
+        'latency_p50_ms': round(_percentile(backend.durations, 0.5) * 1000, 3),
+        'latency_p95_ms': round(_percentile(backend.durations, 0.95) * 1000, 3),
+        'tokens_per_second': round((stats['prompt_tokens'] + stats['completion_tokens'])
+                                   / stats['seconds'], 1) if stats['seconds'] else None,
+    }
+
+
+def run_report(path: str, output_dir: str) -> Dict[str, Any]:
+    loader = HuginDataLoader(path)
+    count = sum(1 for _ in loader.iter_sources())
+    data = {'collection_id': 'benchmark', 'sources': loader.iter_sources()}
+    analysis = {'summary': 'Benchmark summary', 'key_findings': ['Finding'] * 10,
+                'themes': ['Theme'] * 8, 'recommendations': ['Recommendation'] * 5,
+                'total_sources': count}
+    start = time.perf_counter()
+    ReportGenerator().write(data, analysis, str(Path(output_dir) / 'report.md'))
+    return {'sources': count, 'timed_seconds': time.perf_counter() - start}
+
+
+def run_pipeline(path: str, latency: float, workers: int, output_dir: str) -> Dict[str, Any]:
+    from muninn.metrics import PipelineMetrics
+    from muninn.pipeline import AnalysisPipeline
+    from stub_ollama import StubOllamaServer
+    metrics = PipelineMetrics()
+    with StubOllamaServer(delay=latency) as server:
+        config = {'model': {'type': 'ollama', 'name': 'stub', 'api_url': server.url},
+                  'analysis': {'entity_extraction': True},
+                  'performance': {'enable_cache': False, 'checkpoint': False, 'workers': workers,
+                                  'batch_size': 10,
+                                  'entity_index': str(Path(output_dir) / 'entities.sqlite3')}}
+        AnalysisPipeline(config, metrics).run(path, str(Path(output_dir) / 'pipeline.md'))
+    result = metrics.to_dict()
+    return {'sources': result['counters']['sources'],
+            'stage_seconds': round(sum(stage['wall_seconds'] for stage in result['stages']), 3),
+            'timed_seconds': result['totals']['wall_seconds']}
+
+
+def measure(scenario: str, path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scenario (inside a worker process) and measure it."""
+    runners: Dict[str, Callable[[], Dict[str, Any]]] = {
+        'load_json': lambda: run_load(path),
+        'load_jsonl': lambda: run_load(path),
+        'load_validated': lambda: run_load(path, validate=True),
+        'load_table': lambda: run_load_table(path),
+        'dedup': lambda: run_dedup(path),
+        'sentiment': lambda: run_sentiment(path),
+        'embeddings': lambda: run_embeddings(path),
+        'summarize': lambda: run_summarize(path, options['latency'], options['workers']),
+        'report': lambda: run_report(path, options['output_dir']),
+        'pipeline': lambda: run_pipeline(path, options['latency'], options['workers'],
+                                         options['output_dir']),
+    }
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = runners[scenario]()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    # Scenarios that load data first report the timed part separately
+    timed = result.pop('timed_seconds', wall)
+    result.update({
+        'wall_seconds': round(wall, 4),
+        'cpu_seconds': round(cpu, 4),
+        'sources_per_second': round(result['sources'] / timed, 1) if timed else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+    })
+    return result
+
+
+def dataset(data_dir: Path, size: int, duplicate_rate: float, seed: int, suffix: str) -> str:
+    path = data_dir / f"synthetic_{size}_{duplicate_rate}_{seed}{suffix}"
+    if not path.exists():
+        write_collection(str(path), size, duplicate_rate, seed)
+    return str(path)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List regressions of the current results against a baseline."""
+    regressions = []
+    for key, current in results['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous:
+            continue
+        if previous.get('sources_per_second') and current.get('sources_per_second'):
+            if current['sources_per_second'] < previous['sources_per_second'] * (1 - tolerance):
+                regressions.append(f"{key}: throughput {current['sources_per_second']:.0f}/s "
+                                   f"vs {previous['sources_per_second']:.0f}/s")
+        if previous.get('peak_rss_bytes') and current.get('peak_rss_bytes'):
+            if current['peak_rss_bytes'] > previous['peak_rss_bytes'] * (1 + tolerance):
+                regressions.append(f"{key}: peak RSS {current['peak_rss_bytes'] >> 20} MiB "
+                                   f"vs {previous['peak_rss_bytes'] >> 20} MiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000', help='Comma-separated source counts')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Scenarios to run')
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help='Synthetic duplicate rate')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic data seed')
+    parser.add_argument('--latency', type=float, default=0.002, help='Stub model latency in seconds')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent model workers')
+    parser.add_argument('--summarize-max', type=int, default=10000,
+                        help='Largest size for the summarize and pipeline scenarios '
+                             '(one model call per source)')
+    parser.add_argument('--data-dir', help='Directory for generated collections (default: temporary)')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--baseline', help='Previous results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed throughput drop / memory growth vs. baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(args.data_dir or tmp)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        options = {'latency': args.latency, 'workers': args.workers, 'output_dir': tmp}
+        results: Dict[str, Any] = {}
+
+        print(f"{'scenario':<24}{'sources':>10}{'sources/s':>14}{'wall s':>10}{'peak RSS MiB':>14}")
+        for size in sizes:
+            for scenario in scenarios:
+                if scenario in MODEL_SCENARIOS and size > args.summarize_max:
+                    continue
+                suffix = '.jsonl' if scenario == 'load_jsonl' else '.json'
+                path = dataset(data_dir, size, args.duplicate_rate, args.seed, suffix)
+                # A fresh process per scenario keeps peak RSS comparable
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(measure, scenario, path, options).result()
+                results[f"{scenario}@{size}"] = result
+                rss = result['peak_rss_bytes']
+                print(f"{scenario:<24}{size:>10}{result['sources_per_second'] or 0:>14.0f}"
+                      f"{result['wall_seconds']:>10.2f}{(rss or 0) / (1 << 20):>14.1f}")
+
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'settings': {'duplicate_rate': args.duplicate_rate, 'seed': args.seed,
+                     'latency': args.latency, 'workers': args.workers},
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
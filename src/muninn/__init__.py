@@ -3,15 +3,33 @@ Muninn - Automated OSINT Analysis Engine
 
 This package processes OSINT data collected by Huginn and transforms it into
 actionable intelligence reports for publication by RavenNet.
+
+Public functions are loaded lazily on first access (PEP 562), so
+``import muninn`` does not pull in the pipeline modules or their
+dependencies.
 """
 
+from importlib import import_module
+
+# Equivalent to typing.TYPE_CHECKING without importing typing at startup
+TYPE_CHECKING = False
+
 __version__ = "0.1.0"
 __author__ = "PR-CYBR"
 
-from .analyze import analyze_data
-from .data_loader import load_huginn_data
-from .summarizer import summarize_findings
-from .report_generator import generate_report
+# Public name -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    "analyze_data": "analyze",
+    "load_huginn_data": "data_loader",
+    "summarize_findings": "summarizer",
+    "generate_report": "report_generator",
+}
+
+if TYPE_CHECKING:
+    from .analyze import analyze_data
+    from .data_loader import load_huginn_data
+    from .summarizer import summarize_findings
+    from .report_generator import generate_report
 
 __all__ = [
     "analyze_data",
@@ -19,3 +37,17 @@ __all__ = [
     "summarize_findings",
     "generate_report",
 ]
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -8,11 +8,18 @@ This module coordinates the entire analysis pipeline:
 """
 
 import argparse
-import json
 import logging
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+if TYPE_CHECKING:
+    from .checkpoint import CheckpointLog
+    from .metrics import PipelineMetrics
+
+# Pipeline modules are imported inside the functions that use them, so the
+# CLI starts quickly (--help, argument errors) and short jobs only load what
+# they run.
 
 # Configure logging
 logging.basicConfig(
@@ -22,60 +29,226 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def analyze_data(input_path: str, output_path: str, config: Dict[str, Any] = None) -> bool:
+def load_config(config_path: str) -> Dict[str, Any]:
     """
-    Main analysis function that orchestrates the entire pipeline.
+    Load the YAML configuration file.
     
     Args:
-        input_path: Path to Huginn output data (JSON format)
-        output_path: Path where the report will be written (Markdown format)
-        config: Optional configuration dictionary
+        config_path: Path to the configuration file
     
     Returns:
-        bool: True if analysis completed successfully, False otherwise
+        Configuration dictionary (empty if the file does not exist)
+    """
+    import yaml
     
-    Phase 1: This is a placeholder that will be implemented in Phase 2.
+    path = Path(config_path)
+    if not path.exists():
+        logger.warning(f"Config file not found: {config_path}, using defaults")
+        return {}
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def summarizer_config(config: Dict[str, Any]) -> Dict[str, Any]:
     """
-    logger.info(f"Starting analysis of {input_path}")
-    logger.info(f"Report will be written to {output_path}")
+    Build the IntelligenceSummarizer configuration from the full config.
     
-    try:
-        # Phase 1: Placeholder implementation
-        # TODO Phase 2: Implement actual data loading, analysis, and report generation
-        
-        # For now, create a placeholder report
-        placeholder_report = """# Intelligence Report
+    Args:
+        config: Full configuration dictionary
+    
+    Returns:
+        Summarizer configuration with the model, analysis and performance sections
+    """
+    model = config.get('model', {})
+    return {
+        'model_type': model.get('type', 'ollama'),
+        'model': model,
+        'analysis': config.get('analysis', {}),
+        'performance': config.get('performance', {}),
+    }
 
-## Executive Summary
 
-*This is a placeholder report generated by Muninn Phase 1.*
+def metrics_path(output_path: str) -> str:
+    """Location of the metrics file written next to a report."""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}.metrics.json"))
 
-The analysis pipeline is being scaffolded. In Phase 2, this will contain:
-- Automated analysis of OSINT data collected by Huginn
-- AI-powered summarization of key findings
-- Actionable intelligence recommendations
 
-## Status
+def quarantine_path(output_path: str) -> str:
+    """Location of the quarantined (schema-invalid) sources of a report."""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}.quarantine.jsonl"))
 
-- ✅ Phase 1: Project structure complete
-- ⏳ Phase 2: Analysis engine (in progress)
-- ⏳ Phase 3: Report formatting and RavenNet integration
 
-## Next Steps
+def prioritizer_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the SourcePrioritizer configuration from the full config.
+    
+    Args:
+        config: Full configuration dictionary
+    
+    Returns:
+        Analysis settings with ``max_sources`` taken from the data section
+    """
+    return dict(config.get('analysis', {}),
+                max_sources=config.get('data', {}).get('max_sources'))
 
-1. Implement data loader for Huginn output
-2. Integrate AI model for analysis
-3. Build report generation system
-4. Connect to RavenNet for publishing
 
----
-*Generated by Muninn v0.1.0*
-"""
+def entity_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the entity extraction/index configuration from the full config.
+    
+    Args:
+        config: Full configuration dictionary
+    
+    Returns:
+        Settings for ``entities.index_collection``
+    """
+    performance = config.get('performance', {})
+    return {
+        'entity_index': performance.get('entity_index'),
+        'entity_workers': performance.get('entity_workers'),
+        'max_entities': config.get('analysis', {}).get('max_entities', 20),
+    }
+
+
+def trend_groups(theme_clusters, positions, top_entities, extracted) -> Dict[str, Dict[str, list]]:
+    """
+    Build the trend series of the collection's themes and top entities.
+    
+    Args:
+        theme_clusters: Summarizer themes with their member source positions
+        positions: Positions of the summarized sources among all sources
+            (None if every source was summarized)
+        top_entities: Entries of ``EntityIndex.top_entities``
+        extracted: Entities of each source, aligned with all sources
+    
+    Returns:
+        Series as kind -> name -> positions among all sources
+    """
+    themes = {}
+    for cluster in theme_clusters:
+        members = cluster['sources']
+        themes[cluster['name']] = [positions[i] for i in members] if positions is not None else members
+    
+    top = {entity['value'] for entity in top_entities}
+    entities: Dict[str, list] = {}
+    for position, found in enumerate(extracted):
+        for _, value, _ in found:
+            if value in top:
+                entities.setdefault(value, []).append(position)
+    return {'theme': themes, 'entity': entities}
+
+
+def analyze_incremental(data: Dict[str, Any], config: Dict[str, Any],
+                        metrics: Optional['PipelineMetrics'] = None,
+                        checkpoint: Optional['CheckpointLog'] = None):
+    """
+    Analyze only new or changed sources and merge them into persisted state.
+    
+    Args:
+        data: Loaded (and deduplicated) collection
+        config: Full configuration dictionary
+        metrics: Optional collector timing each stage
+        checkpoint: Optional checkpoint log of per-source model responses
+    
+    Returns:
+        Tuple of (report data, analysis results) built from the merged state
+    """
+    from .metrics import stage
+    from .state import AnalysisState
+    from .summarizer import IntelligenceSummarizer
+    
+    analysis_config = config.get('analysis', {})
+    state_dir = config.get('performance', {}).get('state_dir', '.cache/state')
+    state = AnalysisState.load(state_dir)
+    try:
+        delta = state.delta(data.get('sources', []))
+        logger.info(f"Incremental analysis: {len(delta)} new or changed sources "
+                    f"({len(state)} already in state)")
+        
+        summarizer = IntelligenceSummarizer(summarizer_config(config), checkpoint=checkpoint)
+        failed: List[int] = []
+        with stage(metrics, 'analyze'):
+            results = summarizer.analyze_batch([source for _, source in delta], failed)
+        if failed:
+            # Left out of the state, so the next run sends them again
+            logger.warning(f"{len(failed)} sources failed and are not merged into the state")
+            skipped = set(failed)
+            delta = [pair for position, pair in enumerate(delta) if position not in skipped]
+            results = [result for position, result in enumerate(results)
+                       if position not in skipped]
+        delta_sources = [source for _, source in delta]
+        labels = None
+        with stage(metrics, 'themes'):
+            if analysis_config.get('theme_identification', True):
+                labels = state.update_themes(delta, analysis_config)
+        with stage(metrics, 'summarize'):
+            summary = summarizer.update_summary(state.summary, delta_sources)
+        # Merged and saved after the model calls: the merge holds the
+        # state's write lock until it is saved
+        state.merge(delta, results, data.get('collection_id'), labels)
+        state.summary = summary
+        analysis = state.to_analysis(analysis_config.get('max_key_findings', 10),
+                                     analysis_config.get('max_entities', 20))
+        citations = state.citations()
+        collections = len(state.collections)
+        state.save()
+    finally:
+        state.close()
+    analysis['recommendations'] = summarizer.generate_recommendations(analysis)
+    if metrics is not None and summarizer.executor is not None:
+        metrics.add_inference(summarizer.executor.stats)
+    
+    metadata = dict(data.get('metadata', {}), collections_merged=collections)
+    report_data = dict(data, sources=citations, metadata=metadata)
+    return report_data, analysis
+
+
+def analyze_data(input_path: str, output_path: str, config: Dict[str, Any] = None) -> bool:
+    """
+    Main analysis function that orchestrates the entire pipeline.
+    
+    Pipeline: load (with schema validation) → deduplicate → entity
+    extraction → prioritize → summarize → trends → report. The stages run
+    concurrently on an asyncio event loop, connected by bounded queues (see
+    ``pipeline.py``). With ``analysis.incremental`` enabled, only sources
+    not seen in earlier runs are summarized and the report covers the
+    merged state.
+    
+    Per-source model responses are checkpointed batch by batch (see
+    ``checkpoint.py``); with ``performance.resume`` (``--resume``), a rerun
+    of an interrupted collection only sends the remaining prompts.
+    
+    Args:
+        input_path: Path to Huginn output data (JSON format)
+        output_path: Path where the report will be written (Markdown format)
+        config: Optional configuration dictionary
+    
+    Returns:
+        bool: True if analysis completed successfully, False otherwise
+    """
+    from .metrics import PipelineMetrics
+    from .pipeline import AnalysisPipeline
+    
+    config = config or {}
+    performance = config.get('performance', {})
+    logger.info(f"Starting analysis of {input_path}")
+    logger.info(f"Report will be written to {output_path}")
+    
+    metrics = None
+    if performance.get('metrics', True):
+        metrics = PipelineMetrics(trace_memory=performance.get('trace_memory', False))
+    
+    try:
+        AnalysisPipeline(config, metrics).run(input_path, output_path)
         
-        # Write placeholder report
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(placeholder_report)
+        if metrics is not None:
+            metrics.write(performance.get('metrics_file') or metrics_path(output_path))
+            totals = metrics.to_dict()['totals']
+            logger.info(f"Pipeline took {totals['wall_seconds']:.2f}s "
+                        f"({totals['sources_per_second']} sources/s)")
         
         logger.info(f"Analysis complete. Report written to {output_path}")
         return True
@@ -83,6 +256,9 @@ The analysis pipeline is being scaffolded. In Phase 2, this will contain:
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}", exc_info=True)
         return False
+    finally:
+        if metrics is not None:
+            metrics.close()
 
 
 def main():
@@ -96,21 +272,82 @@ def main():
 Examples:
   python -m muninn.analyze --input data/input/huginn_output.json --output data/output/report.md
   python -m muninn.analyze -i data.json -o report.md --config config/config.yaml
+  python -m muninn.analyze -i data.json -o report.md --format markdown,html,json
+  python -m muninn.analyze -i data.json -o report.md --resume
+  python -m muninn.analyze --batch --input-dir data/input --output-dir data/output
+  python -m muninn.analyze --watch --workers 4
         """
     )
     
     parser.add_argument(
         '-i', '--input',
-        required=True,
         help='Path to Huginn output data file (JSON format)'
     )
     
     parser.add_argument(
         '-o', '--output',
-        required=True,
         help='Path for generated report file (Markdown format)'
     )
     
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--batch',
+        action='store_true',
+        help='Analyze every unprocessed collection in the input directory'
+    )
+    mode.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep analyzing new collections as they land in the input directory'
+    )
+    
+    parser.add_argument(
+        '--input-dir',
+        help='Directory of collection files (default: data.input_dir from config)'
+    )
+    
+    parser.add_argument(
+        '--output-dir',
+        help='Directory for reports (default: data.output_dir from config)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes for batch/watch mode (default: performance.batch_workers)'
+    )
+    
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        help='Seconds between input directory scans in watch mode (default: data.poll_interval)'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        help='Comma-separated report formats: markdown, html, json (default: report.format)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Reuse the model responses checkpointed by an interrupted run of the same collection'
+    )
+    
+    parser.add_argument(
+        '--progress',
+        action='store_true',
+        help='Stream model responses and log the model output rate while prompts run'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='muninn.prof',
+        metavar='PATH',
+        help='Profile the run with cProfile and write the stats to PATH (default: muninn.prof)'
+    )
+    
     parser.add_argument(
         '-c', '--config',
         default='config/config.yaml',
@@ -124,6 +361,8 @@ Examples:
     )
     
     args = parser.parse_args()
+    if not (args.batch or args.watch) and not (args.input and args.output):
+        parser.error('--input and --output are required unless --batch or --watch is given')
     
     # Set log level
     if args.verbose:
@@ -132,11 +371,43 @@ Examples:
     
     # Run analysis
     logger.info("Muninn Analysis Engine v0.1.0")
-    logger.info(f"Input: {args.input}")
-    logger.info(f"Output: {args.output}")
     logger.info(f"Config: {args.config}")
+    config = load_config(args.config)
+    if args.format:
+        config.setdefault('report', {})['format'] = args.format
+    if args.resume:
+        config.setdefault('performance', {})['resume'] = True
+    if args.progress:
+        config.setdefault('performance', {})['progress'] = True
     
-    success = analyze_data(args.input, args.output)
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.batch or args.watch:
+            from .batch import BatchProcessor
+            processor = BatchProcessor(config, args.input_dir, args.output_dir, args.workers)
+            logger.info(f"Input directory: {processor.input_dir}")
+            logger.info(f"Output directory: {processor.output_dir}")
+            if args.watch:
+                poll_interval = args.poll_interval or config.get('data', {}).get('poll_interval', 10)
+                stats = processor.watch(poll_interval)
+            else:
+                stats = processor.run()
+            success = stats['failed'] == 0
+        else:
+            logger.info(f"Input: {args.input}")
+            logger.info(f"Output: {args.output}")
+            success = analyze_data(args.input, args.output, config)
+    finally:
+        if profiler is not None:
+            import pstats
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
+            logger.info(f"Profile written to {args.profile}")
     
     if success:
         logger.info("Analysis completed successfully!")
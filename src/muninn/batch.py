@@ -0,0 +1,334 @@
+"""
+Batch and watch-mode processing of many Huginn collections.
+
+Huginn drops many collection files into ``data.input_dir`` every day.
+``BatchProcessor`` runs ``analyze_data`` for each of them in a process
+pool, one report per input in ``data.output_dir``:
+
+- Per-file failures are isolated: a collection that fails to load or
+  crashes its worker process is recorded as failed and the batch goes on.
+- At most ``max_pending`` files are in flight at once, so a backlog of
+  thousands of files never turns into thousands of queued tasks.
+- Workers analyze their collection with single-process entity, sentiment
+  and JSON Lines stages, so N workers do not each start N more processes.
+- A ``ProcessedLedger`` (append-only JSON lines) remembers which file
+  versions were already handled, so reruns and watch mode skip them.
+
+Watch mode polls the input directory and submits files once their size and
+modification time were unchanged between two scans, so files that are still
+being written are not picked up early.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .data_loader import JSONL_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+# File extensions picked up from the input directory
+INPUT_SUFFIXES = ('.json',) + JSONL_SUFFIXES
+
+LEDGER_NAME = '.processed.jsonl'
+
+# Process pools inside analyze_data, each defaulting to the CPU count
+INNER_WORKER_KEYS = ('entity_workers', 'sentiment_workers', 'loader_workers')
+
+
+def discover_inputs(input_dir: str) -> List[Path]:
+    """
+    List collection files in a directory, oldest first.
+
+    Hidden files and files with unknown extensions are ignored.
+
+    Args:
+        input_dir: Directory to scan
+
+    Returns:
+        Paths sorted by modification time, then name
+    """
+    entries = []
+    with os.scandir(input_dir) as it:
+        for entry in it:
+            if entry.name.startswith('.') or not entry.is_file():
+                continue
+            if Path(entry.name).suffix.lower() in INPUT_SUFFIXES:
+                entries.append((entry.stat().st_mtime_ns, entry.name, Path(entry.path)))
+    return [path for _, _, path in sorted(entries)]
+
+
+def report_path(input_path: Path, output_dir: str) -> Path:
+    """
+    Report location for an input collection file.
+
+    The file name keeps its suffix, so ``a.json`` and ``a.jsonl`` in the same
+    input directory get different reports.
+    """
+    return Path(output_dir) / f"{input_path.name}_report.md"
+
+
+def worker_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Configuration for one collection inside a batch worker process.
+
+    The batch already runs one process per CPU, so the process pools
+    ``analyze_data`` would start for entities, sentiment and JSON Lines
+    decoding are limited to a single process.
+
+    Args:
+        config: Full configuration dictionary
+
+    Returns:
+        Copy of the configuration with the inner worker counts set to 1
+    """
+    config = copy.deepcopy(config)
+    performance = config.setdefault('performance', {})
+    for key in INNER_WORKER_KEYS:
+        performance[key] = 1
+    return config
+
+
+def process_file(input_path: str, output_path: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Analyze one collection file (runs inside a worker process).
+
+    Args:
+        input_path: Collection file
+        output_path: Report file
+        config: Full configuration dictionary
+
+    Returns:
+        Result record with ``ok`` and ``seconds``
+    """
+    # Imported here so the module stays importable from analyze without a cycle
+    from .analyze import analyze_data
+    start = time.perf_counter()
+    ok = analyze_data(input_path, output_path, config)
+    return {'ok': ok, 'seconds': round(time.perf_counter() - start, 3)}
+
+
+class ProcessedLedger:
+    """
+    Append-only record of processed input files.
+
+    Each line holds the file path, its size and modification time, the
+    outcome and the report path. A file is skipped while its size and
+    modification time match a recorded entry; a modified file is processed
+    again. Failed files are recorded too, so a broken collection is not
+    retried on every poll until it changes.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a ledger, loading existing entries.
+
+        Args:
+            path: Ledger file location
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn last line from an interrupted run
+                        continue
+                    self.entries[entry['input']] = entry
+
+    @staticmethod
+    def fingerprint(path: Path) -> Tuple[str, int, int]:
+        """Identity of a file version: (resolved path, size, mtime in ns)."""
+        stat = path.stat()
+        return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+    def is_processed(self, path: Path) -> bool:
+        """True if this version of the file was already handled."""
+        name, size, mtime_ns = self.fingerprint(path)
+        entry = self.entries.get(name)
+        return entry is not None and entry['size'] == size and entry['mtime_ns'] == mtime_ns
+
+    def record(self, fingerprint: Tuple[str, int, int], ok: bool, output: str,
+               seconds: Optional[float] = None) -> None:
+        """
+        Append the outcome for a file version.
+
+        Args:
+            fingerprint: Value of ``fingerprint`` taken when the file was submitted
+            ok: Whether the analysis succeeded
+            output: Report path
+            seconds: Processing time
+        """
+        name, size, mtime_ns = fingerprint
+        entry = {'input': name, 'size': size, 'mtime_ns': mtime_ns,
+                 'status': 'ok' if ok else 'failed', 'output': output, 'seconds': seconds}
+        self.entries[name] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+class BatchProcessor:
+    """
+    Process every collection in an input directory across a process pool.
+    """
+
+    def __init__(self, config: Dict[str, Any], input_dir: Optional[str] = None,
+                 output_dir: Optional[str] = None, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, ledger_path: Optional[str] = None):
+        """
+        Initialize the processor.
+
+        Args:
+            config: Full configuration dictionary
+            input_dir: Directory with collection files (default: ``data.input_dir``)
+            output_dir: Directory for reports (default: ``data.output_dir``)
+            workers: Worker processes (default: ``performance.batch_workers`` or CPU count)
+            max_pending: Files in flight at once (default: ``2 * workers``)
+            ledger_path: Processed-file ledger (default: ``<output_dir>/.processed.jsonl``)
+        """
+        data_config = config.get('data', {})
+        self.config = config
+        self.input_dir = input_dir or data_config.get('input_dir', 'data/input')
+        self.output_dir = output_dir or data_config.get('output_dir', 'data/output')
+        workers = workers or config.get('performance', {}).get('batch_workers') or os.cpu_count() or 1
+        if config.get('analysis', {}).get('incremental', False) and workers > 1:
+            # Incremental state is a single read-modify-write directory
+            logger.warning("Incremental analysis enabled, processing collections sequentially")
+            workers = 1
+        self.workers = workers
+        # A single worker process may still use the inner pools
+        self.worker_config = worker_config(config) if workers > 1 else config
+        self.max_pending = max_pending or 2 * workers
+        self.ledger = ProcessedLedger(ledger_path or str(Path(self.output_dir) / LEDGER_NAME))
+        self.stats = {'processed': 0, 'failed': 0, 'skipped': 0}
+
+    def run(self) -> Dict[str, int]:
+        """
+        Process every unprocessed file currently in the input directory.
+
+        Returns:
+            Counts of processed, failed and skipped files
+        """
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        pending: Dict[Future, Tuple[Path, Tuple[str, int, int], Path]] = {}
+        try:
+            for path in discover_inputs(self.input_dir):
+                if self.ledger.is_processed(path):
+                    self.stats['skipped'] += 1
+                    continue
+                while len(pending) >= self.max_pending:
+                    pool = self._collect(pool, pending, block=True)
+                pool = self._submit(pool, pending, path)
+            while pending:
+                pool = self._collect(pool, pending, block=True)
+        finally:
+            pool.shutdown(wait=True)
+        logger.info(f"Batch complete: {self.stats['processed']} processed, "
+                    f"{self.stats['failed']} failed, {self.stats['skipped']} skipped")
+        return dict(self.stats)
+
+    def watch(self, poll_interval: float = 10.0, stop: Optional[threading.Event] = None,
+              max_polls: Optional[int] = None) -> Dict[str, int]:
+        """
+        Keep processing new files as they appear in the input directory.
+
+        Args:
+            poll_interval: Seconds between directory scans
+            stop: Optional event that ends the loop when set
+            max_polls: Optional number of scans before returning
+
+        Returns:
+            Counts of processed, failed and skipped files
+        """
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        logger.info(f"Watching {self.input_dir} (every {poll_interval}s, {self.workers} workers)")
+        stop = stop or threading.Event()
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        pending: Dict[Future, Tuple[Path, Tuple[str, int, int], Path]] = {}
+        in_flight: Set[str] = set()
+        last_seen: Dict[str, Tuple[int, int]] = {}
+        polls = 0
+        try:
+            while not stop.is_set():
+                pool = self._collect(pool, pending, block=False)
+                in_flight = {str(item[0]) for item in pending.values()}
+                seen: Dict[str, Tuple[int, int]] = {}
+                for path in discover_inputs(self.input_dir):
+                    if str(path) in in_flight or self.ledger.is_processed(path):
+                        continue
+                    stat = path.stat()
+                    seen[str(path)] = (stat.st_size, stat.st_mtime_ns)
+                    # Only submit files that stopped changing since the last scan
+                    if last_seen.get(str(path)) != seen[str(path)]:
+                        continue
+                    if len(pending) >= self.max_pending:
+                        # Leave the rest for a later scan (backpressure)
+                        break
+                    pool = self._submit(pool, pending, path)
+                last_seen = seen
+
+                polls += 1
+                if max_polls is not None and polls >= max_polls:
+                    break
+                stop.wait(poll_interval)
+            while pending:
+                pool = self._collect(pool, pending, block=True)
+        except KeyboardInterrupt:
+            logger.info("Watch interrupted, finishing in-flight files")
+            for future in pending:
+                future.cancel()
+        finally:
+            pool.shutdown(wait=True)
+        return dict(self.stats)
+
+    def _submit(self, pool: ProcessPoolExecutor, pending, path: Path) -> ProcessPoolExecutor:
+        output = report_path(path, self.output_dir)
+        fingerprint = ProcessedLedger.fingerprint(path)
+        try:
+            future = pool.submit(process_file, str(path), str(output), self.worker_config)
+        except BrokenProcessPool:
+            pool = self._restart(pool)
+            future = pool.submit(process_file, str(path), str(output), self.worker_config)
+        pending[future] = (path, fingerprint, output)
+        return pool
+
+    def _collect(self, pool: ProcessPoolExecutor, pending, block: bool) -> ProcessPoolExecutor:
+        """Record finished files; restart the pool if a worker died."""
+        if not pending:
+            return pool
+        done, _ = wait(list(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        broken = False
+        while done:
+            future = done.pop()
+            path, fingerprint, output = pending.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                logger.error(f"Worker process died while analyzing {path}")
+                result = {'ok': False, 'seconds': None}
+                if not broken:
+                    # Every other in-flight file belonged to the same dead pool
+                    broken = True
+                    done |= set(wait(list(pending)).done)
+            except Exception as e:
+                logger.error(f"Failed to analyze {path}: {e}")
+                result = {'ok': False, 'seconds': None}
+            self.ledger.record(fingerprint, result['ok'], str(output), result['seconds'])
+            self.stats['processed' if result['ok'] else 'failed'] += 1
+        return self._restart(pool) if broken else pool
+
+    def _restart(self, pool: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        logger.warning("Restarting worker pool")
+        pool.shutdown(wait=False)
+        return ProcessPoolExecutor(max_workers=self.workers)
@@ -0,0 +1,197 @@
+"""
+Persistent on-disk cache for per-source analysis results.
+
+Results are stored in a SQLite database inside ``performance.cache_dir`` and
+keyed by a digest of the exact prompt sent for the source (its type, URL,
+title and content) together with the model name and generation parameters,
+so any change to the model configuration naturally invalidates old entries.
+Only model responses are cached, never the placeholder analysis produced
+without a backend. SQLite's file locking (in WAL mode) makes the cache
+safe to share between several worker processes, and the total size is
+bounded by evicting the least recently used entries. Within a process, one
+``AnalysisCache`` can be shared by threads (e.g. the stages of the async
+pipeline); its connection is used under a lock.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of cached results or the cache keys change
+CACHE_VERSION = 2
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_access ON analysis_cache (last_access);
+CREATE TABLE IF NOT EXISTS analysis_cache_size (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO analysis_cache_size (id, total) VALUES (0, 0);
+"""
+
+
+def make_cache_key(prompt_digest: str, model: Dict[str, Any]) -> str:
+    """
+    Build a cache key from a prompt digest and the model configuration.
+
+    Args:
+        prompt_digest: Digest of the exact prompt (``checkpoint.prompt_digest``)
+        model: Model settings (type, name and generation parameters)
+
+    Returns:
+        Hex digest identifying the (prompt, model, parameters) combination
+    """
+    params = {k: model.get(k) for k in ('type', 'name', 'temperature', 'max_tokens')}
+    payload = json.dumps([CACHE_VERSION, prompt_digest, params], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Size-bounded LRU cache of analysis results backed by SQLite.
+
+    Every process should create its own ``AnalysisCache`` instance; the
+    underlying database file can be shared freely. An instance may be used
+    from several threads.
+    """
+
+    def __init__(self, cache_dir: str = '.cache', max_bytes: int = DEFAULT_MAX_BYTES,
+                 timeout: float = 30.0):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            max_bytes: Maximum total size of cached values before eviction
+            timeout: Seconds to wait for a lock held by another process
+        """
+        self.path = Path(cache_dir) / 'analysis_cache.sqlite3'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Created on one thread, used from pipeline worker threads; the lock
+        # serializes every use of the connection
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        logger.debug(f"Opened analysis cache at {self.path}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result and mark it as recently used.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM analysis_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                'UPDATE analysis_cache SET last_access = ? WHERE key = ?', (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result, evicting least recently used entries if needed.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            value: JSON-serializable analysis result
+        """
+        encoded = json.dumps(value, separators=(',', ':'))
+        size = len(encoded.encode('utf-8'))
+        with self._lock, self._transaction():
+            row = self._conn.execute(
+                'SELECT size FROM analysis_cache WHERE key = ?', (key,)).fetchone()
+            delta = size - (row[0] if row else 0)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO analysis_cache (key, value, size, last_access) '
+                'VALUES (?, ?, ?, ?)', (key, encoded, size, time.time()))
+            self._conn.execute(
+                'UPDATE analysis_cache_size SET total = total + ? WHERE id = 0', (delta,))
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute(
+            'SELECT total FROM analysis_cache_size WHERE id = 0').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM analysis_cache ORDER BY last_access ASC'):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany('DELETE FROM analysis_cache WHERE key = ?', victims)
+        self._conn.execute(
+            'UPDATE analysis_cache_size SET total = total - ? WHERE id = 0', (freed,))
+        logger.debug(f"Evicted {len(victims)} cache entries ({freed} bytes)")
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of all cached values in bytes."""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT total FROM analysis_cache_size WHERE id = 0').fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock, self._transaction():
+            self._conn.execute('DELETE FROM analysis_cache')
+            self._conn.execute('UPDATE analysis_cache_size SET total = 0 WHERE id = 0')
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class _ImmediateTransaction:
+    """Write transaction that takes the database lock up front."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
@@ -0,0 +1,148 @@
+"""
+Append-only checkpoint log of per-source model responses.
+
+Per-source analysis is by far the longest stage of a run, so every batch
+of model responses is appended to ``<checkpoint_dir>/<collection_id>.jsonl``
+as soon as it completes. If the backend dies part of the way through a
+collection, ``python -m muninn.analyze ... --resume`` loads the log and only
+sends the prompts without a recorded response to the model.
+
+The first line records the collection and the model settings; a log written
+with other model settings is not resumed. Each further line holds one
+batch, mapping prompt digests to responses. A line torn by a crash is
+ignored on load. The log is removed once a run finishes without failed
+prompts.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of checkpoint records changes
+CHECKPOINT_VERSION = 1
+
+DEFAULT_CHECKPOINT_DIR = '.cache/checkpoints'
+
+# Model settings that change the responses to the same prompt
+MODEL_FIELDS = ('type', 'name', 'temperature', 'max_tokens')
+
+
+def prompt_digest(prompt: str) -> str:
+    """Key of a prompt in the checkpoint log."""
+    return hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+
+
+def checkpoint_path(directory: str, collection_id: str) -> Path:
+    """Location of a collection's checkpoint log."""
+    name = re.sub(r'[^A-Za-z0-9._-]+', '_', collection_id).strip('._')[:80] or 'collection'
+    suffix = hashlib.sha1(collection_id.encode('utf-8')).hexdigest()[:8]
+    return Path(directory) / f"{name}-{suffix}.jsonl"
+
+
+class CheckpointLog:
+    """
+    Model responses of one collection, persisted batch by batch.
+
+    The file is only created when the first batch is recorded, so runs
+    without a model backend leave nothing on disk.
+    """
+
+    def __init__(self, collection_id: str, model: Dict[str, Any],
+                 directory: str = DEFAULT_CHECKPOINT_DIR, resume: bool = False):
+        """
+        Open the checkpoint log of a collection.
+
+        Args:
+            collection_id: Collection the log belongs to
+            model: Model settings (type, name and generation parameters)
+            directory: Directory holding the logs
+            resume: Load the responses of an earlier run; otherwise an
+                existing log is replaced on the first write
+        """
+        self.collection_id = collection_id
+        self.path = checkpoint_path(directory, collection_id)
+        self.header = {'version': CHECKPOINT_VERSION, 'collection_id': collection_id,
+                       'model': {field: model.get(field) for field in MODEL_FIELDS}}
+        self.responses: Dict[str, str] = {}
+        self.batches = 0
+        self.failures = 0
+        self._file = None
+        if resume:
+            self._load()
+
+    def _load(self) -> None:
+        """Read the responses of an earlier run of the same collection and model."""
+        if not self.path.exists():
+            logger.info(f"No checkpoint for {self.collection_id}, starting from the beginning")
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = iter(f)
+            try:
+                header = json.loads(next(lines, 'null'))
+            except ValueError:
+                header = None
+            if header != self.header:
+                logger.warning(f"Checkpoint {self.path} was written for other model settings, "
+                               f"starting from the beginning")
+                return
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring incomplete checkpoint record in {self.path}")
+                    continue
+                self.responses.update(record.get('responses', {}))
+                self.batches += 1
+        logger.info(f"Resuming {self.collection_id}: {len(self.responses)} responses "
+                    f"from {self.batches} checkpointed batches")
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Recorded response to a prompt, if any."""
+        return self.responses.get(prompt_digest(prompt))
+
+    def record(self, responses: Dict[str, str]) -> None:
+        """
+        Append one batch of responses.
+
+        Args:
+            responses: Prompt digest -> model response
+        """
+        if not responses:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # A resumed log is extended; otherwise a stale log is replaced
+            resumed = bool(self.batches) and self.path.exists()
+            self._file = open(self.path, 'a' if resumed else 'w', encoding='utf-8')
+            if not resumed:
+                self._file.write(json.dumps(self.header) + '\n')
+        self._file.write(json.dumps({'batch': self.batches, 'responses': responses}) + '\n')
+        # Flushed per batch so a crash loses at most the batch in flight
+        self._file.flush()
+        self.responses.update(responses)
+        self.batches += 1
+
+    def close(self) -> None:
+        """Close the log file (the log stays on disk)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        """
+        Close the log at the end of a successful run.
+
+        The log is removed unless some prompts failed, in which case it is
+        kept for a rerun with ``--resume``.
+        """
+        self.close()
+        if self.failures:
+            logger.warning(f"{self.failures} prompts failed; rerun with --resume to retry "
+                           f"only those (checkpoint: {self.path})")
+        elif self.path.exists():
+            self.path.unlink()
@@ -2,16 +2,44 @@
 Data loader module for reading Huginn output data.
 
 This module handles loading and parsing of OSINT data collected by Huginn.
-Supports JSON format with flexible schema.
+Supports JSON format with flexible schema, as well as JSON Lines (one source
+per line). Large collections can be streamed source-by-source with
+``HuginDataLoader.iter_sources`` instead of being materialized in memory.
+With a ``SchemaValidator`` (see ``schema``), malformed sources are dropped
+while they are parsed.
 """
 
 import json
 import logging
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from .source_table import SourceTable
+
+if TYPE_CHECKING:
+    from .schema import SchemaValidator
 
 logger = logging.getLogger(__name__)
 
+# Default read size for the streaming parser (1 MiB)
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Largest single JSON value (one source or header field) the streaming
+# parser buffers before giving up on it (64 Mi characters)
+DEFAULT_MAX_VALUE_CHARS = 64 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+# File suffixes recognised as JSON Lines input
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+
+# Target size of a JSON Lines byte range decoded by one worker (16 MiB)
+DEFAULT_JSONL_CHUNK_BYTES = 16 << 20
+
 
 class HuginDataLoader:
     """
@@ -21,16 +49,53 @@ class HuginDataLoader:
     Phase 2: Will implement full data loading and validation.
     """
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 data_format: Optional[str] = None, workers: Optional[int] = None,
+                 jsonl_chunk_bytes: int = DEFAULT_JSONL_CHUNK_BYTES,
+                 validator: Optional['SchemaValidator'] = None,
+                 max_value_chars: int = DEFAULT_MAX_VALUE_CHARS):
         """
         Initialize the data loader.
         
         Args:
-            file_path: Path to Huginn output JSON file
+            file_path: Path to Huginn output JSON or JSON Lines file
+            chunk_size: Number of characters read at a time when streaming
+            data_format: 'json' or 'jsonl'; detected from the file suffix if omitted
+            workers: Worker processes for JSON Lines decoding (default: CPU count)
+            jsonl_chunk_bytes: Target byte range size per JSON Lines worker task
+            validator: Optional schema validator applied to every source
+            max_value_chars: Largest single JSON value buffered when streaming;
+                longer (or unterminated) values raise JSONDecodeError
         """
         self.file_path = Path(file_path)
+        self.chunk_size = chunk_size
+        self.max_value_chars = max_value_chars
+        if data_format is None:
+            data_format = 'jsonl' if self.file_path.suffix.lower() in JSONL_SUFFIXES else 'json'
+        if data_format not in ('json', 'jsonl'):
+            raise ValueError(f"Unsupported data format: {data_format}")
+        self.data_format = data_format
+        self.workers = workers or os.cpu_count() or 1
+        self.jsonl_chunk_bytes = jsonl_chunk_bytes
+        self.validator = validator
         self.data = None
-        logger.debug(f"Initialized HuginDataLoader for {file_path}")
+        self.header: Dict[str, Any] = {}
+        self.errors: List[Tuple[int, str]] = []
+        logger.debug(f"Initialized HuginDataLoader for {file_path} ({data_format})")
+    
+    @property
+    def collection_id(self) -> Optional[str]:
+        """Collection ID of the loaded or streamed collection."""
+        if self.data is not None:
+            return self.data.get('collection_id')
+        return self.header.get('collection_id')
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Top-level collection metadata of the loaded or streamed collection."""
+        if self.data is not None:
+            return self.data.get('metadata', {})
+        return self.header.get('metadata', {})
     
     def load(self) -> Dict[str, Any]:
         """
@@ -45,16 +110,38 @@ class HuginDataLoader:
         """
         logger.info(f"Loading data from {self.file_path}")
         
-        # Phase 1: Placeholder - will be implemented in Phase 2
         if not self.file_path.exists():
             raise FileNotFoundError(f"Input file not found: {self.file_path}")
         
-        with open(self.file_path, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        if self.data_format == 'jsonl':
+            sources = list(self.iter_sources())
+            self.data = dict(self.header, sources=sources)
+        else:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+            if self.validator is not None and isinstance(self.data.get('sources'), list):
+                self.data['sources'] = list(self._validated(self.data['sources'], self.data))
         
         logger.info(f"Successfully loaded data with {len(self.data.get('sources', []))} sources")
         return self.data
     
+    def load_table(self) -> Dict[str, Any]:
+        """
+        Stream Huginn data into a compact columnar ``SourceTable``.
+        
+        Sources are appended to the table as they are parsed, so the full
+        list of source dictionaries is never materialized. The returned
+        dictionary has the same shape as ``load()`` with ``sources`` set to
+        the table.
+        
+        Returns:
+            Dictionary containing top-level fields and a ``SourceTable``
+        """
+        table = SourceTable(self.iter_sources())
+        self.data = dict(self.header, sources=table)
+        logger.info(f"Loaded {len(table)} sources into columnar table ({table.nbytes()} bytes)")
+        return self.data
+    
     def validate(self) -> bool:
         """
         Validate the loaded data structure.
@@ -71,6 +158,13 @@ class HuginDataLoader:
             logger.warning("Data missing 'sources' field")
             return False
         
+        if self.validator is not None:
+            self.validator.check_header(self.data)
+            # Sources were validated while loading; fail only if none survived
+            if self.validator.invalid and not self.validator.valid:
+                logger.warning("No source passed schema validation")
+                return False
+        
         return True
     
     def get_sources(self) -> List[Dict[str, Any]]:
@@ -78,25 +172,144 @@ class HuginDataLoader:
         Get list of OSINT sources from loaded data.
         
         Returns:
-            List of source dictionaries
+            List of source dictionaries, or a ``SourceTable`` of dict-like
+            rows if the data was loaded with ``load_table()``
         """
         if self.data is None:
             return []
         return self.data.get('sources', [])
+    
+    def iter_sources(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream sources from the top-level ``sources`` array one at a time.
+        
+        Only the source currently being decoded and a bounded read buffer
+        are held in memory, so arbitrarily large collections can be
+        processed. All other top-level fields (``collection_id``,
+        ``metadata``, ...) are collected into ``self.header`` as they are
+        encountered; fields that appear after ``sources`` in the file are
+        only available once iteration has finished.
+        
+        JSON Lines input is decoded in parallel instead (see
+        ``_iter_jsonl_sources``) and malformed lines are recorded in
+        ``self.errors`` rather than raised.
+        
+        With a validator, invalid sources are skipped and the validation
+        counts are added to the collection metadata as ``validation``.
+        
+        Yields:
+            Source dictionaries in file order
+            
+        Raises:
+            FileNotFoundError: If input file doesn't exist
+            json.JSONDecodeError: If file is not valid JSON
+        """
+        logger.info(f"Streaming sources from {self.file_path}")
+        
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Input file not found: {self.file_path}")
+        
+        self.header = {}
+        count = 0
+        if self.data_format == 'jsonl':
+            for source in self._validated(self._iter_jsonl_sources()):
+                count += 1
+                yield source
+        else:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                parser = _StreamingCollectionParser(f, self.chunk_size, self.header,
+                                                    self.max_value_chars)
+                for source in self._validated(parser.parse()):
+                    count += 1
+                    yield source
+        
+        logger.info(f"Finished streaming {count} sources")
+    
+    def _validated(self, sources: Iterable[Any],
+                   collection: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Filter sources through the validator and record its counts in the
+        metadata of ``collection`` (default: the streamed header).
+        """
+        if self.validator is None:
+            yield from sources
+            return
+        yield from self.validator.filter(sources)
+        if collection is None:
+            collection = self.header
+        metadata = collection.get('metadata')
+        if not isinstance(metadata, dict):
+            metadata = collection['metadata'] = {}
+        metadata['validation'] = self.validator.summary()
+    
+    def _iter_jsonl_sources(self) -> Iterator[Dict[str, Any]]:
+        """
+        Decode a JSON Lines file with a process pool.
+        
+        The file is memory-mapped and split into byte ranges on newline
+        boundaries. Each range is decoded by a worker process; results are
+        consumed in file order from a bounded window of in-flight tasks so
+        memory stays proportional to ``workers * jsonl_chunk_bytes``.
+        """
+        self.errors = []
+        self.header = {
+            'collection_id': self.file_path.stem,
+            'metadata': {'data_format': 'jsonl'},
+        }
+        ranges = _split_jsonl_ranges(self.file_path, self.jsonl_chunk_bytes)
+        path = str(self.file_path)
+        
+        if self.workers <= 1 or len(ranges) <= 1:
+            results = (_decode_jsonl_range(path, start, end) for start, end in ranges)
+            yield from self._merge_jsonl_results(results)
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            def ordered_results():
+                pending = deque()
+                for start, end in ranges:
+                    pending.append(executor.submit(_decode_jsonl_range, path, start, end))
+                    if len(pending) >= self.workers * 2:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            
+            yield from self._merge_jsonl_results(ordered_results())
+    
+    def _merge_jsonl_results(self, results) -> Iterator[Dict[str, Any]]:
+        """Yield decoded sources and translate chunk-relative error line numbers."""
+        line_offset = 0
+        total = 0
+        for sources, line_count, errors in results:
+            for line_no, message in errors:
+                absolute = line_offset + line_no
+                logger.warning(f"Skipping malformed line {absolute} in {self.file_path}: {message}")
+                self.errors.append((absolute, message))
+            line_offset += line_count
+            total += len(sources)
+            yield from sources
+        
+        self.header['metadata']['total_sources'] = total
+        self.header['metadata']['malformed_lines'] = len(self.errors)
 
 
-def load_huginn_data(file_path: str) -> Dict[str, Any]:
+def load_huginn_data(file_path: str, data_format: Optional[str] = None,
+                     as_table: bool = False,
+                     validator: Optional['SchemaValidator'] = None) -> Dict[str, Any]:
     """
     Convenience function to load Huginn data.
     
     Args:
-        file_path: Path to Huginn output JSON file
+        file_path: Path to Huginn output JSON or JSON Lines file
+        data_format: 'json' or 'jsonl'; detected from the file suffix if omitted
+        as_table: Store sources in a compact ``SourceTable`` instead of a list
+        validator: Optional schema validator; invalid sources are dropped
     
     Returns:
         Dictionary containing parsed data
     """
-    loader = HuginDataLoader(file_path)
-    data = loader.load()
+    loader = HuginDataLoader(file_path, data_format=data_format, validator=validator)
+    data = loader.load_table() if as_table else loader.load()
     
     if not loader.validate():
         logger.warning("Loaded data failed validation")
@@ -104,6 +317,195 @@ def load_huginn_data(file_path: str) -> Dict[str, Any]:
     return data
 
 
+def _split_jsonl_ranges(path: Path, target_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges that each end just after a newline.
+    
+    Args:
+        path: File to split
+        target_bytes: Approximate size of each range
+    
+    Returns:
+        List of (start, end) byte offsets covering the whole file
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return []
+    
+    ranges = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + max(target_bytes, 1), size)
+            if end < size:
+                newline = mm.find(b'\n', end - 1)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _decode_jsonl_range(path: str, start: int, end: int) -> Tuple[List[Dict[str, Any]], int, List[Tuple[int, str]]]:
+    """
+    Decode one byte range of a JSON Lines file.
+    
+    Runs in a worker process, so it reopens and memory-maps the file itself
+    instead of receiving the data through the pool.
+    
+    Returns:
+        Tuple of (sources, number of lines in the range, errors) where each
+        error is a (1-based line number relative to the range, message) pair
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        chunk = mm[start:end]
+    
+    lines = chunk.split(b'\n')
+    if lines and not lines[-1]:
+        lines.pop()
+    
+    sources = []
+    errors = []
+    for idx, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except (ValueError, UnicodeDecodeError) as e:
+            errors.append((idx, str(e)))
+            continue
+        if not isinstance(record, dict):
+            errors.append((idx, f"Expected JSON object, got {type(record).__name__}"))
+            continue
+        sources.append(record)
+    
+    return sources, len(lines), errors
+
+
+class _StreamingCollectionParser:
+    """
+    Incremental parser for a top-level Huginn JSON object.
+    
+    Values are decoded with ``json.JSONDecoder.raw_decode`` over a sliding
+    text buffer; the buffer is refilled from the file whenever a value is
+    incomplete and trimmed after every consumed value. An incomplete value
+    at least doubles the buffered input before it is decoded again, so a
+    large value costs linear rather than quadratic time, and a value longer
+    than ``max_value_chars`` (e.g. a malformed one that never terminates)
+    raises instead of pulling the rest of the file into memory.
+    """
+    
+    def __init__(self, fp, chunk_size: int, header: Dict[str, Any],
+                 max_value_chars: int = DEFAULT_MAX_VALUE_CHARS):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.header = header
+        self.max_value_chars = max_value_chars
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+    
+    def _fill(self, size: int = 0) -> bool:
+        """
+        Read at least ``size`` more characters (one chunk by default) into
+        the buffer. Returns False if nothing was read before end of file.
+        """
+        if self.eof:
+            return False
+        chunks = []
+        read = 0
+        while True:
+            chunk = self.fp.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+                break
+            chunks.append(chunk)
+            read += len(chunk)
+            if read >= size:
+                break
+        if not chunks:
+            return False
+        if self.pos:
+            self.offset += self.pos
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        chunks.insert(0, self.buffer)
+        self.buffer = ''.join(chunks)
+        return True
+    
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+    
+    def _next_char(self) -> str:
+        """Skip whitespace and return the next significant character."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise self._error("Unexpected end of input")
+    
+    def _expect(self, char: str) -> None:
+        if self._next_char() != char:
+            raise self._error(f"Expecting '{char}' at offset {self.offset + self.pos}")
+        self.pos += 1
+    
+    def _decode_value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        self._next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                pending = len(self.buffer) - self.pos
+                if pending >= self.max_value_chars:
+                    raise self._error(f"Value at offset {self.offset + self.pos} "
+                                      f"exceeds {self.max_value_chars} characters")
+                if self._fill(pending):
+                    continue
+                raise
+            # A value ending exactly at the buffer edge may be a truncated
+            # number or literal, so only accept it once more input is known.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+    
+    def parse(self) -> Iterator[Dict[str, Any]]:
+        self._expect('{')
+        if self._next_char() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                raise self._error("Expecting property name")
+            self._expect(':')
+            if key == 'sources' and self._next_char() == '[':
+                self.pos += 1
+                if self._next_char() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield self._decode_value()
+                        char = self._next_char()
+                        self.pos += 1
+                        if char == ']':
+                            break
+                        if char != ',':
+                            raise self._error("Expecting ',' delimiter")
+            else:
+                self.header[key] = self._decode_value()
+            char = self._next_char()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise self._error("Expecting ',' delimiter")
+
+
 # Example expected data structure for Phase 2 implementation
 EXAMPLE_HUGINN_DATA = {
     "collection_date": "2025-10-31T12:00:00Z",
@@ -0,0 +1,338 @@
+"""
+Source deduplication stage.
+
+Huginn frequently collects the same article, repost or retweet several times.
+This module collapses those copies before summarization so every origin is
+analyzed and cited once:
+
+1. Exact duplicates are dropped by normalized URL and by a hash of the
+   content with only case and whitespace normalized (punctuation is kept:
+   ``1.2.3.4`` and ``1-2-3-4`` are different indicators).
+2. Near-duplicates are collapsed using MinHash signatures over word shingles,
+   bucketed with locality-sensitive hashing (LSH) so each source is only
+   compared against a handful of candidates. Signatures are computed with
+   numpy when it is installed.
+
+Both passes run in a single linear scan over the sources. Each surviving
+source records how many copies were merged into it in
+``metadata.duplicate_count`` and the URLs of those copies in
+``metadata.duplicate_urls``.
+"""
+
+import hashlib
+import logging
+import random
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change the identity of a page
+TRACKING_PARAMS = {'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid', 'ref', 'ref_src'}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+# Shingle tokens keep punctuation inside a word (IPs, domains, hashes,
+# handles) and drop it around words
+_TOKEN_RE = re.compile(r'\w(?:[\w.:/@-]*\w)?', re.UNICODE)
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    Normalize a URL so trivially different links compare equal.
+
+    Lowercases scheme and host, drops ``www.``, default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query string.
+
+    Args:
+        url: URL to normalize
+
+    Returns:
+        Normalized URL, or None for empty input
+    """
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS]
+    path = parts.path.rstrip('/') or ''
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+def _normalize_text(text: str) -> str:
+    return ' '.join(text.casefold().split())
+
+
+def content_hash(text: Optional[str]) -> Optional[str]:
+    """
+    Hash source content after case and whitespace normalization.
+
+    Punctuation is part of the hash: in OSINT content it often is the
+    indicator (``evil.com`` vs. ``evil com``). Fuzzier matches are left to
+    the MinHash pass.
+
+    Args:
+        text: Source content
+
+    Returns:
+        Hex digest, or None if the content is empty
+    """
+    if not text:
+        return None
+    normalized = _normalize_text(text)
+    if not normalized:
+        return None
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class MinHasher:
+    """
+    MinHash signature generator over word shingles.
+
+    The same seed always yields the same permutations, so signatures are
+    comparable across runs. Permutations are ``((a * h + b) mod 2**64) mod
+    p`` over 64-bit shingle hashes; the products wrap like numpy's uint64
+    arithmetic, so the vectorized path and the pure-Python fallback produce
+    identical signatures.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        """
+        Initialize the hasher.
+
+        Args:
+            num_perm: Number of hash permutations (signature length)
+            shingle_size: Number of consecutive words per shingle
+            seed: Seed for the permutation coefficients
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array([a for a, _ in self._perms], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self._perms], dtype=np.uint64)[:, None]
+
+    def shingles(self, text: str) -> set:
+        """Return the set of word shingles of a text."""
+        tokens = _TOKEN_RE.findall(text.casefold())
+        size = self.shingle_size
+        if len(tokens) < size:
+            return {' '.join(tokens)} if tokens else set()
+        return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """
+        Compute the MinHash signature of a text.
+
+        Returns:
+            Tuple of ``num_perm`` minimum hash values, or None for empty text
+        """
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+                  for s in shingles]
+        prime = _MERSENNE_PRIME
+        if np is not None:
+            # One (num_perm, shingles) matrix instead of a Python loop per pair
+            permuted = (self._a * np.array(hashes, dtype=np.uint64) + self._b) % np.uint64(prime)
+            return tuple(permuted.min(axis=1).tolist())
+        mask = _MASK64
+        return tuple(min(((a * h + b) & mask) % prime for h in hashes) for a, b in self._perms)
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimate the Jaccard similarity of two MinHash signatures."""
+    matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return matches / len(sig_a)
+
+
+class Deduplicator:
+    """
+    Collapse exact and near-duplicate sources.
+
+    Keeps the first occurrence of every source and merges later copies into
+    it. Input dictionaries are never modified; kept sources are shallow
+    copies with their own ``metadata`` dictionary.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            config: Optional settings: ``near_duplicate_threshold`` (0.0-1.0,
+                default 0.8), ``num_perm`` (default 64), ``lsh_bands``
+                (default 16) and ``shingle_size`` (default 3)
+        """
+        self.config = config or {}
+        self.threshold = self.config.get('near_duplicate_threshold', 0.8)
+        num_perm = self.config.get('num_perm', 64)
+        self.bands = self.config.get('lsh_bands', 16)
+        if num_perm % self.bands:
+            raise ValueError("num_perm must be divisible by lsh_bands")
+        self.rows = num_perm // self.bands
+        self.hasher = MinHasher(num_perm, self.config.get('shingle_size', 3))
+        self.stats = {'input': 0, 'url_duplicates': 0, 'content_duplicates': 0,
+                      'near_duplicates': 0, 'output': 0}
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every source seen so far."""
+        self.kept: List[Dict[str, Any]] = []
+        self._by_url: Dict[str, int] = {}
+        self._by_hash: Dict[str, int] = {}
+        self._signatures: List[Optional[Tuple[int, ...]]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        for key in self.stats:
+            self.stats[key] = 0
+
+    def deduplicate(self, sources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Remove duplicate sources.
+
+        Args:
+            sources: Source dictionaries (or dict-like rows) from Huginn
+
+        Returns:
+            List of unique sources annotated with ``metadata.duplicate_count``
+        """
+        self.reset()
+        self.add(sources)
+        return self.finish()
+
+    def add(self, sources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Deduplicate more sources against every source added since ``reset``.
+
+        Lets a streaming pipeline deduplicate a collection chunk by chunk.
+        Duplicates found later are still merged into the returned entries.
+
+        Args:
+            sources: Source dictionaries (or dict-like rows) from Huginn
+
+        Returns:
+            The sources among ``sources`` that were kept (shallow copies)
+        """
+        kept = self.kept
+        start = len(kept)
+        by_url, by_hash = self._by_url, self._by_hash
+        signatures, buckets = self._signatures, self._buckets
+        stats = self.stats
+
+        for source in sources:
+            stats['input'] += 1
+            url = normalize_url(source.get('url'))
+            content = source.get('content') or ''
+            digest = content_hash(content)
+
+            if url is not None and url in by_url:
+                stats['url_duplicates'] += 1
+                self._merge(kept[by_url[url]], source)
+                continue
+            if digest is not None and digest in by_hash:
+                stats['content_duplicates'] += 1
+                self._merge(kept[by_hash[digest]], source)
+                self._remember(by_url, url, by_hash[digest])
+                continue
+
+            signature = self.hasher.signature(content) if digest is not None else None
+            match = self._find_near_duplicate(signature, signatures, buckets)
+            if match is not None:
+                stats['near_duplicates'] += 1
+                self._merge(kept[match], source)
+                self._remember(by_url, url, match)
+                self._remember(by_hash, digest, match)
+                continue
+
+            index = len(kept)
+            entry = dict(source)
+            metadata = entry.get('metadata')
+            entry['metadata'] = dict(metadata) if isinstance(metadata, dict) else {}
+            entry['metadata'].setdefault('duplicate_count', 0)
+            entry['metadata']['duplicate_urls'] = list(entry['metadata'].get('duplicate_urls', []))
+            kept.append(entry)
+            signatures.append(signature)
+            self._remember(by_url, url, index)
+            self._remember(by_hash, digest, index)
+            if signature is not None:
+                for band_key in self._band_keys(signature):
+                    buckets.setdefault(band_key, []).append(index)
+
+        stats['output'] = len(kept)
+        return kept[start:]
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Log the statistics and return every kept source."""
+        stats = self.stats
+        logger.info(f"Deduplicated {stats['input']} sources to {stats['output']} "
+                    f"({stats['url_duplicates']} URL, {stats['content_duplicates']} content, "
+                    f"{stats['near_duplicates']} near-duplicate)")
+        return self.kept
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def _find_near_duplicate(self, signature, signatures, buckets) -> Optional[int]:
+        if signature is None:
+            return None
+        checked = set()
+        for band_key in self._band_keys(signature):
+            for candidate in buckets.get(band_key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if estimate_similarity(signature, signatures[candidate]) >= self.threshold:
+                    return candidate
+        return None
+
+    @staticmethod
+    def _remember(index: Dict[str, int], key: Optional[str], position: int) -> None:
+        if key is not None:
+            index.setdefault(key, position)
+
+    @staticmethod
+    def _merge(kept: Dict[str, Any], duplicate: Dict[str, Any]) -> None:
+        metadata = kept['metadata']
+        metadata['duplicate_count'] += 1
+        url = duplicate.get('url')
+        if url and url != kept.get('url') and url not in metadata['duplicate_urls']:
+            metadata['duplicate_urls'].append(url)
+
+
+def deduplicate_sources(sources: Iterable[Dict[str, Any]],
+                        config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Convenience function to remove duplicate sources.
+
+    Args:
+        sources: Source dictionaries from Huginn
+        config: Optional deduplication settings
+
+    Returns:
+        List of unique sources
+    """
+    return Deduplicator(config).deduplicate(sources)
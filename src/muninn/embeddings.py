@@ -0,0 +1,567 @@
+"""
+Source embeddings and a persistent approximate nearest-neighbour index.
+
+Sources are embedded by the model backend when it serves embeddings
+(``model.embedding_model``), and otherwise by ``HashingEmbedder``, a
+signed hashing vectorizer that needs no network and gives the same vector
+for the same text in every run.
+
+``EmbeddingIndex`` keeps the vectors of every source ever indexed in a
+memory-mapped float32 matrix on disk, with an IVF (inverted file) index on
+top: once enough vectors are stored, spherical k-means centroids are
+trained once and every vector -- including those added later -- is
+assigned to its nearest centroid. A lookup compares the query with the
+centroids and scans only the rows of the ``nprobe`` closest lists, so it
+takes milliseconds across hundreds of thousands of sources. Source
+metadata lives in SQLite next to the matrix; writers are serialized by
+its lock.
+
+Usage:
+    python -m muninn.embeddings "lockbit affiliate arrested"
+    python -m muninn.embeddings --rebuild --index .cache/embeddings
+
+NumPy is an optional dependency (``pip install muninn[full]``).
+"""
+
+import argparse
+import logging
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from .cache import _ImmediateTransaction
+from .state import source_key
+from .themes import TAG_WEIGHT, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = '.cache/embeddings'
+DEFAULT_DIM = 256
+DEFAULT_LISTS = 256
+DEFAULT_PROBES = 8
+
+# Vectors stored before the IVF centroids are trained (exact search until then)
+MIN_TRAIN_PER_LIST = 8
+
+# Vectors sampled for training and k-means iterations
+MAX_TRAIN_SAMPLE = 65536
+TRAIN_ITERATIONS = 10
+
+# Rows compared with the centroids per step when assigning lists
+ASSIGN_CHUNK = 16384
+
+# Texts per request to an embedding backend
+EMBED_BATCH_SIZE = 32
+
+# Maximum characters of source text embedded by a backend
+MAX_EMBED_TEXT = 4000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    row INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    collection_id TEXT,
+    url TEXT,
+    title TEXT
+);
+"""
+
+
+def require_numpy() -> None:
+    """Raise an informative ImportError if NumPy is not installed."""
+    if np is None:
+        raise ImportError("Embeddings require numpy (pip install muninn[full])")
+
+
+def source_text(source: Dict[str, Any]) -> str:
+    """Text of a source sent to an embedding backend (title and content)."""
+    title = source.get('title') or ''
+    content = source.get('content') or ''
+    return (f"{title}\n{content}" if title else content)[:MAX_EMBED_TEXT]
+
+
+def _normalize(vectors: 'np.ndarray') -> 'np.ndarray':
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEmbedder:
+    """
+    Signed hashing vectorizer over content, title and tag tokens.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        """
+        Initialize the embedder.
+
+        Args:
+            dim: Vector dimensions
+        """
+        require_numpy()
+        self.dim = dim
+        self.name = f'hashing-{dim}'
+
+    @staticmethod
+    def _tokens(source: Dict[str, Any]) -> List[str]:
+        tokens = tokenize(source.get('content') or '')
+        title = source.get('title')
+        if title:
+            tokens.extend(tokenize(title))
+        metadata = source.get('metadata') or {}
+        tags = metadata.get('tags') if isinstance(metadata, dict) else None
+        for tag in tags or ():
+            tag = str(tag).lower().strip()
+            if tag:
+                tokens.extend([tag] * TAG_WEIGHT)
+        return tokens
+
+    def embed(self, sources: Sequence[Dict[str, Any]]) -> 'np.ndarray':
+        """
+        Embed sources.
+
+        Every distinct token is hashed once per call; its hash picks a
+        dimension and a sign (so colliding tokens tend to cancel out).
+        Counts are weighted sublinearly and rows are L2-normalized.
+
+        Args:
+            sources: Source dictionaries
+
+        Returns:
+            Float32 matrix with one unit-length row per source
+        """
+        vocab: Dict[str, int] = {}
+        lengths: List[int] = []
+        ids: List[int] = []
+        for source in sources:
+            tokens = self._tokens(source)
+            for token in set(tokens).difference(vocab):
+                vocab[token] = len(vocab)
+            ids.extend(map(vocab.__getitem__, tokens))
+            lengths.append(len(tokens))
+        n_rows, n_terms = len(lengths), max(len(vocab), 1)
+
+        hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in vocab),
+                             dtype=np.int64, count=len(vocab))
+        columns = hashes % self.dim
+        signs = np.where((hashes // self.dim) & 1, -1.0, 1.0)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+
+        # Sublinear term frequency per (row, token), then signed accumulation
+        cells, counts = np.unique(rows * n_terms + np.asarray(ids, dtype=np.int64),
+                                  return_counts=True)
+        cell_rows, cell_terms = np.divmod(cells, n_terms)
+        vectors = np.bincount(cell_rows * self.dim + columns[cell_terms],
+                              weights=(1.0 + np.log(counts)) * signs[cell_terms],
+                              minlength=n_rows * self.dim)
+        return _normalize(vectors.reshape(n_rows, self.dim)).astype(np.float32)
+
+
+class ModelEmbedder:
+    """
+    Embeddings served by the model backend.
+    """
+
+    def __init__(self, backend, batch_size: int = EMBED_BATCH_SIZE):
+        """
+        Initialize the embedder.
+
+        Args:
+            backend: ``ModelBackend`` implementing ``embed``
+            batch_size: Texts per request
+        """
+        require_numpy()
+        self.backend = backend
+        self.batch_size = batch_size
+        self.name = f"{backend.name}:{backend.embedding_model}"
+
+    def embed(self, sources: Sequence[Dict[str, Any]]) -> 'np.ndarray':
+        """
+        Embed sources.
+
+        Raises:
+            InferenceError: If a request fails
+        """
+        texts = [source_text(source) for source in sources]
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self.backend.embed(texts[start:start + self.batch_size]))
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def create_embedder(config: Dict[str, Any], backend=None):
+    """
+    Create the embedder described by a summarizer configuration.
+
+    Args:
+        config: Summarizer configuration (``performance.embedding_dim``)
+        backend: Optional model backend; used when it has an embedding model
+
+    Returns:
+        ``ModelEmbedder`` or ``HashingEmbedder``
+    """
+    if backend is not None and getattr(backend, 'embedding_model', None):
+        return ModelEmbedder(backend)
+    return HashingEmbedder(config.get('performance', {}).get('embedding_dim', DEFAULT_DIM))
+
+
+class EmbeddingIndex:
+    """
+    Persistent vector store with an incrementally built IVF index.
+
+    Every process should create its own ``EmbeddingIndex`` instance; the
+    directory can be shared.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_DIR, nlist: int = DEFAULT_LISTS,
+                 nprobe: int = DEFAULT_PROBES, timeout: float = 30.0):
+        """
+        Open (or create) the index.
+
+        Args:
+            path: Index directory
+            nlist: Number of IVF lists (centroids)
+            nprobe: Lists scanned per lookup
+            timeout: Seconds to wait for a lock held by another process
+        """
+        require_numpy()
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._conn = sqlite3.connect(str(self.path / 'index.sqlite3'), timeout=timeout,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self.rows = 0
+        self.dim = 0
+        self.embedder: Optional[str] = None
+        self.vectors = None
+        self.lists = None
+        self.centroids = None
+        self._trained = 0
+        self._inverted = None
+        self._refresh()
+
+    # -- Storage ----------------------------------------------------------
+
+    def _meta(self) -> Dict[str, str]:
+        return dict(self._conn.execute('SELECT key, value FROM meta'))
+
+    def _refresh(self) -> None:
+        """Pick up rows and centroids written by this or another process."""
+        meta = self._meta()
+        rows = int(meta.get('rows', 0))
+        trained = int(meta.get('trained', 0))
+        self.embedder = meta.get('embedder')
+        self.dim = int(meta.get('dim', 0))
+        if rows != self.rows or self.vectors is None or trained != self._trained:
+            self.rows = rows
+            self._trained = trained
+            self._map(int(meta.get('capacity', 0)))
+            centroids = self.path / 'centroids.npy'
+            self.centroids = np.load(centroids) if trained and centroids.exists() else None
+            self._inverted = None
+
+    def _map(self, capacity: int) -> None:
+        """Memory-map the vector matrix and list assignments."""
+        self.capacity = capacity
+        if not capacity:
+            self.vectors = np.empty((0, self.dim), dtype=np.float32)
+            self.lists = np.empty(0, dtype=np.int32)
+            return
+        self.vectors = np.memmap(self.path / 'vectors.f32', dtype=np.float32, mode='r+',
+                                 shape=(capacity, self.dim))
+        self.lists = np.memmap(self.path / 'lists.i32', dtype=np.int32, mode='r+',
+                               shape=(capacity,))
+
+    def _grow(self, rows: int) -> None:
+        """Extend the files to hold at least ``rows`` vectors."""
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, 2 * self.capacity, 1024)
+        self.vectors = self.lists = None
+        for name, width in (('vectors.f32', 4 * self.dim), ('lists.i32', 4)):
+            with open(self.path / name, 'ab') as f:
+                f.truncate(capacity * width)
+        # New rows are unassigned until the index is trained
+        lists = np.memmap(self.path / 'lists.i32', dtype=np.int32, mode='r+', shape=(capacity,))
+        lists[self.capacity:] = -1
+        lists.flush()
+        del lists
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('capacity', ?)", (str(capacity),))
+        self._map(capacity)
+
+    def rows_of(self, keys: Iterable[str]) -> Dict[str, int]:
+        """Rows of the stored sources among ``keys``."""
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            found.update(self._conn.execute(
+                f"SELECT key, row FROM sources WHERE key IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def add(self, collection_id: str, sources: Sequence[Dict[str, Any]], vectors: 'np.ndarray',
+            embedder: str) -> List[int]:
+        """
+        Store the vectors of sources, replacing earlier vectors of the same source.
+
+        Args:
+            collection_id: Collection the sources belong to
+            sources: Source dictionaries
+            vectors: One unit-length row per source
+            embedder: Name of the embedder that produced the vectors
+
+        Returns:
+            Row of every source
+
+        Raises:
+            ValueError: If the index holds vectors of another embedder
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with _ImmediateTransaction(self._conn):
+            self._refresh()
+            if self.embedder is None:
+                self.embedder, self.dim = embedder, vectors.shape[1]
+                self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                       [('embedder', embedder), ('dim', str(self.dim))])
+            elif (self.embedder, self.dim) != (embedder, vectors.shape[1]):
+                raise ValueError(f"Embedding index {self.path} holds {self.embedder} vectors "
+                                 f"({self.dim} dimensions), not {embedder}")
+
+            keys = [source_key(source) for source in sources]
+            existing = self.rows_of(keys)
+            rows = []
+            for key in keys:
+                if key not in existing:
+                    existing[key] = self.rows
+                    self.rows += 1
+                rows.append(existing[key])
+            self._grow(self.rows)
+
+            row_array = np.asarray(rows, dtype=np.int64)
+            self.vectors[row_array] = vectors
+            if self.centroids is not None:
+                self.lists[row_array] = self._assign(vectors)
+            self.vectors.flush()
+            self.lists.flush()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (row, key, collection_id, url, title) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(row, key, collection_id, source.get('url'), source.get('title'))
+                 for row, key, source in zip(rows, keys, sources)])
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('rows', ?)", (str(self.rows),))
+            self._inverted = None
+
+            if self.centroids is None and self.rows >= self.nlist * MIN_TRAIN_PER_LIST:
+                self._train()
+        return rows
+
+    # -- IVF index --------------------------------------------------------
+
+    def _assign(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        """Nearest centroid of every vector."""
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_CHUNK):
+            chunk = vectors[start:start + ASSIGN_CHUNK]
+            lists[start:start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return lists
+
+    def _train(self, seed: int = 0) -> None:
+        """Train the centroids with spherical k-means and assign every row."""
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(self.rows, size=min(self.rows, MAX_TRAIN_SAMPLE),
+                                         replace=False))
+        sample = np.asarray(self.vectors[sample_rows])
+        nlist = min(self.nlist, len(sample))
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.linalg.norm(sums, axis=1) == 0
+            # Empty lists restart from random sample vectors
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = _normalize(sums).astype(np.float32)
+
+        self.centroids = centroids
+        self.lists[:self.rows] = self._assign(self.vectors[:self.rows])
+        self.lists.flush()
+        np.save(self.path / 'centroids.npy', centroids)
+        self._trained = int(self._meta().get('trained', 0)) + 1
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('trained', ?)", (str(self._trained),))
+        self._inverted = None
+        logger.info(f"Trained {nlist} IVF lists over {self.rows} vectors")
+
+    def rebuild(self) -> None:
+        """Retrain the centroids on the current vectors and reassign every row."""
+        with _ImmediateTransaction(self._conn):
+            self._refresh()
+            if self.rows:
+                self._train()
+
+    def _lists(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Rows ordered by list and the start of every list (cached)."""
+        if self._inverted is None:
+            lists = np.asarray(self.lists[:self.rows])
+            order = np.argsort(lists, kind='stable')
+            bounds = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+            self._inverted = (order, bounds)
+        return self._inverted
+
+    def search(self, queries: 'np.ndarray', k: int = 5,
+               exclude: Optional[Sequence[int]] = None) -> List[List[Tuple[int, float]]]:
+        """
+        Find the stored vectors closest to each query.
+
+        Args:
+            queries: Unit-length query vectors (one per row)
+            k: Neighbours per query
+            exclude: Optional row to leave out of each query's results
+                (e.g. the query's own row)
+
+        Returns:
+            Per query, up to ``k`` (row, cosine similarity) pairs, best first
+        """
+        self._refresh()
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        results = []
+        for i, query in enumerate(queries):
+            if self.centroids is None:
+                candidates = np.arange(self.rows)
+            else:
+                order, bounds = self._lists()
+                probes = np.argsort(self.centroids @ query)[::-1][:self.nprobe]
+                candidates = np.concatenate([order[bounds[p]:bounds[p + 1]] for p in probes])
+            if exclude is not None:
+                candidates = candidates[candidates != exclude[i]]
+            if not len(candidates):
+                results.append([])
+                continue
+            scores = self.vectors[candidates] @ query
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results.append([(int(candidates[j]), float(scores[j])) for j in top])
+        return results
+
+    def describe(self, rows: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Stored metadata (key, collection_id, url, title) of rows."""
+        rows = list(rows)
+        found = {}
+        for start in range(0, len(rows), 500):
+            chunk = rows[start:start + 500]
+            for row, key, collection_id, url, title in self._conn.execute(
+                    f"SELECT row, key, collection_id, url, title FROM sources "
+                    f"WHERE row IN ({','.join('?' * len(chunk))})", chunk):
+                found[row] = {'key': key, 'collection_id': collection_id, 'url': url, 'title': title}
+        return found
+
+    def close(self) -> None:
+        """Close the database and unmap the vector files."""
+        self.vectors = self.lists = None
+        self._conn.close()
+
+
+def _label(source: Dict[str, Any]) -> str:
+    return source.get('title') or source.get('url') or source_key(source)
+
+
+def related_sources(index: EmbeddingIndex, embedder, collection_id: str,
+                    sources: Sequence[Dict[str, Any]], k: int = 3,
+                    shown: int = 5) -> List[Dict[str, Any]]:
+    """
+    Index a collection and find the sources most similar to its top sources.
+
+    Only sources not yet in the index are embedded. The top sources are
+    those with the highest ``metadata.priority_score`` (the first sources
+    when unscored).
+
+    Args:
+        index: Embedding index
+        embedder: ``HashingEmbedder`` or ``ModelEmbedder``
+        collection_id: Collection ID
+        sources: Source dictionaries
+        k: Similar sources listed per top source
+        shown: Number of top sources
+
+    Returns:
+        Per top source: its 'title', 'url' and 'similar' sources (each with
+        'title', 'url', 'collection_id' and 'score')
+    """
+    keys = [source_key(source) for source in sources]
+    rows = index.rows_of(keys)
+    missing = [i for i, key in enumerate(keys) if key not in rows]
+    if missing:
+        new = [sources[i] for i in missing]
+        for i, row in zip(missing, index.add(collection_id, new, embedder.embed(new), embedder.name)):
+            rows[keys[i]] = row
+
+    def priority(position):
+        metadata = sources[position].get('metadata')
+        score = metadata.get('priority_score') if isinstance(metadata, dict) else None
+        return -(score if isinstance(score, (int, float)) else 0.0), position
+
+    top = sorted(range(len(sources)), key=priority)[:shown]
+    top_rows = [rows[keys[i]] for i in top]
+    matches = index.search(np.asarray(index.vectors[top_rows]), k, exclude=top_rows)
+    described = index.describe({row for found in matches for row, _ in found})
+    results = []
+    for position, found in zip(top, matches):
+        similar = [dict(title=described[row]['title'] or described[row]['url'] or described[row]['key'],
+                        url=described[row]['url'], collection_id=described[row]['collection_id'],
+                        score=round(score, 3)) for row, score in found if row in described]
+        results.append({'title': _label(sources[position]), 'url': sources[position].get('url'),
+                        'similar': similar})
+    return results
+
+
+def main():
+    """
+    Command-line interface for querying the embedding index.
+    """
+    parser = argparse.ArgumentParser(description="Query the Muninn embedding index")
+    parser.add_argument('text', nargs='?', help='Text to find similar sources for')
+    parser.add_argument('--index', default=DEFAULT_INDEX_DIR,
+                        help=f'Index directory (default: {DEFAULT_INDEX_DIR})')
+    parser.add_argument('-k', type=int, default=10, help='Similar sources to list')
+    parser.add_argument('--probes', type=int, default=DEFAULT_PROBES, help='IVF lists scanned')
+    parser.add_argument('--rebuild', action='store_true', help='Retrain the IVF centroids')
+    args = parser.parse_args()
+
+    index = EmbeddingIndex(args.index, nprobe=args.probes)
+    try:
+        if args.rebuild:
+            index.rebuild()
+        print(f"{index.rows} vectors ({index.embedder or 'empty'}), "
+              f"{'IVF' if index.centroids is not None else 'exact'} search")
+        if args.text:
+            if not (index.embedder or '').startswith('hashing-'):
+                parser.error(f"text queries need a hashing index, not {index.embedder}")
+            query = HashingEmbedder(index.dim).embed([{'content': args.text}])
+            described = None
+            for row, score in index.search(query, args.k)[0]:
+                described = index.describe([row])[row]
+                print(f"{score:.3f}  {described['collection_id']}  "
+                      f"{described['title'] or described['url'] or described['key']}")
+            if described is None:
+                print("No similar sources.")
+    finally:
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
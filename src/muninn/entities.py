@@ -0,0 +1,432 @@
+"""
+Pattern-based indicator extraction and a persistent inverted entity index.
+
+``extract_entities`` finds IP addresses, domains (including URL hosts),
+email addresses, file hashes (MD5/SHA-1/SHA-256), CVE identifiers and
+social media handles in source text. Tokens are prefiltered with cheap
+character checks and only candidates reach the precompiled patterns.
+``EntityExtractor`` spreads large collections over a process pool; only
+the text crosses process boundaries.
+
+``EntityIndex`` stores the results in SQLite as an inverted index
+(entity -> collection, source), so questions like "every collection that
+mentioned this domain" are answered with an index lookup instead of
+rescanning old collections. Re-indexing a collection replaces its postings.
+
+Usage:
+    python -m muninn.entities example.com
+    python -m muninn.entities --kind cve CVE-2024-3400 --index .cache/entities.sqlite3
+"""
+
+import argparse
+import logging
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import _ImmediateTransaction
+from .state import source_key
+
+logger = logging.getLogger(__name__)
+
+ENTITY_KINDS = ('email', 'cve', 'ipv4', 'sha256', 'sha1', 'md5', 'domain', 'handle')
+
+DEFAULT_INDEX_PATH = '.cache/entities.sqlite3'
+
+# Sources below which extraction runs in-process (pool startup dominates)
+MIN_PARALLEL_SOURCES = 2000
+
+# Texts per worker task
+EXTRACT_CHUNK_SIZE = 256
+
+# Dotted names that are file names rather than domains
+FILE_EXTENSIONS = frozenset((
+    'bat', 'bin', 'dll', 'doc', 'docx', 'exe', 'gif', 'htm', 'html', 'jpeg', 'jpg', 'js', 'json',
+    'log', 'php', 'png', 'ps1', 'py', 'sh', 'txt', 'xls', 'xlsx', 'xml', 'pdf',
+))
+
+_OCTET = r'(?:25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])'
+_LABEL = r'[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?'
+_DOMAIN = r'(?:' + _LABEL + r'\.)+[a-z]{2,24}'
+
+# Anchored patterns applied to candidate tokens only
+_IPV4 = re.compile(_OCTET + r'(?:\.' + _OCTET + r'){3}').fullmatch
+_DOMAIN_MATCH = re.compile(_DOMAIN, re.IGNORECASE).fullmatch
+_EMAIL = re.compile(r'[a-z0-9._%+-]+@' + _DOMAIN, re.IGNORECASE).fullmatch
+_CVE = re.compile(r'CVE-[0-9]{4}-[0-9]{4,7}', re.IGNORECASE).fullmatch
+_HANDLE = re.compile(r'@[a-z0-9_]{2,30}', re.IGNORECASE).fullmatch
+_HEX = re.compile(r'[a-f0-9]+', re.IGNORECASE).fullmatch
+_URL_HOST = re.compile(r'[a-z][a-z0-9+.-]*://(?:[^/@\s]*@)?([^/:?#\s]+)', re.IGNORECASE).match
+
+_HASH_KINDS = {32: 'md5', 40: 'sha1', 64: 'sha256'}
+
+# Punctuation around tokens in running text
+_PUNCTUATION = '.,;:!?()[]{}<>"\'`*'
+
+# Kinds normalized to upper case; all others are lower-cased
+_UPPER_KINDS = ('cve',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (value, kind)
+);
+CREATE TABLE IF NOT EXISTS collections (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    entity_id INTEGER NOT NULL,
+    collection_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    mentions INTEGER NOT NULL,
+    PRIMARY KEY (entity_id, collection_id, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_collection ON postings (collection_id);
+"""
+
+Entity = Tuple[str, str]
+
+
+def classify_token(token: str) -> Optional[Entity]:
+    """
+    Classify one whitespace-delimited token.
+
+    Args:
+        token: Token with surrounding punctuation already stripped
+
+    Returns:
+        (kind, normalized value), or None if the token is no indicator
+    """
+    if '@' in token:
+        if token[0] == '@':
+            return ('handle', token.lower()) if _HANDLE(token) else None
+        return ('email', token.lower()) if _EMAIL(token) else None
+    if '.' in token:
+        if '/' in token:
+            url = _URL_HOST(token)
+            token = url.group(1) if url else token.split('/', 1)[0]
+        if token[0].isdigit() and _IPV4(token):
+            return 'ipv4', token
+        if _DOMAIN_MATCH(token) and token.rsplit('.', 1)[1].lower() not in FILE_EXTENSIONS:
+            return 'domain', token.lower()
+        return None
+    if token[:4] in ('CVE-', 'cve-'):
+        return ('cve', token.upper()) if _CVE(token) else None
+    kind = _HASH_KINDS.get(len(token))
+    if kind is not None and _HEX(token):
+        return kind, token.lower()
+    return None
+
+
+def extract_entities(text: Optional[str]) -> List[Tuple[str, str, int]]:
+    """
+    Extract indicators from a text.
+
+    The text is split on whitespace and only tokens containing ``@`` or
+    ``.``, starting with ``CVE-`` or about as long as a hash are matched
+    against the anchored patterns, so ordinary words cost a few character checks.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        List of (kind, normalized value, mentions), in order of first appearance
+    """
+    if not text:
+        return []
+    found: Dict[Entity, int] = {}
+    for token in text.split():
+        # Hashes may carry a few punctuation characters until stripped
+        if '@' not in token and '.' not in token and not 31 < len(token) < 68 \
+                and 'CVE-' not in token[:5].upper():
+            continue
+        token = token.strip(_PUNCTUATION)
+        if not token:
+            continue
+        entity = classify_token(token)
+        if entity is not None:
+            found[entity] = found.get(entity, 0) + 1
+    return [(kind, value, mentions) for (kind, value), mentions in found.items()]
+
+
+def source_text(source: Dict[str, Any]) -> str:
+    """Text of a source scanned for entities (title and content)."""
+    title = source.get('title') or ''
+    content = source.get('content') or ''
+    return f"{title}\n{content}" if title else content
+
+
+def _extract_many(texts: List[str]) -> List[List[Tuple[str, str, int]]]:
+    """Extract entities from several texts (runs in a worker process)."""
+    return [extract_entities(text) for text in texts]
+
+
+class EntityExtractor:
+    """
+    Extract entities from many sources, in parallel for large collections.
+
+    The process pool is started once the extractor has seen
+    ``min_parallel`` sources, so a collection extracted chunk by chunk (as
+    in the async pipeline) switches to the pool part of the way through
+    and keeps it for every later chunk. ``close`` (or leaving a ``with``
+    block) shuts the pool down.
+    """
+
+    def __init__(self, workers: Optional[int] = None,
+                 min_parallel: int = MIN_PARALLEL_SOURCES):
+        """
+        Initialize the extractor.
+
+        Args:
+            workers: Worker processes (default: CPU count)
+            min_parallel: Sources seen before a process pool is worth starting
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self.seen = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'EntityExtractor':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def extract(self, sources: Iterable[Dict[str, Any]]) -> List[List[Tuple[str, str, int]]]:
+        """
+        Extract entities from every source.
+
+        Args:
+            sources: Source dictionaries
+
+        Returns:
+            One list of (kind, value, mentions) per source, in input order
+        """
+        texts = [source_text(source) for source in sources]
+        self.seen += len(texts)
+        if self.workers <= 1 or self.seen < self.min_parallel or not texts:
+            return _extract_many(texts)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunks = [texts[i:i + EXTRACT_CHUNK_SIZE] for i in range(0, len(texts), EXTRACT_CHUNK_SIZE)]
+        results: List[List[Tuple[str, str, int]]] = []
+        for chunk_results in self._pool.map(_extract_many, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Shut down the process pool, if one was started.
+
+        Args:
+            wait: Wait for the worker processes to exit
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+class EntityIndex:
+    """
+    Persistent inverted index from entities to collections and sources.
+
+    Every process should create its own ``EntityIndex`` instance; the
+    database file can be shared.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, timeout: float = 30.0):
+        """
+        Open (or create) the index.
+
+        Args:
+            path: SQLite database file
+            timeout: Seconds to wait for a lock held by another process
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        logger.debug(f"Opened entity index at {self.path}")
+
+    def add(self, collection_id: str, sources: List[Dict[str, Any]],
+            entities: List[List[Tuple[str, str, int]]]) -> int:
+        """
+        Index (or re-index) the entities of a collection.
+
+        Args:
+            collection_id: Collection the sources belong to
+            sources: Source dictionaries
+            entities: Output of ``EntityExtractor.extract`` for ``sources``
+
+        Returns:
+            Number of postings written
+        """
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        conn = self._conn
+        with _ImmediateTransaction(conn):
+            conn.execute('INSERT INTO collections (name, indexed_at) VALUES (?, ?) '
+                         'ON CONFLICT (name) DO UPDATE SET indexed_at = excluded.indexed_at',
+                         (collection_id, now))
+            collection = conn.execute('SELECT id FROM collections WHERE name = ?',
+                                      (collection_id,)).fetchone()[0]
+            conn.execute('DELETE FROM postings WHERE collection_id = ?', (collection,))
+
+            distinct = {(kind, value) for found in entities for kind, value, _ in found}
+            conn.executemany('INSERT OR IGNORE INTO entities (kind, value) VALUES (?, ?)', distinct)
+            ids: Dict[Entity, int] = {}
+            for kind, value in distinct:
+                ids[(kind, value)] = conn.execute(
+                    'SELECT id FROM entities WHERE value = ? AND kind = ?', (value, kind)).fetchone()[0]
+
+            postings: Dict[Tuple[int, str], int] = {}
+            for source, found in zip(sources, entities):
+                key = source_key(source)
+                for kind, value, mentions in found:
+                    posting = (ids[(kind, value)], key)
+                    postings[posting] = postings.get(posting, 0) + mentions
+            conn.executemany(
+                'INSERT INTO postings (entity_id, collection_id, source, mentions) VALUES (?, ?, ?, ?)',
+                [(entity, collection, key, mentions) for (entity, key), mentions in postings.items()])
+        logger.info(f"Indexed {len(distinct)} entities ({len(postings)} postings) "
+                    f"for collection {collection_id}")
+        return len(postings)
+
+    def lookup(self, value: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find every source mentioning an entity.
+
+        Args:
+            value: Entity value (normalized like extracted values)
+            kind: Optional entity kind to restrict the match to
+
+        Returns:
+            Postings with kind, value, collection, source and mentions,
+            most recently indexed collections first
+        """
+        normalized = value.upper() if kind in _UPPER_KINDS else value.lower()
+        query = ('SELECT e.kind, e.value, c.name, p.source, p.mentions FROM entities e '
+                 'JOIN postings p ON p.entity_id = e.id JOIN collections c ON c.id = p.collection_id '
+                 'WHERE e.value IN (?, ?)')
+        params: Tuple[Any, ...] = (normalized, value.upper())
+        if kind is not None:
+            query += ' AND e.kind = ?'
+            params += (kind,)
+        query += ' ORDER BY c.indexed_at DESC, c.name, p.source'
+        return [{'kind': row[0], 'value': row[1], 'collection_id': row[2],
+                 'source': row[3], 'mentions': row[4]}
+                for row in self._conn.execute(query, params)]
+
+    def collections(self, value: str, kind: Optional[str] = None) -> List[str]:
+        """
+        Collections mentioning an entity.
+
+        Args:
+            value: Entity value
+            kind: Optional entity kind
+
+        Returns:
+            Collection IDs, most recently indexed first
+        """
+        return list(dict.fromkeys(posting['collection_id'] for posting in self.lookup(value, kind)))
+
+    def top_entities(self, collection_id: Optional[str] = None,
+                     limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Most widely mentioned entities, overall or within one collection.
+
+        Args:
+            collection_id: Optional collection to restrict to
+            limit: Maximum number of entities
+
+        Returns:
+            Entities with kind, value, number of sources and mentions
+        """
+        query = ('SELECT e.kind, e.value, COUNT(*), SUM(p.mentions) FROM postings p '
+                 'JOIN entities e ON e.id = p.entity_id')
+        params: Tuple[Any, ...] = ()
+        if collection_id is not None:
+            query += ' JOIN collections c ON c.id = p.collection_id WHERE c.name = ?'
+            params = (collection_id,)
+        query += ' GROUP BY p.entity_id ORDER BY COUNT(*) DESC, SUM(p.mentions) DESC, e.value LIMIT ?'
+        return [{'kind': row[0], 'value': row[1], 'sources': row[2], 'mentions': row[3]}
+                for row in self._conn.execute(query, params + (limit,))]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+def index_collection(collection_id: str, sources: List[Dict[str, Any]],
+                     config: Optional[Dict[str, Any]] = None,
+                     entities: Optional[List[List[Tuple[str, str, int]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Extract entities from a collection and add them to the index.
+
+    Args:
+        collection_id: Collection ID
+        sources: Source dictionaries
+        config: Optional settings: ``entity_index`` (database path),
+            ``entity_workers`` (processes, default CPU count) and
+            ``max_entities`` (entities returned, default 20)
+        entities: Already extracted entities of ``sources``, if any
+
+    Returns:
+        The collection's most widely mentioned entities
+    """
+    config = config or {}
+    if entities is None:
+        with EntityExtractor(config.get('entity_workers')) as extractor:
+            entities = extractor.extract(sources)
+    index = EntityIndex(config.get('entity_index') or DEFAULT_INDEX_PATH)
+    try:
+        index.add(collection_id, sources, entities)
+        return index.top_entities(collection_id, config.get('max_entities', 20))
+    finally:
+        index.close()
+
+
+def format_entity(entity: Dict[str, Any]) -> str:
+    """Report line for an entry of ``EntityIndex.top_entities``."""
+    sources = entity['sources']
+    return f"{entity['value']} ({entity['kind']}, {sources} source{'s' if sources != 1 else ''})"
+
+
+def main():
+    """
+    Command-line interface for querying the entity index.
+    """
+    parser = argparse.ArgumentParser(description="Query the Muninn entity index")
+    parser.add_argument('value', nargs='?', help='Entity to look up (omit to list top entities)')
+    parser.add_argument('-k', '--kind', choices=ENTITY_KINDS, help='Entity kind')
+    parser.add_argument('--collection', help='Restrict top entities to a collection')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH,
+                        help=f'Index database (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('-n', '--limit', type=int, default=20, help='Top entities to list')
+    args = parser.parse_args()
+
+    index = EntityIndex(args.index)
+    try:
+        if args.value:
+            for posting in index.lookup(args.value, args.kind):
+                print(f"{posting['collection_id']}\t{posting['source']}\t"
+                      f"{posting['kind']}\t{posting['mentions']}")
+        else:
+            for entity in index.top_entities(args.collection, args.limit):
+                print(f"{entity['sources']}\t{entity['kind']}\t{entity['value']}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
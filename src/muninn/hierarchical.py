@@ -0,0 +1,194 @@
+"""
+Hierarchical map-reduce summarization.
+
+Collections with thousands of sources cannot fit into one prompt. The
+``HierarchicalSummarizer`` packs source texts into token-budgeted chunks,
+summarizes the chunks in parallel (map), and then repeatedly merges groups
+of partial summaries (reduce) until a single executive summary remains.
+
+Reduction is streamed like a binary counter: partial summaries are pushed
+onto per-level buffers and a level is reduced as soon as it holds
+``fan_in`` summaries. Only ``O(fan_in * log(N))`` partial summaries are held
+at any time, and the number of sequential model round trips grows with the
+tree depth, ``log_fan_in(N)``, rather than with ``N``.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .inference import CHARS_PER_TOKEN, InferenceExecutor, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Tokens reserved for prompt instructions around the chunk text
+PROMPT_OVERHEAD_TOKENS = 200
+
+MAP_PROMPT = """You are an OSINT analyst. Summarize the key intelligence in the
+following sources in a short paragraph. Focus on threats, actors, indicators
+and notable events.
+
+{text}
+"""
+
+REDUCE_PROMPT = """You are an OSINT analyst. Merge the following partial
+intelligence summaries into one concise executive summary. Remove repetition
+and keep the most significant points.
+
+{text}
+"""
+
+
+def chunk_by_tokens(texts: Iterable[str], budget: int,
+                    max_items: Optional[int] = None) -> Iterator[List[str]]:
+    """
+    Greedily pack texts into chunks that fit a token budget.
+
+    Texts longer than the budget on their own are truncated.
+
+    Args:
+        texts: Texts to pack
+        budget: Maximum estimated tokens per chunk
+        max_items: Optional maximum number of texts per chunk
+
+    Yields:
+        Lists of texts
+    """
+    max_chars = budget * CHARS_PER_TOKEN
+    chunk: List[str] = []
+    used = 0
+    for text in texts:
+        if len(text) > max_chars:
+            text = text[:max_chars]
+        tokens = estimate_tokens(text)
+        if chunk and (used + tokens > budget or (max_items and len(chunk) >= max_items)):
+            yield chunk
+            chunk = []
+            used = 0
+        chunk.append(text)
+        used += tokens
+    if chunk:
+        yield chunk
+
+
+def source_text(source: Dict[str, Any]) -> str:
+    """Render a source as a single line of text for summarization."""
+    title = source.get('title')
+    content = ' '.join((source.get('content') or '').split())
+    label = source.get('type', 'unknown')
+    if source.get('platform'):
+        label = f"{label}/{source['platform']}"
+    return f"- [{label}] {title + ': ' if title else ''}{content}"
+
+
+class HierarchicalSummarizer:
+    """
+    Map-reduce summarizer built on an ``InferenceExecutor``.
+
+    Chunk size is derived from the model configuration: each prompt may use
+    the context window minus the space reserved for the generated partial
+    summary and ``PROMPT_OVERHEAD_TOKENS``.
+    """
+
+    def __init__(self, executor: InferenceExecutor, model_config: Optional[Dict[str, Any]] = None,
+                 fan_in: int = 8, window: Optional[int] = None):
+        """
+        Initialize the summarizer.
+
+        Args:
+            executor: Executor used for all model calls
+            model_config: Model settings (``context_window``, ``max_tokens``)
+            fan_in: Maximum partial summaries merged per reduce call
+            window: Map chunks submitted to the executor at once
+                (default: ``workers * batch_size``)
+        """
+        model_config = model_config or {}
+        self.executor = executor
+        self.fan_in = max(2, fan_in)
+        context_window = model_config.get('context_window', 4096)
+        # Partial summaries only need a fraction of the context window
+        self.output_tokens = min(model_config.get('max_tokens', 2000), context_window // 4)
+        self.budget = max(context_window - self.output_tokens - PROMPT_OVERHEAD_TOKENS, 64)
+        self.window = window or executor.workers * executor.batch_size
+        self.stats = {'map_calls': 0, 'reduce_calls': 0, 'depth': 0, 'max_buffered': 0}
+
+    def summarize(self, texts: Iterable[str]) -> str:
+        """
+        Summarize an arbitrarily long stream of texts.
+
+        Args:
+            texts: Source texts (see ``source_text``)
+
+        Returns:
+            Executive summary, or an empty string if every model call failed
+        """
+        levels: List[List[str]] = []
+        window: List[List[str]] = []
+        for chunk in chunk_by_tokens(texts, self.budget):
+            window.append(chunk)
+            if len(window) >= self.window:
+                self._push(levels, 0, self._map(window))
+                window = []
+        if window:
+            self._push(levels, 0, self._map(window))
+
+        summary = self._finish(levels)
+        logger.info(f"Hierarchical summary: {self.stats['map_calls']} map calls, "
+                    f"{self.stats['reduce_calls']} reduce calls, depth {self.stats['depth']}")
+        return summary
+
+    def merge(self, summaries: List[str]) -> str:
+        """
+        Merge existing summaries (e.g. a previous run's and a delta's) into one.
+
+        Args:
+            summaries: Summaries to combine; empty entries are ignored
+
+        Returns:
+            Combined summary
+        """
+        return self._finish([[summary for summary in summaries if summary]])
+
+    def _map(self, chunks: List[List[str]]) -> List[str]:
+        self.stats['map_calls'] += len(chunks)
+        return self._run([MAP_PROMPT.format(text='\n'.join(chunk)) for chunk in chunks])
+
+    def _reduce(self, summaries: List[str]) -> List[str]:
+        groups = list(chunk_by_tokens(summaries, self.budget, self.fan_in))
+        if len(summaries) > 1 and len(groups) == len(summaries):
+            # Every summary fills a prompt on its own, so merging would make
+            # no progress; shorten them until two fit one prompt
+            logger.warning("Partial summaries too long to merge, truncating them")
+            limit = self.budget // 2 * CHARS_PER_TOKEN
+            groups = list(chunk_by_tokens([summary[:limit] for summary in summaries],
+                                          self.budget, self.fan_in))
+        self.stats['reduce_calls'] += len(groups)
+        return self._run([REDUCE_PROMPT.format(text='\n\n'.join(group)) for group in groups])
+
+    def _run(self, prompts: List[str]) -> List[str]:
+        # Cap partial summaries so at least two always fit one reduce prompt
+        max_chars = self.output_tokens * CHARS_PER_TOKEN
+        responses = self.executor.run(prompts)
+        return [r.strip()[:max_chars] for r in responses if r and r.strip()]
+
+    def _push(self, levels: List[List[str]], level: int, summaries: List[str]) -> None:
+        """Add summaries to a level and reduce every full group upward."""
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].extend(summaries)
+        self.stats['depth'] = max(self.stats['depth'], len(levels))
+        self.stats['max_buffered'] = max(self.stats['max_buffered'], sum(len(l) for l in levels))
+
+        full = len(levels[level]) - len(levels[level]) % self.fan_in
+        if full:
+            ready, levels[level] = levels[level][:full], levels[level][full:]
+            self._push(levels, level + 1, self._reduce(ready))
+
+    def _finish(self, levels: List[List[str]]) -> str:
+        """Collapse the partial summaries left on every level into one."""
+        # Higher levels cover more sources, so they lead the final prompt
+        remaining = [summary for level in reversed(levels) for summary in level]
+        while len(remaining) > 1:
+            # Each reduce call merges at least two summaries (see _reduce)
+            remaining = self._reduce(remaining)
+            self.stats['depth'] += 1
+        return remaining[0] if remaining else ''
@@ -0,0 +1,200 @@
+"""
+Pooled keep-alive HTTP client for model backends.
+
+Opening a fresh TCP connection for every prompt adds a handshake round trip
+to each model call. ``ConnectionPool`` keeps a small set of persistent
+HTTP/1.1 connections to one host and hands them out to threads, so
+concurrent inference workers reuse warm connections. Responses can be read
+whole or streamed line by line (as produced by Ollama's NDJSON token
+stream); the connection returns to the pool once the response is consumed.
+"""
+
+import http.client
+import json
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Errors indicating that a reused keep-alive connection was closed by the server
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class HTTPError(Exception):
+    """Raised for non-2xx HTTP responses."""
+
+    def __init__(self, status: int, reason: str, body: bytes = b''):
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive connections to a single host.
+
+    At most ``maxsize`` connections are kept idle; extra connections opened
+    under load are closed when released. ``maxsize=0`` disables pooling, so
+    every request opens a new connection.
+    """
+
+    def __init__(self, base_url: str, maxsize: int = 4, timeout: float = 60.0):
+        """
+        Initialize the pool.
+
+        Args:
+            base_url: Scheme, host and port (e.g. ``http://localhost:11434``)
+            maxsize: Maximum number of idle connections kept open (0 disables pooling)
+            timeout: Default socket timeout in seconds
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported URL scheme: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle: 'queue.LifoQueue[http.client.HTTPConnection]' = queue.LifoQueue(max(maxsize, 1))
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _new_connection(self, timeout: float) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        with self._lock:
+            self.created += 1
+        return cls(self.host, self.port, timeout=timeout)
+
+    def _acquire(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection (reused=True) or a new one."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._new_connection(timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        if self.maxsize <= 0:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> Iterator[http.client.HTTPResponse]:
+        """
+        Send a request and yield the response.
+
+        The connection is returned to the pool if the response was fully
+        read, and closed otherwise. A reused connection that turns out to be
+        closed by the server is transparently replaced once.
+
+        Args:
+            method: HTTP method
+            path: Request path relative to the base URL
+            body: Optional request body
+            headers: Optional request headers
+            timeout: Socket timeout in seconds (default: pool timeout)
+
+        Yields:
+            ``http.client.HTTPResponse`` with a 2xx status
+
+        Raises:
+            HTTPError: For non-2xx responses
+        """
+        timeout = timeout or self.timeout
+        headers = dict(headers or {})
+        if body is not None:
+            headers.setdefault('Content-Length', str(len(body)))
+        conn, reused = self._acquire(timeout)
+        try:
+            try:
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+                response = conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                logger.debug("Reused connection was closed by server, reconnecting")
+                conn.close()
+                conn = self._new_connection(timeout)
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+                response = conn.getresponse()
+
+            if not 200 <= response.status < 300:
+                raise HTTPError(response.status, response.reason, response.read())
+            yield response
+        except BaseException:
+            conn.close()
+            raise
+        if response.isclosed() and not response.will_close:
+            self._release(conn)
+        else:
+            conn.close()
+
+    def request_json(self, method: str, path: str, payload: Any,
+                     timeout: Optional[float] = None) -> Any:
+        """
+        Send a JSON request and decode the JSON response.
+
+        Args:
+            method: HTTP method
+            path: Request path relative to the base URL
+            payload: JSON-serializable request body
+            timeout: Socket timeout in seconds
+
+        Returns:
+            Decoded response body
+        """
+        body = json.dumps(payload).encode('utf-8')
+        with self.request(method, path, body, {'Content-Type': 'application/json'}, timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def stream_json_lines(self, method: str, path: str, payload: Any,
+                          timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Send a JSON request and yield each line of an NDJSON response.
+
+        Args:
+            method: HTTP method
+            path: Request path relative to the base URL
+            payload: JSON-serializable request body
+            timeout: Socket timeout in seconds
+
+        Yields:
+            Decoded JSON objects as they arrive
+        """
+        body = json.dumps(payload).encode('utf-8')
+        with self.request(method, path, body, {'Content-Type': 'application/json'}, timeout) as response:
+            for line in response:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            # Drain the terminating chunk so the connection can be reused
+            response.read()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
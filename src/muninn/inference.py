@@ -0,0 +1,461 @@
+"""
+Model inference backends and batched concurrent executor.
+
+``InferenceExecutor`` groups prompts into batches of ``performance.batch_size``
+and processes them with ``performance.workers`` concurrent asyncio workers.
+Batches flow through a bounded queue, so the producer never runs more than a
+few batches ahead of the workers (backpressure). Every request gets its own
+timeout and is retried with exponential backoff; prompts that still fail
+yield ``None`` instead of aborting the whole run.
+
+Backends are deliberately synchronous and dependency-free; the executor runs
+them in a thread pool sized to the worker count. HTTP backends share one
+keep-alive ``ConnectionPool`` so concurrent workers reuse warm connections.
+
+With an ``on_token`` callback (``performance.progress``: a ``TokenProgress``
+that logs the model's output rate), completions are streamed and every
+fragment is reported as it arrives instead of once the response is complete.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .http_client import ConnectionPool, HTTPError
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text
+CHARS_PER_TOKEN = 4
+
+# Seconds between two progress lines of ``TokenProgress``
+PROGRESS_INTERVAL = 5.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of model tokens in a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class InferenceError(Exception):
+    """Raised when a model backend request fails."""
+
+
+class ModelBackend:
+    """
+    Base class for model backends.
+
+    Subclasses implement ``generate`` for a single prompt, and ``embed``
+    if they serve embeddings (``embedding_model`` names the model).
+    """
+
+    name = 'base'
+    embedding_model: Optional[str] = None
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """
+        Generate a completion for one prompt.
+
+        Args:
+            prompt: Prompt text
+            timeout: Optional request timeout in seconds
+
+        Returns:
+            Generated text
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Generate a completion, yielding text fragments as they are produced.
+
+        Backends without native streaming yield the full completion once.
+
+        Args:
+            prompt: Prompt text
+            timeout: Optional request timeout in seconds
+
+        Yields:
+            Generated text fragments
+        """
+        yield self.generate(prompt, timeout)
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """
+        Embed texts with ``embedding_model``.
+
+        Args:
+            texts: Texts to embed
+            timeout: Optional request timeout in seconds
+
+        Returns:
+            One vector per text
+        """
+        raise NotImplementedError
+
+    def generate_streaming(self, prompt: str, on_token: Callable[[str], None],
+                           timeout: Optional[float] = None) -> str:
+        """
+        Generate a completion, passing each fragment to ``on_token`` on arrival.
+
+        Args:
+            prompt: Prompt text
+            on_token: Callback invoked with every text fragment
+            timeout: Optional request timeout in seconds
+
+        Returns:
+            The complete generated text
+        """
+        parts = []
+        for token in self.stream(prompt, timeout):
+            on_token(token)
+            parts.append(token)
+        return ''.join(parts)
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class OllamaBackend(ModelBackend):
+    """Backend for the Ollama ``/api/generate`` endpoint."""
+
+    name = 'ollama'
+
+    def __init__(self, api_url: str = 'http://localhost:11434', model: str = 'llama2',
+                 temperature: float = 0.7, max_tokens: int = 2000, timeout: float = 60.0,
+                 pool_size: int = 4, embedding_model: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            api_url: Base URL of the Ollama server
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate per request
+            timeout: Default request timeout in seconds
+            pool_size: Keep-alive connections kept open (0 disables pooling)
+            embedding_model: Model served by ``/api/embed`` (None disables ``embed``)
+        """
+        self.api_url = api_url.rstrip('/')
+        self.model = model
+        self.embedding_model = embedding_model or None
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.pool = ConnectionPool(self.api_url, maxsize=pool_size, timeout=timeout)
+
+    def _payload(self, prompt: str, stream: bool = False) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'prompt': prompt,
+            'stream': stream,
+            'options': {'temperature': self.temperature, 'num_predict': self.max_tokens},
+        }
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        try:
+            body = self.pool.request_json('POST', '/api/generate', self._payload(prompt),
+                                          timeout or self.timeout)
+        except (HTTPError, OSError, ValueError) as e:
+            raise InferenceError(f"Ollama request failed: {e}") from e
+        return body.get('response', '')
+
+    def stream(self, prompt: str, timeout: Optional[float] = None) -> Iterator[str]:
+        try:
+            for chunk in self.pool.stream_json_lines('POST', '/api/generate',
+                                                     self._payload(prompt, stream=True),
+                                                     timeout or self.timeout):
+                # Keep reading past the final 'done' chunk so the connection
+                # is fully drained and can return to the pool
+                if chunk.get('response'):
+                    yield chunk['response']
+        except (HTTPError, OSError, ValueError) as e:
+            raise InferenceError(f"Ollama request failed: {e}") from e
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        if not self.embedding_model:
+            raise NotImplementedError("No embedding model configured")
+        try:
+            body = self.pool.request_json('POST', '/api/embed',
+                                          {'model': self.embedding_model, 'input': texts},
+                                          timeout or self.timeout)
+        except (HTTPError, OSError, ValueError) as e:
+            raise InferenceError(f"Ollama embedding request failed: {e}") from e
+        embeddings = body.get('embeddings')
+        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+            raise InferenceError("Ollama returned no embeddings")
+        return embeddings
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def create_backend(config: Dict[str, Any]) -> Optional[ModelBackend]:
+    """
+    Create the model backend described by a summarizer configuration.
+
+    Args:
+        config: Summarizer configuration (``model_type`` and ``model`` section)
+
+    Returns:
+        Backend instance, or None if no backend endpoint is configured
+    """
+    model = config.get('model', {})
+    model_type = config.get('model_type', model.get('type'))
+    if model_type == 'ollama' and model.get('api_url'):
+        return OllamaBackend(
+            api_url=model['api_url'],
+            model=model.get('name', 'llama2'),
+            temperature=model.get('temperature', 0.7),
+            max_tokens=model.get('max_tokens', 2000),
+            timeout=model.get('timeout', 60.0),
+            pool_size=config.get('performance', {}).get('workers', 4),
+            embedding_model=model.get('embedding_model'),
+        )
+    return None
+
+
+class TokenProgress:
+    """
+    ``on_token`` callback logging the amount and rate of streamed model output.
+
+    Safe to share between the executor's worker threads.
+    """
+
+    def __init__(self, interval: float = PROGRESS_INTERVAL):
+        """
+        Initialize the progress reporter.
+
+        Args:
+            interval: Minimum seconds between two progress lines
+        """
+        self.interval = interval
+        self.chars = 0
+        self.fragments = 0
+        self._start = self._last = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens streamed so far."""
+        return math.ceil(self.chars / CHARS_PER_TOKEN)
+
+    def __call__(self, fragment: str) -> None:
+        with self._lock:
+            self.chars += len(fragment)
+            self.fragments += 1
+            now = time.perf_counter()
+            if now - self._last < self.interval:
+                return
+            self._last = now
+            tokens = self.tokens
+        logger.info(f"Model output: ~{tokens} tokens streamed "
+                    f"({tokens / max(now - self._start, 1e-9):.1f} tokens/s)")
+
+
+class InferenceExecutor:
+    """
+    Batched, concurrent runner for model prompts.
+
+    Results are returned in prompt order. The executor stops sending requests
+    after ``max_consecutive_failures`` failed prompts in a row, so an
+    unreachable backend fails fast instead of retrying every prompt.
+    """
+
+    def __init__(self, backend: ModelBackend, workers: int = 4, batch_size: int = 10,
+                 timeout: float = 60.0, retries: int = 2, backoff: float = 0.5,
+                 max_consecutive_failures: Optional[int] = None,
+                 on_token: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            backend: Model backend used for every prompt
+            workers: Number of concurrent workers (``performance.workers``)
+            batch_size: Prompts per batch (``performance.batch_size``)
+            timeout: Per-request timeout in seconds
+            retries: Retries per prompt after the first attempt
+            backoff: Initial retry delay in seconds, doubled on every retry
+            max_consecutive_failures: Failed prompts in a row before giving up
+                on the backend (default: ``2 * workers``)
+            on_token: Optional callback receiving every completion fragment
+                as it is streamed (see ``ModelBackend.generate_streaming``)
+        """
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_consecutive_failures = max_consecutive_failures or 2 * self.workers
+        self.on_token = on_token
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'seconds': 0.0,
+                      'prompt_tokens': 0, 'completion_tokens': 0}
+        self._consecutive_failures = 0
+
+    @classmethod
+    def from_config(cls, backend: ModelBackend, config: Dict[str, Any]) -> 'InferenceExecutor':
+        """
+        Create an executor from a summarizer configuration.
+
+        Args:
+            backend: Model backend
+            config: Summarizer configuration (``model`` and ``performance`` sections)
+        """
+        model = config.get('model', {})
+        performance = config.get('performance', {})
+        return cls(
+            backend,
+            workers=performance.get('workers', 4),
+            batch_size=performance.get('batch_size', 10),
+            timeout=model.get('timeout', 60.0),
+            retries=model.get('retries', 2),
+            on_token=TokenProgress() if performance.get('progress', False) else None,
+        )
+
+    @property
+    def circuit_open(self) -> bool:
+        """True once the backend has failed too many prompts in a row."""
+        return self._consecutive_failures >= self.max_consecutive_failures
+
+    def batches(self, prompts: Iterable[str]) -> Iterable[List[Tuple[int, str]]]:
+        """Group prompts into indexed batches of ``batch_size``."""
+        batch: List[Tuple[int, str]] = []
+        for index, prompt in enumerate(prompts):
+            batch.append((index, prompt))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def run(self, prompts: Iterable[str],
+            on_batch: Optional[Callable[[List[Tuple[int, Optional[str]]]], None]] = None
+            ) -> List[Optional[str]]:
+        """
+        Run prompts to completion from synchronous code.
+
+        Args:
+            prompts: Prompt strings
+            on_batch: Optional callback invoked with the (prompt index,
+                completion) pairs of every finished batch
+
+        Returns:
+            Completions in prompt order (None where a prompt failed)
+        """
+        return asyncio.run(self.run_async(prompts, on_batch))
+
+    async def run_async(self, prompts: Iterable[str],
+                        on_batch: Optional[Callable[[List[Tuple[int, Optional[str]]]], None]] = None
+                        ) -> List[Optional[str]]:
+        """
+        Run prompts concurrently with a bounded number of workers.
+
+        Args:
+            prompts: Prompt strings
+            on_batch: Optional callback invoked with the (prompt index,
+                completion) pairs of every finished batch
+
+        Returns:
+            Completions in prompt order (None where a prompt failed)
+        """
+        results: Dict[int, Optional[str]] = {}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        self._consecutive_failures = 0
+        count = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='muninn-inference') as pool:
+            async def worker() -> None:
+                while True:
+                    batch = await queue.get()
+                    try:
+                        if batch is None:
+                            return
+                        await self._run_batch(loop, pool, batch, results, on_batch)
+                    finally:
+                        queue.task_done()
+
+            async def produce() -> None:
+                nonlocal count
+                for batch in self.batches(prompts):
+                    count += len(batch)
+                    await queue.put(batch)
+                for _ in tasks:
+                    await queue.put(None)
+
+            tasks = [asyncio.ensure_future(worker()) for _ in range(self.workers)]
+            # The producer is a task too, so a dying worker cancels it instead
+            # of leaving it blocked on a full queue
+            producer = asyncio.ensure_future(produce())
+            try:
+                await asyncio.gather(producer, *tasks)
+            finally:
+                for task in (producer, *tasks):
+                    task.cancel()
+
+        self.stats['seconds'] += time.perf_counter() - start
+        return [results.get(index) for index in range(count)]
+
+    async def _run_batch(self, loop, pool, batch: List[Tuple[int, str]],
+                         results: Dict[int, Optional[str]],
+                         on_batch: Optional[Callable[[List[Tuple[int, Optional[str]]]], None]]
+                         ) -> None:
+        """
+        Run one batch and report it to ``on_batch``.
+
+        An unexpected error from the backend or the callback fails the
+        batch's prompts (None) instead of stopping the worker.
+        """
+        try:
+            for index, prompt in batch:
+                results[index] = await self._call(loop, pool, prompt)
+            if on_batch is not None:
+                on_batch([(index, results[index]) for index, _ in batch])
+        except Exception as e:
+            logger.error(f"Inference batch of {len(batch)} prompts failed: {e}")
+            for index, _ in batch:
+                # Prompts already None were counted as failures by _call
+                if results.get(index, '') is not None:
+                    self.stats['failures'] += 1
+                results[index] = None
+
+    async def _call(self, loop, pool, prompt: str) -> Optional[str]:
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            if self.circuit_open:
+                self.stats['failures'] += 1
+                return None
+            if attempt:
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+            self.stats['requests'] += 1
+            if self.on_token is not None:
+                call = partial(self.backend.generate_streaming, prompt, self.on_token, self.timeout)
+            else:
+                call = partial(self.backend.generate, prompt, self.timeout)
+            try:
+                result = await asyncio.wait_for(loop.run_in_executor(pool, call),
+                                                timeout=self.timeout)
+            except (InferenceError, asyncio.TimeoutError) as e:
+                logger.warning(f"Inference attempt {attempt + 1}/{self.retries + 1} failed: "
+                               f"{e or 'timed out'}")
+                continue
+            self._consecutive_failures = 0
+            self.stats['prompt_tokens'] += estimate_tokens(prompt)
+            self.stats['completion_tokens'] += estimate_tokens(result or '')
+            return result
+
+        self.stats['failures'] += 1
+        self._consecutive_failures += 1
+        if self.circuit_open:
+            logger.error(f"{self._consecutive_failures} consecutive inference failures, "
+                         f"skipping remaining prompts")
+        return None
@@ -0,0 +1,168 @@
+"""
+Pipeline instrumentation for Muninn runs.
+
+``PipelineMetrics`` records, for every pipeline stage (load, deduplicate,
+analyze, summarize, report, ...):
+
+- wall-clock and CPU time, and the start offset from the beginning of the
+  run (stages of the async pipeline overlap),
+- the process peak RSS once the stage finished,
+- optionally, tracemalloc current/peak memory and the top allocation sites.
+
+Counters (sources, model tokens) turn the timings into throughput figures.
+Metrics are written as a JSON file next to the report and can be appended
+to the report itself (``report.include_metrics``).
+"""
+
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Allocation sites kept per stage when tracing memory
+TOP_ALLOCATIONS = 5
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PipelineMetrics:
+    """
+    Collector for per-stage timings, memory and throughput.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        Initialize the collector.
+
+        Args:
+            trace_memory: Record tracemalloc statistics per stage (slows the run down)
+        """
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        # Whole-run totals, set by pipelines whose stages overlap; the
+        # totals are the sums of the stage timings otherwise
+        self.wall_seconds: Optional[float] = None
+        self.cpu_seconds: Optional[float] = None
+        self._created = time.perf_counter()
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Time a pipeline stage.
+
+        Args:
+            name: Stage name
+
+        Yields:
+            The stage record, to which callers may add fields
+        """
+        record: Dict[str, Any] = {'name': name}
+        if self.trace_memory and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        record['start_seconds'] = round(wall - self._created, 6)
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall, 6)
+            record['cpu_seconds'] = round(time.process_time() - cpu, 6)
+            record['peak_rss_bytes'] = peak_rss_bytes()
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record['traced_current_bytes'] = current
+                record['traced_peak_bytes'] = peak
+                stats = tracemalloc.take_snapshot().statistics('lineno')[:TOP_ALLOCATIONS]
+                record['top_allocations'] = [
+                    {'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                     'bytes': stat.size, 'count': stat.count}
+                    for stat in stats
+                ]
+            self.stages.append(record)
+            logger.debug(f"Stage {name}: {record['wall_seconds']:.3f}s wall, "
+                         f"{record['cpu_seconds']:.3f}s CPU")
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add to a named counter (e.g. ``sources``, ``completion_tokens``)."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_inference(self, stats: Dict[str, Any]) -> None:
+        """
+        Fold ``InferenceExecutor.stats`` into the counters.
+
+        Args:
+            stats: Executor statistics
+        """
+        for key in ('requests', 'retries', 'failures', 'prompt_tokens', 'completion_tokens'):
+            self.count(key, stats.get(key, 0))
+        self.count('inference_seconds', stats.get('seconds', 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Metrics as a JSON-serializable dictionary."""
+        wall = self.wall_seconds
+        if wall is None:
+            wall = sum(stage['wall_seconds'] for stage in self.stages)
+        cpu = self.cpu_seconds
+        if cpu is None:
+            cpu = sum(stage['cpu_seconds'] for stage in self.stages)
+        sources = self.counters.get('sources', 0)
+        tokens = self.counters.get('prompt_tokens', 0) + self.counters.get('completion_tokens', 0)
+        inference_seconds = self.counters.get('inference_seconds', 0.0)
+        return {
+            # Recorded as stages finish; reported in the order they started
+            'stages': sorted(self.stages, key=lambda stage: stage['start_seconds']),
+            'counters': self.counters,
+            'totals': {
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6),
+                'peak_rss_bytes': peak_rss_bytes(),
+                'sources_per_second': round(sources / wall, 3) if wall else None,
+                'tokens_per_second': round(tokens / inference_seconds, 3) if inference_seconds else None,
+            },
+        }
+
+    def write(self, path: str) -> None:
+        """
+        Write the metrics as JSON.
+
+        Args:
+            path: Output file
+        """
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Metrics written to {path}")
+
+    def close(self) -> None:
+        """Stop tracemalloc if this collector started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def stage(metrics: Optional[PipelineMetrics], name: str):
+    """``metrics.stage(name)``, or a no-op context when metrics are off."""
+    return metrics.stage(name) if metrics is not None else nullcontext({})
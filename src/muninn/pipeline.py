@@ -0,0 +1,462 @@
+"""
+Asynchronous analysis pipeline.
+
+``analyze_data`` runs the stages below on one asyncio event loop. Streaming
+stages are connected by bounded queues of source chunks, so a fast producer
+waits for its consumer instead of buffering the collection (backpressure);
+stages that need the whole collection start as soon as their inputs are
+complete::
+
+    load ─▶ [queue] ─▶ deduplicate ─▶ [queue] ─▶ entity extraction
+                            │
+                            └─▶ per-source analysis (model)   *
+                            │
+                        prioritize
+                 ┌──────────┼──────────────────┐
+        per-source analysis,  themes, sentiment,  entity index
+        summary (model)       related sources
+                 └──────────┬──────────────────┘
+                      trends ─▶ report
+
+    * Without source prioritization, sources are sent to the model while
+      the collection is still being loaded.
+
+Loading, deduplication and extraction overlap chunk by chunk, and the
+model-bound stages overlap the CPU-bound aggregation, so a run takes about
+as long as its slowest branch instead of the sum of its stages.
+
+CPU-heavy stages run on a pluggable ``concurrent.futures.Executor`` (by
+default a thread pool of ``performance.pipeline_workers``). Stages share
+in-memory state, so the executor must run its work in this process; the
+stages that benefit from processes (JSON Lines decoding, entity extraction
+and sentiment scoring of large collections) have process pools of their
+own. The loader and the model stages run on dedicated threads, where
+``InferenceExecutor`` bounds the concurrent model requests.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .analyze import (analyze_incremental, entity_config, prioritizer_config, quarantine_path,
+                      summarizer_config, trend_groups)
+from .metrics import stage
+
+if TYPE_CHECKING:
+    from .checkpoint import CheckpointLog
+    from .metrics import PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+# Source chunks buffered between two streaming stages
+DEFAULT_QUEUE_SIZE = 4
+
+# Sources per chunk passed between streaming stages
+DEFAULT_CHUNK_SIZE = 1000
+
+# Threads of the default executor for CPU-heavy stages
+DEFAULT_WORKERS = 2
+
+# Seconds between checks for a cancelled pipeline while the loader waits
+_PUT_POLL_SECONDS = 0.1
+
+# End-of-stream marker passed through the queues
+_DONE = object()
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of up to ``size`` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def run_stages(*stages: Awaitable[Any], stop: Optional[threading.Event] = None) -> List[Any]:
+    """
+    Run concurrent stages; if one fails, cancel the others and re-raise.
+
+    Args:
+        stages: Stage coroutines
+        stop: Optional event set on failure, for stages blocked in threads
+
+    Returns:
+        Results of the stages, in order
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in stages]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        if stop is not None:
+            stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AnalysisPipeline:
+    """
+    One end-to-end analysis run on an asyncio event loop.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 metrics: Optional['PipelineMetrics'] = None,
+                 executor: Optional[Executor] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            config: Full configuration dictionary
+            metrics: Optional collector timing each stage
+            executor: Executor for CPU-heavy stages; a thread pool of
+                ``performance.pipeline_workers`` (default 2) if omitted
+        """
+        self.config = config or {}
+        self.metrics = metrics
+        self.executor = executor
+        performance = self.config.get('performance', {})
+        self.queue_size = max(1, performance.get('queue_size', DEFAULT_QUEUE_SIZE))
+        self.chunk_size = max(1, performance.get('pipeline_chunk_size', DEFAULT_CHUNK_SIZE))
+        self.workers = max(1, performance.get('pipeline_workers') or DEFAULT_WORKERS)
+        self.checkpoint: Optional['CheckpointLog'] = None
+        self._stop = threading.Event()
+        self._streamed: Optional['asyncio.Future'] = None
+
+    def run(self, input_path: str, output_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run the pipeline from synchronous code.
+
+        Args:
+            input_path: Path to Huginn output data
+            output_path: Path where the report is written
+
+        Returns:
+            Tuple of (report data, analysis results)
+        """
+        return asyncio.run(self.run_async(input_path, output_path))
+
+    async def run_async(self, input_path: str,
+                        output_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run the pipeline.
+
+        Args:
+            input_path: Path to Huginn output data
+            output_path: Path where the report is written
+
+        Returns:
+            Tuple of (report data, analysis results)
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.executor or ThreadPoolExecutor(self.workers,
+                                                       thread_name_prefix='muninn-stage')
+        # The loader and the model stages block for long stretches; they get
+        # their own threads so they never hold up the CPU-heavy stages
+        self._io = ThreadPoolExecutor(2, thread_name_prefix='muninn-io')
+        self._cpu = lambda function, *args: loop.run_in_executor(executor, function, *args)
+        self._thread = lambda function, *args: loop.run_in_executor(self._io, function, *args)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            return await self._run(input_path, output_path, start, cpu_start)
+        finally:
+            self._stop.set()
+            if self._streamed is not None and not self._streamed.done():
+                self._streamed.cancel()
+                await asyncio.gather(self._streamed, return_exceptions=True)
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+            self._io.shutdown(wait=True)
+            if self.executor is None:
+                executor.shutdown(wait=True)
+
+    def _elapsed(self, start: float, cpu_start: float) -> None:
+        """Record the run's wall and CPU time so far (stages overlap)."""
+        if self.metrics is not None:
+            self.metrics.wall_seconds = round(time.perf_counter() - start, 6)
+            self.metrics.cpu_seconds = round(time.process_time() - cpu_start, 6)
+
+    async def _run(self, input_path: str, output_path: str, start: float,
+                   cpu_start: float) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        from .priority import SourcePrioritizer, parse_timestamp
+        from .report_generator import generate_report
+        from .summarizer import IntelligenceSummarizer, aggregate_sources, summarize_sources
+
+        config, metrics = self.config, self.metrics
+        analysis_config = config.get('analysis', {})
+        incremental = analysis_config.get('incremental', False)
+        # Incremental runs analyze their delta against the persisted state
+        # (``analyze_incremental``); this summarizer then only aggregates
+        summarizer = IntelligenceSummarizer(summarizer_config(config))
+
+        # Without prioritization every deduplicated source is analyzed, so
+        # the model can start on the first chunks while the rest load
+        prioritizer = SourcePrioritizer(prioritizer_config(config))
+        stream_analysis = not incremental and not prioritizer.enabled
+        data, sources, extracted, streamed = await self._ingest(
+            input_path, output_path, summarizer if stream_analysis else None)
+
+        # Trends are computed over every deduplicated source, not only the
+        # prioritized ones sent to the model
+        all_sources = sources
+        collection_id = data.get('collection_id') or Path(input_path).stem
+        if self.checkpoint is None:
+            self._open_checkpoint(collection_id)
+        summarizer.checkpoint = self.checkpoint
+
+        collection_date = parse_timestamp(data.get('collection_date'))
+        if collection_date is not None:
+            # Only known once the collection header has been read
+            prioritizer.reference_time = collection_date
+        if prioritizer.enabled:
+            with stage(metrics, 'prioritize'):
+                sources = await self._cpu(prioritizer.select, sources)
+                data = dict(data, sources=sources)
+            if metrics is not None:
+                metrics.count('selected_sources', len(sources))
+                metrics.count('selected_tokens', prioritizer.stats['tokens'])
+
+        async def model():
+            if incremental:
+                return await self._thread(analyze_incremental, data, config, metrics,
+                                          self.checkpoint)
+            analysis = None
+            if streamed is not None:
+                analysis = summarizer.combine_results(await streamed)
+            return data, await self._thread(summarize_sources, summarizer, sources, metrics,
+                                            analysis)
+
+        async def aggregate():
+            aggregates = await self._cpu(aggregate_sources, summarizer, sources, metrics,
+                                         collection_id)
+            if incremental:
+                # The report lists the themes of the merged state; the
+                # collection's clusters still drive its per-theme trends
+                aggregates.pop('themes', None)
+            return aggregates
+
+        async def index_entities():
+            if extracted is None:
+                return None
+            from .entities import index_collection
+            with stage(metrics, 'entities'):
+                return await self._cpu(index_collection, collection_id, all_sources,
+                                       entity_config(config), extracted)
+
+        if self._aggregation_uses_model(summarizer):
+            # Model calls from the aggregation would compete with the
+            # per-source analysis for the same backend; run them afterwards
+            (data, results), top = await run_stages(model(), index_entities())
+            aggregates = await aggregate()
+        else:
+            (data, results), aggregates, top = await run_stages(
+                model(), aggregate(), index_entities())
+        results.update(aggregates)
+        if metrics is not None and summarizer.executor is not None:
+            metrics.add_inference(summarizer.executor.stats)
+
+        top_entities = top or []
+        if top is not None:
+            from .entities import format_entity
+            entities = [format_entity(entity) for entity in top_entities]
+            # Extracted indicators first, then entities named by the model
+            results['entities'] = entities + [entity for entity in results.get('entities', [])
+                                              if entity not in entities]
+
+        if analysis_config.get('trend_analysis', False):
+            from .trends import analyze_trends, np
+            if np is None:
+                logger.warning("Trend analysis requires numpy; skipping trends")
+            else:
+                with stage(metrics, 'trends'):
+                    groups = trend_groups(results.get('theme_clusters', []),
+                                          prioritizer.positions if prioritizer.enabled else None,
+                                          top_entities, extracted or [])
+                    results['trends'] = await self._cpu(analyze_trends, all_sources, groups,
+                                                        analysis_config)
+
+        if metrics is not None:
+            # Stages up to the report; the report stage is only in the metrics file
+            self._elapsed(start, cpu_start)
+            results['metrics'] = metrics.to_dict()
+        with stage(metrics, 'report'):
+            await self._thread(generate_report, data, results, output_path, config.get('report'))
+        if self.checkpoint is not None:
+            self.checkpoint.finish()
+        self._elapsed(start, cpu_start)
+        return data, results
+
+    def _aggregation_uses_model(self, summarizer) -> bool:
+        """Whether theme naming or sentiment send prompts to the model."""
+        analysis_config = self.config.get('analysis', {})
+        return summarizer.executor is not None and bool(
+            analysis_config.get('llm_theme_names') or analysis_config.get('llm_sentiment'))
+
+    def _open_checkpoint(self, collection_id: str) -> None:
+        """Open the checkpoint log of per-source model responses, if enabled."""
+        performance = self.config.get('performance', {})
+        if not performance.get('checkpoint', True):
+            return
+        from .checkpoint import DEFAULT_CHECKPOINT_DIR, CheckpointLog
+        model = self.config.get('model', {})
+        self.checkpoint = CheckpointLog(collection_id, dict(model, type=model.get('type', 'ollama')),
+                                        performance.get('checkpoint_dir', DEFAULT_CHECKPOINT_DIR),
+                                        resume=performance.get('resume', False))
+
+    async def _ingest(self, input_path: str, output_path: str, summarizer=None):
+        """
+        Load, deduplicate and extract entities chunk by chunk.
+
+        Returns:
+            Tuple of (collection data, deduplicated sources, extracted
+            entities or None, and a future of the per-source analysis
+            results if a summarizer was given, else None)
+        """
+        from .data_loader import HuginDataLoader
+        from .dedup import Deduplicator
+        from .schema import SchemaValidator
+
+        config, metrics = self.config, self.metrics
+        analysis_config = config.get('analysis', {})
+        loop = asyncio.get_running_loop()
+        validator = SchemaValidator.from_config(
+            config, config.get('data', {}).get('quarantine_file') or quarantine_path(output_path))
+        loader = HuginDataLoader(input_path, validator=validator,
+                                 workers=config.get('performance', {}).get('loader_workers'))
+        deduplicator = Deduplicator(analysis_config) \
+            if analysis_config.get('deduplicate', True) else None
+        extractor = None
+        if analysis_config.get('entity_extraction', False):
+            from .entities import EntityExtractor
+            extractor = EntityExtractor(entity_config(config)['entity_workers'])
+
+        loaded: asyncio.Queue = asyncio.Queue(self.queue_size)
+        consumers: List[asyncio.Queue] = []
+        if extractor is not None:
+            consumers.append(asyncio.Queue(self.queue_size))
+        if summarizer is not None:
+            # Unbounded: it only holds references to sources that are kept
+            # for the later stages anyway, and the slow model stage must not
+            # stall loading
+            consumers.append(asyncio.Queue())
+        sources: List[Dict[str, Any]] = []
+        extracted: List[Any] = []
+        counts = {'loaded': 0}
+
+        async def load():
+            with stage(metrics, 'load'):
+                await self._thread(self._produce, loader.iter_sources(), loaded, loop)
+
+        async def deduplicate():
+            # Streaming stages are timed from their first chunk on
+            chunk = await loaded.get()
+            with stage(metrics if deduplicator is not None else None, 'deduplicate'):
+                while chunk is not _DONE:
+                    counts['loaded'] += len(chunk)
+                    if deduplicator is not None:
+                        chunk = await self._cpu(deduplicator.add, chunk)
+                    sources.extend(chunk)
+                    for queue in consumers:
+                        await queue.put(chunk)
+                    chunk = await loaded.get()
+                if deduplicator is not None:
+                    deduplicator.finish()
+            for queue in consumers:
+                await queue.put(_DONE)
+
+        async def extract(queue):
+            chunk = await queue.get()
+            try:
+                with stage(metrics, 'extract'):
+                    while chunk is not _DONE:
+                        # One extractor per run: its process pool, once
+                        # started, serves every later chunk
+                        extracted.extend(await self._cpu(extractor.extract, chunk))
+                        chunk = await queue.get()
+            finally:
+                extractor.close(wait=False)
+
+        async def analyze(queue):
+            results = []
+            chunk = await queue.get()
+            if chunk is not _DONE and self.checkpoint is None:
+                # Fields before ``sources`` in the file are parsed by now
+                self._open_checkpoint(loader.header.get('collection_id') or Path(input_path).stem)
+                summarizer.checkpoint = self.checkpoint
+            with stage(metrics, 'analyze'):
+                while chunk is not _DONE:
+                    results.extend(await self._thread(summarizer.analyze_batch, chunk))
+                    chunk = await queue.get()
+            return results
+
+        stages = [load(), deduplicate()]
+        if extractor is not None:
+            stages.append(extract(consumers[0]))
+        streamed = None
+        if summarizer is not None:
+            # Keeps running after ingestion, alongside the aggregation
+            # stages; cancelled by run_async if the run fails first
+            streamed = self._streamed = asyncio.ensure_future(analyze(consumers[-1]))
+        await run_stages(*stages, stop=self._stop)
+
+        if metrics is not None:
+            metrics.count('sources', counts['loaded'])
+            if validator is not None:
+                metrics.count('invalid_sources', validator.invalid)
+        loader.data = data = dict(loader.header, sources=sources)
+        if not loader.validate():
+            logger.warning("Loaded data failed validation")
+        logger.info(f"Ingested {counts['loaded']} sources ({len(sources)} after deduplication)")
+        return data, sources, extracted if extractor is not None else None, streamed
+
+    def _produce(self, items: Iterable[Dict[str, Any]], queue: asyncio.Queue,
+                 loop: asyncio.AbstractEventLoop) -> None:
+        """Feed chunks of ``items`` into ``queue`` from a loader thread."""
+        try:
+            for chunk in chunked(items, self.chunk_size):
+                if not self._put(queue, chunk, loop):
+                    return
+            self._put(queue, _DONE, loop)
+        finally:
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+
+    def _put(self, queue: asyncio.Queue, item: Any, loop: asyncio.AbstractEventLoop) -> bool:
+        """Put from a thread, waiting while the queue is full; False once stopped."""
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=_PUT_POLL_SECONDS)
+                return True
+            except FutureTimeoutError:
+                if self._stop.is_set():
+                    future.cancel()
+                    return False
+
+
+def run_pipeline(input_path: str, output_path: str, config: Optional[Dict[str, Any]] = None,
+                 metrics: Optional['PipelineMetrics'] = None,
+                 executor: Optional[Executor] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Convenience function to run the analysis pipeline.
+
+    Args:
+        input_path: Path to Huginn output data
+        output_path: Path where the report is written
+        config: Optional configuration dictionary
+        metrics: Optional collector timing each stage
+        executor: Optional executor for CPU-heavy stages
+
+    Returns:
+        Tuple of (report data, analysis results)
+    """
+    return AnalysisPipeline(config, metrics, executor).run(input_path, output_path)
@@ -0,0 +1,215 @@
+"""
+Source prioritization stage.
+
+Sending every source to the model is the most expensive part of a run.
+This stage scores sources and keeps only the best ones for summarization:
+
+- ``relevance``: Huginn's ``metadata.relevance_score`` (0.0-1.0)
+- ``engagement``: likes, retweets/reposts and replies on a log scale
+- ``recency``: exponential decay of the source age relative to the
+  collection date
+- ``type``: a weight per source type (web articles over social posts)
+
+Selection is a single streaming pass with a bounded min-heap of the top
+``max_sources`` sources, so memory stays proportional to K rather than the
+collection size. Sources whose own relevance score is below
+``confidence_threshold`` are skipped outright, and an optional token
+budget caps the estimated prompt tokens of the selection. Selected sources
+keep their original order and record their score in
+``metadata.priority_score``.
+"""
+
+import heapq
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .inference import estimate_tokens
+from .summarizer import build_source_prompt
+
+logger = logging.getLogger(__name__)
+
+# Weights of the score components (normalized to sum to 1)
+DEFAULT_WEIGHTS = {'relevance': 0.4, 'engagement': 0.2, 'recency': 0.2, 'type': 0.2}
+
+# Weight of each source type; unknown types get ``DEFAULT_TYPE_WEIGHT``
+DEFAULT_TYPE_WEIGHTS = {'web': 1.0, 'news': 1.0, 'report': 1.0, 'forum': 0.8,
+                        'social': 0.7, 'paste': 0.6}
+DEFAULT_TYPE_WEIGHT = 0.5
+
+# Engagement counts and their weights; ``reposts`` is the non-Twitter name
+ENGAGEMENT_WEIGHTS = {'likes': 1.0, 'retweets': 2.0, 'reposts': 2.0, 'replies': 1.5}
+
+# Weighted engagement at which the engagement component saturates
+ENGAGEMENT_SCALE = 10000
+
+# Component value for sources without a relevance score
+NEUTRAL_RELEVANCE = 0.5
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 timestamp as an aware UTC datetime.
+
+    Args:
+        value: Timestamp string (``Z`` suffix accepted)
+
+    Returns:
+        Datetime, or None if missing or unparseable
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class SourcePrioritizer:
+    """
+    Score sources and select the top K within a token budget.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 reference_time: Optional[datetime] = None):
+        """
+        Initialize the prioritizer.
+
+        Args:
+            config: Optional settings: ``max_sources`` (K, default: no
+                limit), ``confidence_threshold`` (minimum relevance score),
+                ``token_budget`` (maximum estimated prompt tokens, 0 = no
+                limit), ``priority_weights``, ``source_type_weights`` and
+                ``recency_half_life_hours`` (default 24)
+            reference_time: Time recency is measured against (default: now)
+        """
+        self.config = config or {}
+        self.max_sources = self.config.get('max_sources') or None
+        self.threshold = self.config.get('confidence_threshold')
+        self.token_budget = self.config.get('token_budget') or None
+        weights = dict(DEFAULT_WEIGHTS, **self.config.get('priority_weights', {}))
+        total = sum(weights.values()) or 1.0
+        self.weights = {name: weight / total for name, weight in weights.items()}
+        self.type_weights = dict(DEFAULT_TYPE_WEIGHTS, **self.config.get('source_type_weights', {}))
+        half_life = self.config.get('recency_half_life_hours', 24)
+        self.decay = math.log(2) / (half_life * 3600) if half_life else 0.0
+        self.reference_time = reference_time or datetime.now(timezone.utc)
+        self.stats = {'input': 0, 'below_threshold': 0, 'over_budget': 0,
+                      'output': 0, 'tokens': 0}
+        # Input positions of the last selection, in output order
+        self.positions: List[int] = []
+
+    @property
+    def enabled(self) -> bool:
+        """Whether selection can drop any source."""
+        return bool(self.max_sources or self.threshold or self.token_budget)
+
+    def score(self, source: Dict[str, Any]) -> float:
+        """
+        Score a source between 0.0 and 1.0.
+
+        Args:
+            source: Source dictionary
+
+        Returns:
+            Weighted sum of the relevance, engagement, recency and type components
+        """
+        metadata = source.get('metadata')
+        if not isinstance(metadata, dict):
+            metadata = {}
+        weights = self.weights
+
+        relevance = metadata.get('relevance_score')
+        if not isinstance(relevance, (int, float)):
+            relevance = NEUTRAL_RELEVANCE
+        score = weights['relevance'] * min(max(relevance, 0.0), 1.0)
+
+        engagement = metadata.get('engagement')
+        if isinstance(engagement, dict):
+            weighted = sum(weight * engagement[key] for key, weight in ENGAGEMENT_WEIGHTS.items()
+                           if isinstance(engagement.get(key), (int, float)) and engagement[key] > 0)
+            score += weights['engagement'] * min(
+                math.log1p(weighted) / math.log1p(ENGAGEMENT_SCALE), 1.0)
+
+        timestamp = parse_timestamp(source.get('timestamp'))
+        if timestamp is not None:
+            age = max((self.reference_time - timestamp).total_seconds(), 0.0)
+            score += weights['recency'] * math.exp(-self.decay * age)
+
+        score += weights['type'] * self.type_weights.get(source.get('type'), DEFAULT_TYPE_WEIGHT)
+        return score
+
+    def select(self, sources: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Select the highest-scoring sources.
+
+        Args:
+            sources: Source dictionaries (consumed once)
+
+        Returns:
+            Selected sources in their original order, each a shallow copy
+            with ``metadata.priority_score``
+        """
+        stats = self.stats
+        # Min-heap of (score, -position, source): the root is the weakest
+        # kept source, and among equal scores the later one is evicted first
+        heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        for position, source in enumerate(sources):
+            stats['input'] += 1
+            if self.threshold is not None:
+                relevance = (source.get('metadata') or {}).get('relevance_score')
+                if isinstance(relevance, (int, float)) and relevance < self.threshold:
+                    stats['below_threshold'] += 1
+                    continue
+            entry = (self.score(source), -position, source)
+            if self.max_sources is None or len(heap) < self.max_sources:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        ranked = sorted(heap, key=lambda item: item[:2], reverse=True)
+        selected = []
+        for score, negative_position, source in ranked:
+            if self.token_budget is not None:
+                tokens = estimate_tokens(build_source_prompt(source))
+                if stats['tokens'] + tokens > self.token_budget:
+                    stats['over_budget'] += 1
+                    continue
+                stats['tokens'] += tokens
+            selected.append((-negative_position, score, source))
+
+        selected.sort(key=lambda item: item[0])
+        self.positions = [position for position, _, _ in selected]
+        result = []
+        for _, score, source in selected:
+            entry = dict(source)
+            metadata = entry.get('metadata')
+            entry['metadata'] = dict(metadata, priority_score=round(score, 4)) \
+                if isinstance(metadata, dict) else {'priority_score': round(score, 4)}
+            result.append(entry)
+
+        stats['output'] = len(result)
+        logger.info(f"Selected {stats['output']} of {stats['input']} sources "
+                    f"({stats['below_threshold']} below threshold, "
+                    f"{stats['input'] - stats['below_threshold'] - len(ranked)} outside top "
+                    f"{self.max_sources}, {stats['over_budget']} over token budget)")
+        return result
+
+
+def prioritize_sources(sources: Iterable[Dict[str, Any]],
+                       config: Optional[Dict[str, Any]] = None,
+                       reference_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Convenience function to select the top sources for summarization.
+
+    Args:
+        sources: Source dictionaries from Huginn
+        config: Optional prioritization settings
+        reference_time: Time recency is measured against (default: now)
+
+    Returns:
+        List of selected sources
+    """
+    return SourcePrioritizer(config, reference_time).select(sources)
@@ -3,21 +3,63 @@ Report generation module for creating formatted Markdown reports.
 
 This module generates professional intelligence reports in Markdown format
 ready for publication by RavenNet.
+
+Reports can be built as one string (``generate``) or streamed section by
+section and source by source (``iter_report`` / ``write``), so writing a
+report for tens of thousands of sources keeps memory flat.
+
+The layout comes from a compiled template (see ``muninn.templates``); only
+sections enabled by the ``include_*`` flags are rendered.
+
+Besides Markdown, reports can be written as an HTML page and a JSON payload
+for RavenNet. ``write_formats`` renders every requested format from one
+analysis result concurrently, sharing the rendered sections.
 """
 
+import html
+import json
 import logging
+import os
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from .templates import OPT_IN_SECTIONS, SECTION_FLAGS, CompiledTemplate, get_template
 
 logger = logging.getLogger(__name__)
 
+# Write buffer for streamed reports
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Supported output formats and their file suffixes
+FORMAT_SUFFIXES = {'markdown': '.md', 'html': '.html', 'json': '.json'}
+
+# Series listed in the trends table
+TREND_SERIES_SHOWN = 10
+
+# Groups listed per sentiment table
+SENTIMENT_GROUPS_SHOWN = 10
+
+# Characters of a trend sparkline, lowest to highest
+SPARK_LEVELS = '▁▂▃▄▅▆▇█'
+SPARK_WIDTH = 60
+
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_ITALIC = re.compile(r'\*(.+?)\*')
+_ORDERED_ITEM = re.compile(r'\d+\. ')
+
 
 class ReportGenerator:
     """
     Generates formatted Markdown intelligence reports.
     
-    Phase 1: Basic report structure.
-    Phase 3: Will implement full template system and formatting.
+    Rendered sections are memoized per call in a ``sections`` dictionary;
+    passing the same dictionary to several renders (``write_templates``)
+    renders shared sections only once. The sources section is streamed and
+    never memoized.
     """
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
@@ -29,6 +71,7 @@ class ReportGenerator:
         """
         self.config = config or {}
         self.template = self.config.get('template', 'default')
+        self.compiled = get_template(self.template)
         logger.info(f"Initialized report generator with template: {self.template}")
     
     def generate(self, data: Dict[str, Any], analysis: Dict[str, Any]) -> str:
@@ -43,28 +86,247 @@ class ReportGenerator:
             Formatted Markdown report string
         """
         logger.info("Generating intelligence report")
+        return "".join(self.iter_report(data, analysis))
+    
+    def iter_report(self, data: Dict[str, Any], analysis: Dict[str, Any],
+                    template: Optional[str] = None,
+                    sections: Optional[Dict[str, str]] = None) -> Iterator[str]:
+        """
+        Generate the report as a stream of text fragments.
+        
+        The sources section is yielded one line at a time, so the full
+        report is never held in memory.
+        
+        Args:
+            data: Raw data from Huginn
+            analysis: Analysis results from summarizer
+            template: Optional template overriding ``report.template``
+            sections: Optional memo of rendered sections shared between renders
+        
+        Yields:
+            Consecutive fragments of the Markdown report
+        """
+        compiled = get_template(template) if template else self.compiled
+        memo = sections if sections is not None else {}
+        first = True
+        for block in compiled.blocks:
+            if block.section:
+                if not self.section_enabled(block.section):
+                    continue
+                fragments = self._render_section(block.section, data, analysis, memo)
+            else:
+                fragments = [self._render_text(block.parts, compiled, data, analysis, memo)]
+            if not first:
+                yield "\n\n"
+            first = False
+            yield from fragments
+    
+    def section_enabled(self, name: str) -> bool:
+        """Whether a section is switched on by its ``include_*`` flag."""
+        flag = SECTION_FLAGS.get(name)
+        return flag is None or bool(self.config.get(flag, name not in OPT_IN_SECTIONS))
+    
+    def write(self, data: Dict[str, Any], analysis: Dict[str, Any], output_path: str) -> None:
+        """
+        Stream the report straight to a file.
+        
+        The report is written to a temporary file next to ``output_path``
+        and renamed into place, so readers never see a partial report.
+        
+        Args:
+            data: Raw data from Huginn
+            analysis: Analysis results from summarizer
+            output_path: Path where report will be saved
+        """
+        logger.info("Generating intelligence report")
+        _atomic_write_text(output_path, self.iter_report(data, analysis))
+        logger.info(f"Report saved to {output_path}")
+    
+    def write_templates(self, data: Dict[str, Any], analysis: Dict[str, Any],
+                        outputs: Dict[str, str]) -> None:
+        """
+        Render one analysis result with several templates.
         
-        sections = [
-            self._generate_header(data),
-            self._generate_executive_summary(analysis),
-            self._generate_key_findings(analysis),
-            self._generate_detailed_analysis(data, analysis),
-            self._generate_sources(data),
-            self._generate_recommendations(analysis),
-            self._generate_footer()
-        ]
+        Sections shared by the templates are rendered once.
         
-        return "\n\n".join(sections)
+        Args:
+            data: Raw data from Huginn
+            analysis: Analysis results from summarizer
+            outputs: Mapping of template name or path to output path
+        """
+        sections: Dict[str, str] = {}
+        for template, output_path in outputs.items():
+            _atomic_write_text(output_path, self.iter_report(data, analysis, template, sections))
+            logger.info(f"Report ({template}) saved to {output_path}")
     
-    def _generate_header(self, data: Dict[str, Any]) -> str:
+    def write_formats(self, data: Dict[str, Any], analysis: Dict[str, Any], output_path: str,
+                      formats: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Write the report in several formats at once.
+        
+        Shared sections are rendered once up front; each format is then
+        streamed to its own file in a separate thread.
+        
+        Args:
+            data: Raw data from Huginn
+            analysis: Analysis results from summarizer
+            output_path: Report path; other formats replace its suffix
+            formats: Formats to write (default: ``report.format``)
+        
+        Returns:
+            Mapping of format to written path
+        """
+        formats = normalize_formats(formats or self.config.get('format', 'markdown'))
+        outputs = output_paths(output_path, formats)
+        sources = data.get('sources', [])
+        if len(formats) > 1 and iter(sources) is sources:
+            # Every format iterates the sources, so a one-shot stream is materialized
+            logger.warning("Sources are a one-shot iterator, materializing for multi-format output")
+            data = dict(data, sources=list(sources))
+        
+        sections = self._prime(data, analysis)
+        renderers = {'markdown': self.iter_report, 'html': self.iter_html, 'json': self.iter_json}
+        
+        def write(fmt: str) -> None:
+            _atomic_write_text(outputs[fmt], renderers[fmt](data, analysis, sections=sections))
+            logger.info(f"Report ({fmt}) saved to {outputs[fmt]}")
+        
+        logger.info(f"Generating intelligence report ({', '.join(formats)})")
+        with ThreadPoolExecutor(max_workers=len(formats), thread_name_prefix='muninn-report') as pool:
+            for future in [pool.submit(write, fmt) for fmt in formats]:
+                future.result()
+        return outputs
+    
+    def iter_html(self, data: Dict[str, Any], analysis: Dict[str, Any],
+                  sections: Optional[Dict[str, str]] = None) -> Iterator[str]:
+        """
+        Generate the report as a standalone HTML page.
+        
+        The Markdown rendering is converted line by line, so the page
+        follows the same template and streams the same way.
+        
+        Yields:
+            Consecutive fragments of the HTML page
+        """
+        memo = sections if sections is not None else {}
+        title = html.escape(f"Intelligence Report - {self._variables(data, analysis, memo)['collection_id']}")
+        yield (f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+               f'<title>{title}</title>\n</head>\n<body>\n')
+        yield from markdown_to_html(_iter_lines(self.iter_report(data, analysis, sections=memo)))
+        yield '</body>\n</html>\n'
+    
+    def iter_json(self, data: Dict[str, Any], analysis: Dict[str, Any],
+                  sections: Optional[Dict[str, str]] = None) -> Iterator[str]:
+        """
+        Generate the report as a JSON payload for RavenNet.
+        
+        Sections disabled by the ``include_*`` flags are omitted; sources
+        are encoded one at a time.
+        
+        Yields:
+            Consecutive fragments of the JSON document
+        """
+        memo = sections if sections is not None else {}
+        variables = self._variables(data, analysis, memo)
+        include = lambda flag: self.config.get(flag, True)
+        payload = {
+            'collection_id': variables['collection_id'],
+            'generated': variables['generated'],
+            'status': variables['status'],
+            'template': self.compiled.name,
+            'source_count': variables['source_count'],
+        }
+        if include('include_metadata'):
+            payload['metadata'] = data.get('metadata', {})
+        if include('include_executive_summary'):
+            payload['summary'] = analysis.get('summary', '')
+        if include('include_key_findings'):
+            payload['key_findings'] = analysis.get('key_findings', [])
+        if include('include_detailed_analysis'):
+            payload['themes'] = analysis.get('themes', [])
+            payload['entities'] = analysis.get('entities', [])
+            if analysis.get('related_sources'):
+                payload['related_sources'] = analysis['related_sources']
+        if include('include_recommendations'):
+            payload['recommendations'] = analysis.get('recommendations', [])
+        if self.section_enabled('trends') and analysis.get('trends'):
+            payload['trends'] = analysis['trends']
+        if self.section_enabled('sentiment') and analysis.get('sentiment'):
+            payload['sentiment'] = analysis['sentiment']
+        if self.section_enabled('metrics') and analysis.get('metrics'):
+            payload['metrics'] = analysis['metrics']
+        
+        encoded = json.dumps(payload, indent=2, default=str)
+        if not include('include_sources'):
+            yield encoded + "\n"
+            return
+        
+        yield encoded[:-2] + ',\n  "sources": ['
+        for idx, source in enumerate(data.get('sources', [])):
+            yield ("\n    " if idx == 0 else ",\n    ") + json.dumps(dict(source), default=str)
+        yield "\n  ]\n}\n"
+    
+    def _prime(self, data: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, str]:
+        """Render every enabled non-streamed section once, ready for sharing."""
+        sections: Dict[str, str] = {}
+        self._variables(data, analysis, sections)
+        for name in self.compiled.sections:
+            if self.section_enabled(name):
+                self._render_section(name, data, analysis, sections)
+        return sections
+    
+    def _render_section(self, name: str, data: Dict[str, Any], analysis: Dict[str, Any],
+                        memo: Dict[str, str]) -> Iterable[str]:
+        if name == 'sources':
+            return self._iter_sources(data)
+        if name not in memo:
+            if name == 'header':
+                memo[name] = self._generate_header(data, self._variables(data, analysis, memo))
+            elif name == 'detailed_analysis':
+                memo[name] = self._generate_detailed_analysis(data, analysis)
+            elif name == 'footer':
+                memo[name] = self._generate_footer()
+            else:
+                memo[name] = getattr(self, f'_generate_{name}')(analysis)
+        return [memo[name]]
+    
+    def _render_text(self, parts, compiled: CompiledTemplate, data: Dict[str, Any],
+                     analysis: Dict[str, Any], memo: Dict[str, Any]) -> str:
+        variables = dict(self._variables(data, analysis, memo), template=compiled.name)
+        return "".join(part if i % 2 == 0 else str(variables[part]) for i, part in enumerate(parts))
+    
+    def _variables(self, data: Dict[str, Any], analysis: Dict[str, Any],
+                   memo: Dict[str, Any]) -> Dict[str, Any]:
+        """Template variables, computed once per memo so renders agree."""
+        if '$variables' not in memo:
+            sources = data.get('sources', [])
+            memo['$variables'] = {
+                'collection_id': data.get('collection_id', 'N/A'),
+                'generated': datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
+                'status': data.get('metadata', {}).get('status', 'Complete'),
+                'source_count': len(sources) if hasattr(sources, '__len__')
+                else analysis.get('total_sources', 0),
+            }
+        return memo['$variables']
+    
+    def _generate_header(self, data: Dict[str, Any],
+                         variables: Optional[Dict[str, Any]] = None) -> str:
         """Generate report header."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+        variables = variables or self._variables(data, {}, {})
+        
+        lines = []
+        if self.config.get('include_timestamps', True):
+            lines.append(f"**Generated:** {variables['generated']}")
+        if self.config.get('include_metadata', True):
+            lines.append(f"**Collection ID:** {variables['collection_id']}")
+            lines.append(f"**Status:** {variables['status']}")
+        details = "  \n".join(lines)
         
         header = f"""# Intelligence Report
 
-**Generated:** {timestamp}  
-**Collection ID:** {data.get('collection_id', 'N/A')}  
-**Status:** {data.get('metadata', {}).get('status', 'Complete')}
+{details}
+
+---""" if details else """# Intelligence Report
 
 ---"""
         
@@ -98,9 +360,11 @@ class ReportGenerator:
     def _generate_detailed_analysis(self, data: Dict[str, Any], analysis: Dict[str, Any]) -> str:
         """Generate detailed analysis section."""
         themes = analysis.get('themes', [])
-        source_count = len(data.get('sources', []))
+        sources = data.get('sources', [])
+        source_count = len(sources) if hasattr(sources, '__len__') else analysis.get('total_sources', 0)
         
         themes_text = "\n".join([f"- {theme}" for theme in themes]) if themes else "*No themes identified.*"
+        related_text = self._related_sources_text(analysis.get('related_sources'))
         
         section = f"""## Detailed Analysis
 
@@ -111,32 +375,162 @@ This analysis is based on {source_count} OSINT sources collected by Huginn.
 ### Identified Themes
 
 {themes_text}
-
+{related_text}
 ### Analysis Methodology
 
 *Phase 2 will include detailed methodology description.*"""
         
         return section
     
+    @staticmethod
+    def _related_sources_text(related: Optional[List[Dict[str, Any]]]) -> str:
+        """Similar sources subsection of the detailed analysis (empty if none)."""
+        if not related:
+            return ""
+        lines = ["", "### Similar Sources", ""]
+        for entry in related:
+            lines.append(f"- **{entry['title']}**")
+            for similar in entry['similar']:
+                link = f" {similar['url']}" if similar.get('url') and similar['url'] != similar['title'] else ""
+                lines.append(f"  - {similar['title']}{link} "
+                             f"(collection {similar['collection_id']}, similarity {similar['score']:.2f})")
+            if not entry['similar']:
+                lines.append("  - *No similar sources indexed.*")
+        return "\n".join(lines) + "\n"
+    
     def _generate_sources(self, data: Dict[str, Any]) -> str:
         """Generate sources and references section."""
-        sources = data.get('sources', [])
+        return "".join(self._iter_sources(data))
+    
+    def _iter_sources(self, data: Dict[str, Any]) -> Iterator[str]:
+        """Generate the sources and references section line by line."""
+        yield "## Sources and References\n\n"
+        
+        include_timestamps = self.config.get('include_timestamps', True)
+        empty = True
+        for idx, source in enumerate(data.get('sources', []), 1):
+            source_type = source.get('type', 'unknown')
+            url = source.get('url', 'N/A')
+            timestamp = source.get('timestamp', 'N/A')
+            line = f"{idx}. **{source_type.title()}**: {url}"
+            if include_timestamps:
+                line += f" (collected: {timestamp})"
+            duplicates = (source.get('metadata') or {}).get('duplicate_count', 0)
+            if duplicates:
+                line += f" (+{duplicates} duplicate{'s' if duplicates != 1 else ''} merged)"
+            yield line if empty else "\n" + line
+            empty = False
         
-        if not sources:
-            sources_text = "*No sources available.*"
+        if empty:
+            yield "*No sources available.*"
+    
+    def _generate_entities(self, analysis: Dict[str, Any]) -> str:
+        """Generate entities section."""
+        entities = analysis.get('entities', [])
+        
+        if not entities:
+            entities_text = "*No entities identified.*"
         else:
-            sources_list = []
-            for idx, source in enumerate(sources, 1):
-                source_type = source.get('type', 'unknown')
-                url = source.get('url', 'N/A')
-                timestamp = source.get('timestamp', 'N/A')
-                sources_list.append(f"{idx}. **{source_type.title()}**: {url} (collected: {timestamp})")
-            
-            sources_text = "\n".join(sources_list)
+            entities_text = "\n".join([f"- {entity}" for entity in entities])
+        
+        section = f"""## Entities
+
+{entities_text}"""
+        
+        return section
+    
+    def _generate_trends(self, analysis: Dict[str, Any]) -> str:
+        """Generate trends section."""
+        trends = analysis.get('trends')
+        if not trends or not trends.get('overall'):
+            return """## Trends
+
+*No timestamped sources available.*"""
+
+        overall = trends['overall']
+        hours = trends['bucket_seconds'] / 3600
+        width = f"{hours:g}h" if hours >= 1 else f"{trends['bucket_seconds'] // 60}m"
+        lines = [f"Sources per {width} bucket from {trends['start']} to {trends['end']} "
+                 f"(peak: {overall['peak']} at {overall['peak_bucket']}):",
+                 "",
+                 f"`{sparkline(overall['counts'])}`"]
+
+        series = sorted(trends.get('series', []), key=lambda item: item['total'], reverse=True)
+        if series:
+            lines += ["", "| Series | Type | Sources | Peak | Peak bucket |",
+                      "|--------|------|---------|------|-------------|"]
+            lines += [f"| {item['name']} | {item['kind']} | {item['total']} | {item['peak']} | "
+                      f"{item['peak_bucket']} |" for item in series[:TREND_SERIES_SHOWN]]
+
+        spikes = trends.get('spikes', [])
+        lines += ["", "**Spikes:**" if spikes else "*No spikes detected.*"]
+        lines += [f"- {spike['name']} ({spike['kind']}): {spike['count']} sources at "
+                  f"{spike['bucket']} (baseline {spike['baseline']:g}, z = {spike['zscore']:g})"
+                  for spike in spikes]
+
+        section = f"""## Trends
+
+{chr(10).join(lines)}"""
+
+        return section
+
+    def _generate_sentiment(self, analysis: Dict[str, Any]) -> str:
+        """Generate sentiment section."""
+        sentiment = analysis.get('sentiment')
+        if not sentiment or not sentiment.get('sources'):
+            return """## Sentiment
+
+*No sentiment scores available.*"""
+        
+        distribution = sentiment['distribution']
+        lines = [f"Mean sentiment {sentiment['mean']:+.2f} across {sentiment['sources']} sources: "
+                 f"{distribution['positive']} positive, {distribution['neutral']} neutral, "
+                 f"{distribution['negative']} negative."]
+        if sentiment.get('ambiguous'):
+            lines.append(f"{sentiment['ambiguous']} sources were ambiguous, "
+                         f"{sentiment.get('model_scored', 0)} of them labelled by the model.")
+        
+        for key, title in (('by_platform', 'Platform'), ('by_theme', 'Theme'), ('by_author', 'Author')):
+            groups = sentiment.get(key, [])[:SENTIMENT_GROUPS_SHOWN]
+            if not groups:
+                continue
+            lines += ["", f"| {title} | Sources | Mean | Positive | Neutral | Negative |",
+                      "|" + "-" * (len(title) + 2) + "|---------|------|----------|---------|----------|"]
+            lines += [f"| {group['name']} | {group['sources']} | {group['mean']:+.2f} | "
+                      f"{group['positive']} | {group['neutral']} | {group['negative']} |"
+                      for group in groups]
         
-        section = f"""## Sources and References
+        section = f"""## Sentiment
 
-{sources_text}"""
+{chr(10).join(lines)}"""
+        
+        return section
+    
+    def _generate_metrics(self, analysis: Dict[str, Any]) -> str:
+        """Generate pipeline metrics appendix."""
+        metrics = analysis.get('metrics')
+        if not metrics:
+            return """## Appendix: Pipeline Metrics
+
+*No metrics recorded.*"""
+        
+        rows = []
+        for stage in metrics.get('stages', []):
+            rss = stage.get('peak_rss_bytes')
+            rss_text = f"{rss / (1 << 20):.1f} MiB" if rss else "N/A"
+            rows.append(f"| {stage['name']} | {stage['wall_seconds']:.3f} | "
+                        f"{stage['cpu_seconds']:.3f} | {rss_text} |")
+        totals = metrics.get('totals', {})
+        throughput = [f"- Sources/sec: {totals.get('sources_per_second') or 'N/A'}",
+                      f"- Model tokens/sec: {totals.get('tokens_per_second') or 'N/A'}"]
+        
+        section = f"""## Appendix: Pipeline Metrics
+
+| Stage | Wall (s) | CPU (s) | Peak RSS |
+|-------|----------|---------|----------|
+{chr(10).join(rows)}
+
+{chr(10).join(throughput)}"""
         
         return section
     
@@ -180,31 +574,213 @@ This analysis is based on {source_count} OSINT sources collected by Huginn.
             report: Markdown report content
             output_path: Path where report will be saved
         """
-        from pathlib import Path
+        _atomic_write_text(output_path, [report])
+        logger.info(f"Report saved to {output_path}")
+
+
+def _atomic_write_text(output_path: str, fragments: Iterable[str]) -> None:
+    """Write text fragments to a temporary file and rename it into place."""
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    def write(f) -> None:
+        for fragment in fragments:
+            f.write(fragment)
+    
+    _atomic_write(output_file, write)
+
+
+def _atomic_write(path: Path, writer, binary: bool = False) -> None:
+    """
+    Write a file through a temporary file and rename it into place.
+    
+    The temporary file gets the mode of the file it replaces, or the
+    umask-derived mode of a newly created file, and is synced to disk
+    before the rename.
+    """
+    fd, tmp = _create_temporary(path)
+    try:
+        if path.exists():
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        with os.fdopen(fd, 'wb' if binary else 'w',
+                       **({} if binary else {'encoding': 'utf-8',
+                                             'buffering': WRITE_BUFFER_SIZE})) as f:
+            writer(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _create_temporary(path: Path) -> Tuple[int, str]:
+    """
+    Create a hidden temporary file next to ``path``.
+    
+    Unlike ``tempfile.mkstemp`` (always 0600), the file is opened with mode
+    0666 so the process umask decides its permissions, as for ``open``.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        tmp = str(path.parent / f".{path.name}.{os.urandom(4).hex()}")
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+def sparkline(values: List[float], width: int = SPARK_WIDTH) -> str:
+    """
+    Render a series as a one-line block-character chart.
+    
+    Series longer than ``width`` are reduced by taking the maximum of
+    consecutive values, so spikes stay visible.
+    """
+    if len(values) > width:
+        step = -(-len(values) // width)
+        values = [max(values[i:i + step]) for i in range(0, len(values), step)]
+    top = max(values, default=0) or 1
+    scale = len(SPARK_LEVELS) - 1
+    return ''.join(SPARK_LEVELS[round(value / top * scale)] for value in values)
+
+
+def normalize_formats(formats) -> List[str]:
+    """
+    Parse ``report.format`` into a list of known formats.
+    
+    Accepts a single name, a comma-separated string or a list; ``md`` is
+    accepted for ``markdown``.
+    
+    Raises:
+        ValueError: For unknown formats
+    """
+    if isinstance(formats, str):
+        formats = formats.split(',')
+    normalized: List[str] = []
+    for fmt in formats:
+        fmt = fmt.strip().lower()
+        fmt = 'markdown' if fmt == 'md' else fmt
+        if fmt not in FORMAT_SUFFIXES:
+            raise ValueError(f"Unknown report format: {fmt}")
+        if fmt not in normalized:
+            normalized.append(fmt)
+    return normalized or ['markdown']
+
+
+def output_paths(output_path: str, formats: List[str]) -> Dict[str, str]:
+    """
+    Map each format to its output file.
+    
+    A single format is written to ``output_path`` as given; with several
+    formats, each replaces the suffix of ``output_path`` with its own.
+    """
+    if len(formats) == 1:
+        return {formats[0]: output_path}
+    path = Path(output_path)
+    return {fmt: str(path.with_suffix(FORMAT_SUFFIXES[fmt])) for fmt in formats}
+
+
+def _iter_lines(fragments: Iterable[str]) -> Iterator[str]:
+    """Regroup text fragments into complete lines."""
+    pending = ''
+    for fragment in fragments:
+        pending += fragment
+        if '\n' in pending:
+            *lines, pending = pending.split('\n')
+            yield from lines
+    yield pending
+
+
+def _inline_html(text: str) -> str:
+    text = html.escape(text)
+    text = _BOLD.sub(r'<strong>\1</strong>', text)
+    return _ITALIC.sub(r'<em>\1</em>', text)
+
+
+def markdown_to_html(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Convert the Markdown subset produced by the report templates to HTML.
+    
+    Handles headings, rules, bullet and numbered lists, simple tables,
+    paragraphs, hard line breaks and bold/italic text.
+    
+    Args:
+        lines: Markdown lines
+    
+    Yields:
+        HTML lines
+    """
+    open_block = None
+    for line in lines:
+        stripped = line.rstrip()
+        if stripped.startswith('- '):
+            block, item = 'ul', stripped[2:]
+        elif _ORDERED_ITEM.match(stripped):
+            block, item = 'ol', stripped.split('. ', 1)[1]
+        elif stripped == '---':
+            block, item = 'hr', ''
+        elif stripped.startswith('#'):
+            block, item = 'h', stripped
+        elif stripped.startswith('|'):
+            block, item = 'table', stripped
+        else:
+            block, item = ('p' if stripped else None), stripped
         
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(report, encoding='utf-8')
+        if open_block and open_block != block:
+            yield f'</{open_block}>\n'
+            open_block = None
         
-        logger.info(f"Report saved to {output_path}")
+        if block in ('ul', 'ol'):
+            if open_block is None:
+                yield f'<{block}>\n'
+                open_block = block
+            yield f'<li>{_inline_html(item)}</li>\n'
+        elif block == 'table':
+            cells = [cell.strip() for cell in item.strip('|').split('|')]
+            if all(set(cell) <= set('-:') for cell in cells):
+                continue
+            tag = 'td' if open_block == 'table' else 'th'
+            if open_block is None:
+                yield '<table>\n'
+                open_block = 'table'
+            yield '<tr>' + ''.join(f'<{tag}>{_inline_html(cell)}</{tag}>' for cell in cells) + '</tr>\n'
+        elif block == 'hr':
+            yield '<hr>\n'
+        elif block == 'h':
+            level = min(len(item) - len(item.lstrip('#')), 6)
+            yield f'<h{level}>{_inline_html(item[level:].strip())}</h{level}>\n'
+        elif block == 'p':
+            if open_block is None:
+                yield '<p>'
+                open_block = 'p'
+            else:
+                yield '\n'
+            yield _inline_html(item) + ('<br>' if line.endswith('  ') else '')
+    if open_block:
+        yield f'</{open_block}>\n'
 
 
 def generate_report(data: Dict[str, Any], analysis: Dict[str, Any], 
-                   output_path: str, config: Optional[Dict[str, Any]] = None) -> str:
+                   output_path: str, config: Optional[Dict[str, Any]] = None,
+                   formats: Optional[List[str]] = None) -> Dict[str, str]:
     """
     Convenience function to generate and save a report.
     
+    The report is streamed to disk rather than built in memory. When several
+    formats are requested they are rendered concurrently from the same
+    analysis result.
+    
     Args:
         data: Raw data from Huginn
         analysis: Analysis results from summarizer
         output_path: Path where report will be saved
         config: Optional configuration dictionary
+        formats: Optional formats overriding ``report.format``
+            (markdown, html, json)
     
     Returns:
-        Generated report content
+        Mapping of format to written path
     """
     generator = ReportGenerator(config)
-    report = generator.generate(data, analysis)
-    generator.save_to_file(report, output_path)
-    
-    return report
+    return generator.write_formats(data, analysis, output_path, formats)
@@ -0,0 +1,279 @@
+"""
+Schema validation for Huginn sources.
+
+Schemas are declared per Huginn schema version as field rules (type,
+required, pattern, range, nested fields). ``get_validator`` compiles the
+rules of a version once into a specialized Python function with
+precompiled regular expressions and caches it, so validating a source is
+a handful of dictionary lookups and class tests -- cheap next to decoding
+the JSON itself.
+
+``SchemaValidator`` applies a compiled validator to a stream of sources
+while they are being loaded. Malformed sources are dropped before they
+reach summarization; depending on the mode they are also written to a
+quarantine file or abort the load. Error counts are kept per field.
+"""
+
+import json
+import logging
+import re
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEMA_VERSION = '1.0'
+
+# How invalid sources are handled
+MODES = ('reject', 'quarantine', 'strict')
+
+# ASCII classes and non-capturing groups keep the per-source match cheap
+_ISO_TIMESTAMP = (r'[0-9]{4}-[0-9]{2}-[0-9]{2}'
+                  r'(?:[T ][0-9]{2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]+)?)?(?:Z|[+-][0-9]{2}:?[0-9]{2})?)?\Z')
+
+# Field rules per schema version. Rule keys: type, required, nonempty,
+# prefix, pattern, range, fields (nested rules for dict values), items (item type
+# for lists). ``$any_of`` lists field groups of which at least one is needed.
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    '1.0': {
+        'type': {'type': str, 'required': True, 'nonempty': True},
+        'url': {'type': str, 'prefix': ('http://', 'https://')},
+        'title': {'type': str},
+        'content': {'type': str},
+        'platform': {'type': str},
+        'timestamp': {'type': str, 'pattern': _ISO_TIMESTAMP},
+        'metadata': {'type': dict, 'fields': {
+            'author': {'type': str},
+            'tags': {'type': list, 'items': str},
+            'relevance_score': {'type': (int, float), 'range': (0.0, 1.0)},
+            'engagement': {'type': dict},
+        }},
+        '$any_of': [('url', 'content')],
+    },
+}
+
+Errors = List[Tuple[str, str]]
+Validator = Callable[[Any], Errors]
+
+_TYPE_NAMES = {str: 'string', dict: 'object', list: 'array', int: 'number', float: 'number'}
+
+
+class SchemaError(ValueError):
+    """Raised for unknown schema versions and, in strict mode, invalid sources."""
+
+
+def _type_name(types) -> str:
+    types = types if isinstance(types, tuple) else (types,)
+    return ' or '.join(sorted({_TYPE_NAMES.get(t, t.__name__) for t in types}))
+
+
+def _type_test(var: str, types) -> str:
+    """Exact class test (JSON values are never subclasses; excludes bool from numbers)."""
+    types = types if isinstance(types, tuple) else (types,)
+    return ' or '.join(f"{var}.__class__ is {t.__name__}" for t in types)
+
+
+def _emit_fields(rules: Dict[str, Any], record: str, prefix: str, depth: int,
+                 lines: List[str], constants: Dict[str, Any], ids: Iterator[int]) -> None:
+    """Append the checks of ``rules`` on dict variable ``record`` to ``lines``."""
+    pad = '    ' * depth
+    for name, rule in rules.items():
+        if name.startswith('$'):
+            continue
+        path = prefix + name
+        var = f"v{next(ids)}"
+        lines.append(f"{pad}{var} = {record}.get({name!r})")
+        lines.append(f"{pad}if {var} is None:")
+        if rule.get('required'):
+            lines.append(f"{pad}    errors.append(({path!r}, 'is required'))")
+        else:
+            lines.append(f"{pad}    pass")
+        lines.append(f"{pad}elif not ({_type_test(var, rule['type'])}):")
+        lines.append(f"{pad}    errors.append(({path!r}, {'must be ' + _type_name(rule['type'])!r}))")
+        if rule.get('nonempty'):
+            lines.append(f"{pad}elif not {var}.strip():")
+            lines.append(f"{pad}    errors.append(({path!r}, 'must not be empty'))")
+        if 'prefix' in rule:
+            lines.append(f"{pad}elif not {var}.startswith({tuple(rule['prefix'])!r}):")
+            lines.append(f"{pad}    errors.append(({path!r}, 'has an invalid format'))")
+        if 'pattern' in rule:
+            match = f"match_{next(ids)}"
+            constants[match] = re.compile(rule['pattern']).match
+            lines.append(f"{pad}elif {match}({var}) is None:")
+            lines.append(f"{pad}    errors.append(({path!r}, 'has an invalid format'))")
+        if 'range' in rule:
+            low, high = rule['range']
+            lines.append(f"{pad}elif not {low!r} <= {var} <= {high!r}:")
+            lines.append(f"{pad}    errors.append(({path!r}, {f'must be between {low} and {high}'!r}))")
+        if 'items' in rule:
+            items = f"items_{next(ids)}"
+            types = rule['items'] if isinstance(rule['items'], tuple) else (rule['items'],)
+            constants[items] = frozenset(types)
+            lines.append(f"{pad}elif not {items}.issuperset(map(type, {var})):")
+            lines.append(f"{pad}    errors.append(({path!r}, {'items must be ' + _type_name(rule['items'])!r}))")
+        if 'fields' in rule:
+            lines.append(f"{pad}else:")
+            _emit_fields(rule['fields'], var, path + '.', depth + 1, lines, constants, ids)
+
+
+def compile_schema(rules: Dict[str, Any]) -> Validator:
+    """
+    Compile field rules into a validation function.
+
+    The rules are translated into straight-line Python source (one
+    ``get`` and a few class/pattern tests per field) that is compiled once,
+    so no rule tables are interpreted per source.
+
+    Args:
+        rules: Field rules in the ``SCHEMAS`` format
+
+    Returns:
+        Function mapping a source to a list of (field, message) errors
+    """
+    lines = ["def validate(source):",
+             "    if source.__class__ is not dict:",
+             "        return [('$', 'must be an object')]",
+             "    errors = []"]
+    constants: Dict[str, Any] = {}
+    _emit_fields(rules, 'source', '', 1, lines, constants, count())
+    for group in rules.get('$any_of', ()):
+        test = ' and '.join(f"not source.get({name!r})" for name in group)
+        lines.append(f"    if {test}:")
+        lines.append(f"        errors.append(({'|'.join(group)!r}, 'at least one is required'))")
+    lines.append("    return errors")
+
+    namespace = dict(constants)
+    exec(compile('\n'.join(lines), '<muninn.schema>', 'exec'), namespace)
+    return namespace['validate']
+
+
+_validators: Dict[str, Validator] = {}
+
+
+def get_validator(version: str = DEFAULT_SCHEMA_VERSION) -> Validator:
+    """
+    Return the compiled validator for a schema version.
+
+    Args:
+        version: Huginn schema version
+
+    Returns:
+        Function mapping a source to a list of (field, message) errors
+
+    Raises:
+        SchemaError: If the version is unknown
+    """
+    validator = _validators.get(version)
+    if validator is None:
+        if version not in SCHEMAS:
+            raise SchemaError(f"Unknown Huginn schema version: {version}")
+        validator = _validators[version] = compile_schema(SCHEMAS[version])
+    return validator
+
+
+class SchemaValidator:
+    """
+    Streaming validation of sources with per-field error counts.
+    """
+
+    def __init__(self, version: str = DEFAULT_SCHEMA_VERSION, mode: str = 'quarantine',
+                 quarantine_path: Optional[str] = None):
+        """
+        Initialize the validator.
+
+        Args:
+            version: Huginn schema version to validate against
+            mode: 'reject' drops invalid sources, 'quarantine' also writes
+                them with their errors to ``quarantine_path``, 'strict'
+                raises ``SchemaError`` on the first invalid source
+            quarantine_path: JSON Lines file for quarantined sources
+        """
+        if mode not in MODES:
+            raise SchemaError(f"Unknown validation mode: {mode}")
+        self.version = version
+        self.validate = get_validator(version)
+        self.mode = mode
+        self.quarantine_path = Path(quarantine_path) if quarantine_path else None
+        self.valid = 0
+        self.invalid = 0
+        self.field_errors: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    quarantine_path: Optional[str] = None) -> Optional['SchemaValidator']:
+        """
+        Create a validator from the full configuration.
+
+        Uses ``data.validate_schema``, ``data.invalid_sources`` and
+        ``integration.huginn.expected_schema_version``.
+
+        Returns:
+            Validator, or None if validation is disabled
+        """
+        data_config = config.get('data', {})
+        if not data_config.get('validate_schema', True):
+            return None
+        huginn = config.get('integration', {}).get('huginn', {})
+        return cls(str(huginn.get('expected_schema_version', DEFAULT_SCHEMA_VERSION)),
+                   data_config.get('invalid_sources', 'quarantine'), quarantine_path)
+
+    def check_header(self, header: Dict[str, Any]) -> None:
+        """Warn when a collection declares a different schema version."""
+        declared = header.get('schema_version')
+        if declared is not None and str(declared) != self.version:
+            logger.warning(f"Collection declares schema version {declared}, "
+                           f"validating against {self.version}")
+
+    def filter(self, sources: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield valid sources, dropping (and quarantining) invalid ones.
+
+        Args:
+            sources: Sources as they are parsed
+
+        Yields:
+            Sources that passed validation
+
+        Raises:
+            SchemaError: In strict mode, for the first invalid source
+        """
+        validate = self.validate
+        quarantine = None
+        try:
+            for index, source in enumerate(sources):
+                errors = validate(source)
+                if not errors:
+                    self.valid += 1
+                    yield source
+                    continue
+
+                self.invalid += 1
+                for field, _ in errors:
+                    self.field_errors[field] = self.field_errors.get(field, 0) + 1
+                if self.mode == 'strict':
+                    raise SchemaError(f"Invalid source #{index}: "
+                                      + '; '.join(f"{f} {m}" for f, m in errors))
+                if self.mode == 'quarantine' and self.quarantine_path is not None:
+                    if quarantine is None:
+                        self.quarantine_path.parent.mkdir(parents=True, exist_ok=True)
+                        quarantine = open(self.quarantine_path, 'a', encoding='utf-8')
+                    record = {'index': index, 'errors': [f"{f} {m}" for f, m in errors],
+                              'source': source}
+                    quarantine.write(json.dumps(record, default=str) + '\n')
+        finally:
+            if quarantine is not None:
+                quarantine.close()
+            if self.invalid:
+                logger.warning(f"Dropped {self.invalid} invalid sources "
+                               f"(schema {self.version}): {self.summary()['field_errors']}")
+
+    def summary(self) -> Dict[str, Any]:
+        """Validation counts, suitable for collection metadata."""
+        return {
+            'schema_version': self.version,
+            'valid': self.valid,
+            'invalid': self.invalid,
+            'field_errors': dict(sorted(self.field_errors.items(),
+                                        key=lambda item: item[1], reverse=True)),
+        }
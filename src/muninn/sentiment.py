@@ -0,0 +1,517 @@
+"""
+Lexicon-based sentiment scoring.
+
+Sources are tokenized and scored a batch at a time with NumPy: lexicon
+words are found with array operations over the batch's bytes, negators
+flip (and dampen) the valence of the following words, boosters amplify
+the next word, and per-source sums are normalized into a compound score
+between -1.0 and 1.0 with ``np.bincount``. Large collections are split
+into chunks scored in a process pool; only the text crosses process
+boundaries.
+
+Scores are aggregated by platform, author and theme. Sources with both
+positive and negative words whose compound score stays close to zero are
+marked ambiguous; only those are worth sending to the model
+(``analysis.llm_sentiment``).
+
+NumPy is an optional dependency (``pip install muninn[full]``).
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Valence of sentiment-bearing words (-4 very negative .. 4 very positive)
+LEXICON = {
+    # Positive
+    'good': 1.9, 'great': 3.1, 'excellent': 3.2, 'amazing': 2.8, 'awesome': 3.1, 'best': 3.2,
+    'better': 1.9, 'nice': 1.8, 'love': 3.2, 'like': 1.5, 'happy': 2.7, 'glad': 2.0,
+    'thanks': 1.9, 'thank': 1.5, 'helpful': 1.8, 'useful': 1.9, 'win': 2.8, 'wins': 2.7,
+    'success': 2.7, 'successful': 2.8, 'safe': 1.9, 'secure': 1.4, 'secured': 1.5,
+    'protected': 1.3, 'fixed': 1.1, 'patched': 1.2, 'resolved': 1.6, 'restored': 1.5,
+    'recovered': 1.6, 'mitigated': 1.2, 'improved': 1.9, 'improvement': 1.8, 'stable': 1.2,
+    'reliable': 1.9, 'trust': 2.3, 'trusted': 2.1, 'confident': 2.2, 'support': 1.7,
+    'supported': 1.3, 'welcome': 2.0, 'positive': 2.6, 'strong': 2.3, 'effective': 2.1,
+    'arrested': 0.8, 'dismantled': 0.9, 'disrupted': 0.4, 'takedown': 0.7, 'seized': 0.3,
+    'impressive': 3.0, 'fantastic': 3.1, 'wonderful': 3.1, 'perfect': 2.9, 'easy': 1.9,
+    'hope': 1.9, 'hopeful': 2.3, 'optimistic': 2.0, 'relief': 2.1, 'praise': 2.6,
+    # Negative
+    'bad': -2.5, 'worse': -2.1, 'worst': -3.1, 'terrible': -2.5, 'awful': -2.0, 'horrible': -2.5,
+    'hate': -2.7, 'angry': -2.3, 'sad': -2.1, 'fear': -2.2, 'afraid': -1.9, 'worried': -1.2,
+    'concern': -0.9, 'concerns': -1.0, 'concerning': -1.2, 'problem': -1.7, 'problems': -1.7,
+    'issue': -0.8, 'issues': -0.8, 'fail': -2.5, 'failed': -2.3, 'failure': -2.3, 'broken': -2.0,
+    'error': -1.6, 'errors': -1.6, 'crash': -1.7, 'outage': -1.9, 'down': -0.9, 'slow': -1.0,
+    'attack': -2.1, 'attacks': -2.1, 'attacked': -2.3, 'breach': -2.4, 'breached': -2.4,
+    'compromised': -2.4, 'hacked': -2.3, 'leak': -1.8, 'leaked': -1.9, 'stolen': -2.4,
+    'theft': -2.3, 'fraud': -2.8, 'scam': -2.6, 'scams': -2.6, 'phishing': -2.0,
+    'malware': -2.2, 'ransomware': -2.5, 'exploit': -1.7, 'exploited': -2.0, 'vulnerable': -1.8,
+    'vulnerability': -1.5, 'threat': -2.4, 'threats': -2.4, 'threatened': -2.0, 'dangerous': -2.1,
+    'danger': -2.4, 'risk': -1.1, 'risky': -1.4, 'critical': -1.3, 'severe': -1.8,
+    'damage': -2.2, 'destroyed': -2.8, 'disaster': -3.1, 'crisis': -3.1, 'panic': -2.5,
+    'victim': -2.0, 'victims': -2.1, 'killed': -3.5, 'dead': -3.3, 'death': -2.9,
+    'violence': -3.1, 'war': -2.9, 'illegal': -2.6, 'criminal': -2.4, 'abuse': -3.2,
+    'disinformation': -2.0, 'misinformation': -1.9, 'propaganda': -1.5, 'fake': -2.1,
+    'suspicious': -1.5, 'malicious': -2.6, 'unauthorized': -1.9, 'lost': -1.3, 'loss': -1.3,
+    'warning': -1.4, 'alert': -0.8, 'urgent': -0.9, 'blame': -1.4, 'sucks': -1.5, 'wtf': -2.8,
+}
+
+# Words flipping the valence of the following NEGATION_SCOPE words
+NEGATIONS = frozenset((
+    'not', 'no', 'never', 'none', 'nobody', 'nothing', 'neither', 'nor', 'without', 'cannot',
+    "can't", "don't", "doesn't", "didn't", "isn't", "aren't", "wasn't", "weren't", "won't",
+    "wouldn't", "shouldn't", "couldn't", "hasn't", "haven't", "hadn't", 'cant', 'dont',
+    'doesnt', 'didnt', 'isnt', 'arent', 'wasnt', 'werent', 'wont',
+))
+
+# Words amplifying the valence of the next word
+BOOSTERS = frozenset((
+    'very', 'extremely', 'highly', 'really', 'totally', 'absolutely', 'completely', 'hugely',
+    'incredibly', 'so', 'most', 'major', 'massive', 'seriously',
+))
+
+NEGATION_SCOPE = 3
+NEGATION_FACTOR = -0.74
+BOOST_FACTOR = 1.3
+
+# Normalization constant of the compound score: sum / sqrt(sum^2 + alpha)
+ALPHA = 15.0
+
+# Compound scores at or beyond these are positive / negative
+LABEL_THRESHOLD = 0.05
+
+# Mixed sources with |compound| below this are ambiguous
+DEFAULT_AMBIGUITY = 0.25
+
+# Groups listed per aggregation
+DEFAULT_MAX_GROUPS = 20
+
+# Sources below which scoring runs in-process (pool startup dominates)
+MIN_PARALLEL_SOURCES = 5000
+
+# Texts per worker task
+SCORE_CHUNK_SIZE = 2048
+
+# Valence assigned to sources labelled by the model
+MODEL_LABEL_SCORES = {'positive': 0.5, 'negative': -0.5, 'neutral': 0.0}
+
+SENTIMENT_PROMPT = """Classify the overall sentiment of the following text as positive,
+negative or neutral. Respond with one word only.
+
+{text}
+"""
+
+# Maximum characters of source text in a sentiment prompt
+MAX_PROMPT_TEXT = 2000
+
+_WORD_RE = re.compile(r"[a-z]+")
+_LEXICON_WORD = re.compile(r"[a-z]+(?:'[a-z]+)*")
+
+# Vocabulary ids: 0 unused, 1 negator, 2 booster, 3.. lexicon words
+_NEGATION, _BOOSTER = 1, 2
+
+# Word keys: keys = (keys + masked 8-byte block) * multiplier, per block
+if np is not None:
+    _KEY_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+    _BYTE_MASKS = np.array([(1 << (8 * count)) - 1 for count in range(9)], dtype=np.uint64)
+
+
+def require_numpy() -> None:
+    """Raise an informative ImportError if NumPy is not installed."""
+    if np is None:
+        raise ImportError("Sentiment analysis requires numpy (pip install muninn[full])")
+
+
+def source_text(source: Any) -> str:
+    """Text of a source scored for sentiment (title and content)."""
+    title = source.get('title') or ''
+    content = source.get('content') or ''
+    return f"{title}\n{content}" if title else content
+
+
+def load_lexicon(path: str) -> Dict[str, float]:
+    """
+    Load extra lexicon entries from a file.
+
+    Every non-empty, non-comment line holds a word and its valence,
+    separated by whitespace.
+
+    Raises:
+        ValueError: For lines that are not a word and a number
+    """
+    lexicon = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.rsplit(None, 1)
+            try:
+                lexicon[parts[0].lower()] = float(parts[1])
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}:{number}: expected '<word> <valence>'") from None
+    return lexicon
+
+
+class Lexicon:
+    """
+    Token vocabulary and valence table for vectorized scoring.
+
+    Texts are tokenized as bytes: words are runs of ASCII letters (with
+    inner apostrophes), found with array comparisons over the whole batch.
+    Each candidate word is reduced to a 64-bit key built from its bytes
+    read eight at a time, and looked up in a hash table of the vocabulary
+    keys, so no Python object is created per token.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, float]] = None):
+        """
+        Initialize the lexicon.
+
+        Args:
+            entries: Word valences (default: ``LEXICON``); entries that are
+                not single ASCII words of two or more letters are ignored
+        """
+        require_numpy()
+        entries = LEXICON if entries is None else entries
+        self.vocabulary = dict.fromkeys(NEGATIONS, _NEGATION)
+        self.vocabulary.update(dict.fromkeys(BOOSTERS, _BOOSTER))
+        valences = [0.0, 0.0, 0.0]
+        for word, valence in entries.items():
+            word = word.lower()
+            if len(word) < 2 or not _LEXICON_WORD.fullmatch(word):
+                logger.warning(f"Ignoring lexicon entry {word!r}: not a single ASCII word")
+                continue
+            self.vocabulary[word] = len(valences)
+            valences.append(float(valence))
+        self.valences = np.array(valences, dtype=np.float64)
+
+        words = list(self.vocabulary)
+        data = np.frombuffer(' '.join(words).encode('ascii'), dtype=np.uint8)
+        lengths = np.array([len(word) for word in words], dtype=np.int64)
+        starts = np.zeros(len(words), dtype=np.int64)
+        np.cumsum(lengths[:-1] + 1, out=starts[1:])
+        self.min_length, self.max_length = int(lengths.min()), int(lengths.max())
+        # Eight-byte blocks per key, and the two-letter prefixes of the words
+        self.blocks = -(-self.max_length // 8)
+        self.prefixes = np.zeros(1 << 16, dtype=bool)
+        self.prefixes[_pairs(data)[starts]] = True
+
+        keys = self._keys(data, starts, lengths)
+        if len(np.unique(keys)) != len(keys):  # pragma: no cover - 64-bit collision
+            raise ValueError("Lexicon words have colliding keys")
+
+        # Hash table: the top bits of a key select a bucket of the keys
+        # sorted by bucket; buckets hold at most ``depth`` keys
+        bits = max(10, (4 * len(keys) - 1).bit_length())
+        self.shift = np.uint64(64 - bits)
+        buckets = (keys >> self.shift).astype(np.int64)
+        order = np.argsort(buckets, kind='stable')
+        self.keys = keys[order]
+        self.ids = np.array([self.vocabulary[word] for word in words], dtype=np.int32)[order]
+        self.bucket_starts = np.searchsorted(buckets[order], np.arange(1 << bits))
+        self.bucket_sizes = np.bincount(buckets, minlength=1 << bits)
+        self.depth = int(self.bucket_sizes.max())
+
+    def _keys(self, data: 'np.ndarray', starts: 'np.ndarray', lengths: 'np.ndarray') -> 'np.ndarray':
+        """64-bit keys of the words at ``starts`` in a byte array."""
+        padded = np.zeros(len(data) + 8 * self.blocks + 8, dtype=np.uint8)
+        padded[:len(data)] = data
+        # Overlapping view: element i holds bytes i..i+7 (little-endian)
+        blocks = np.ndarray((len(data) + 8 * self.blocks,), dtype='<u8', buffer=padded, strides=(1,))
+        keys = np.zeros(len(starts), dtype=np.uint64)
+        for block in range(self.blocks):
+            remaining = np.clip(lengths - 8 * block, 0, 8)
+            keys = (keys + (blocks[starts + 8 * block] & _BYTE_MASKS[remaining])) * _KEY_MULTIPLIER
+        return keys
+
+    def lookup(self, keys: 'np.ndarray') -> 'np.ndarray':
+        """Vocabulary ids of word keys (0 where not in the vocabulary)."""
+        buckets = (keys >> self.shift).astype(np.int64)
+        starts = self.bucket_starts[buckets]
+        sizes = self.bucket_sizes[buckets]
+        ids = np.zeros(len(keys), dtype=np.int32)
+        for probe in range(self.depth):
+            rows = np.flatnonzero(sizes > probe)
+            slots = starts[rows] + probe
+            found = self.keys[slots] == keys[rows]
+            ids[rows[found]] = self.ids[slots[found]]
+        return ids
+
+    def tokens(self, texts: Sequence[str]) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """
+        Find the vocabulary words of a batch of texts.
+
+        Args:
+            texts: Texts to tokenize
+
+        Returns:
+            Tuple of (token positions, text indices, vocabulary ids) of
+            every vocabulary word, in text order
+        """
+        encoded = [text.lower().encode('utf-8', 'replace') for text in texts]
+        text_starts = np.zeros(len(encoded), dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))[:-1] + 1,
+                  out=text_starts[1:])
+        data = np.frombuffer(b' '.join(encoded), dtype=np.uint8)
+
+        letters = (data >= 97) & (data <= 122)
+        apostrophes = np.flatnonzero(data[1:-1] == 39) + 1
+        letters[apostrophes] = letters[apostrophes - 1] & letters[apostrophes + 1]
+        edges = np.flatnonzero(np.diff(letters, prepend=False, append=False))
+        starts, lengths = edges[0::2], edges[1::2] - edges[0::2]
+
+        candidates = np.flatnonzero((lengths >= self.min_length) & (lengths <= self.max_length)
+                                    & self.prefixes[_pairs(data)[starts]])
+        ids = self.lookup(self._keys(data, starts[candidates], lengths[candidates]))
+        hits = np.flatnonzero(ids)
+        positions = candidates[hits]
+        docs = np.searchsorted(text_starts, starts[positions], side='right') - 1
+        return positions, docs, ids[hits]
+
+    def score(self, texts: Sequence[str]) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """
+        Score a batch of texts.
+
+        Args:
+            texts: Texts to score
+
+        Returns:
+            Tuple of (compound scores in [-1, 1], positive word counts,
+            negative word counts), one entry per text
+        """
+        n = len(texts)
+        positions, docs, ids = self.tokens(texts) if n else (np.empty(0, np.int64),) * 3
+        values = self.valences[ids]
+
+        # A negator among the previous NEGATION_SCOPE tokens is among the
+        # previous NEGATION_SCOPE vocabulary words
+        negators = ids == _NEGATION
+        negated = np.zeros(len(ids), dtype=bool)
+        for distance in range(1, min(NEGATION_SCOPE + 1, len(ids))):
+            negated[distance:] |= (negators[:-distance]
+                                   & (positions[distance:] - positions[:-distance] <= NEGATION_SCOPE)
+                                   & (docs[distance:] == docs[:-distance]))
+        values[negated] *= NEGATION_FACTOR
+        if len(ids) > 1:
+            boosted = np.zeros(len(ids), dtype=bool)
+            boosted[1:] = ((ids[:-1] == _BOOSTER) & (positions[1:] - positions[:-1] == 1)
+                           & (docs[1:] == docs[:-1]))
+            values[boosted] *= BOOST_FACTOR
+
+        sums = np.bincount(docs, weights=values, minlength=n)
+        positive = np.bincount(docs, weights=values > 0, minlength=n).astype(np.int64)
+        negative = np.bincount(docs, weights=values < 0, minlength=n).astype(np.int64)
+        compound = sums / np.sqrt(sums * sums + ALPHA)
+        return compound, positive, negative
+
+
+def _pairs(data: 'np.ndarray') -> 'np.ndarray':
+    """Overlapping view of a byte array: element i holds bytes i and i+1."""
+    padded = np.zeros(len(data) + 1, dtype=np.uint8)
+    padded[:len(data)] = data
+    return np.ndarray((len(data),), dtype='<u2', buffer=padded, strides=(1,))
+
+
+# Lexicon of worker processes, set by the pool initializer
+_worker_lexicon: Optional[Lexicon] = None
+
+
+def _init_worker(entries: Optional[Dict[str, float]]) -> None:
+    global _worker_lexicon
+    _worker_lexicon = Lexicon(entries)
+
+
+def _score_chunk(texts: List[str]) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """Score a chunk of texts (runs in a worker process)."""
+    return _worker_lexicon.score(texts)
+
+
+class SentimentScorer:
+    """
+    Score many sources, in parallel for large collections.
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None, workers: Optional[int] = None,
+                 ambiguity: float = DEFAULT_AMBIGUITY, min_parallel: int = MIN_PARALLEL_SOURCES):
+        """
+        Initialize the scorer.
+
+        Args:
+            lexicon: Word valences (default: ``LEXICON``)
+            workers: Worker processes (default: CPU count)
+            ambiguity: Compound magnitude below which mixed sources are ambiguous
+            min_parallel: Smallest number of sources worth a process pool
+        """
+        require_numpy()
+        self.entries = lexicon
+        self.lexicon = Lexicon(lexicon)
+        self.workers = workers or os.cpu_count() or 1
+        self.ambiguity = ambiguity
+        self.min_parallel = min_parallel
+
+    def score(self, sources: Iterable[Any]) -> Dict[str, 'np.ndarray']:
+        """
+        Score every source.
+
+        Args:
+            sources: Source dictionaries or a ``SourceTable``
+
+        Returns:
+            Arrays aligned with the sources: 'compound', 'positive' and
+            'negative' (word counts) and 'ambiguous' (boolean)
+        """
+        texts = [source_text(source) for source in sources]
+        chunks = [texts[i:i + SCORE_CHUNK_SIZE] for i in range(0, len(texts), SCORE_CHUNK_SIZE)]
+        if self.workers <= 1 or len(texts) < self.min_parallel:
+            parts = [self.lexicon.score(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)),
+                                     initializer=_init_worker, initargs=(self.entries,)) as executor:
+                parts = list(executor.map(_score_chunk, chunks))
+        if parts:
+            compound, positive, negative = (np.concatenate(column) for column in zip(*parts))
+        else:
+            compound, positive, negative = self.lexicon.score([])
+        ambiguous = (positive > 0) & (negative > 0) & (np.abs(compound) < self.ambiguity)
+        return {'compound': compound, 'positive': positive, 'negative': negative,
+                'ambiguous': ambiguous}
+
+
+def labels(compound: 'np.ndarray') -> 'np.ndarray':
+    """Label compound scores as 'positive', 'negative' or 'neutral'."""
+    return np.where(compound >= LABEL_THRESHOLD, 'positive',
+                    np.where(compound <= -LABEL_THRESHOLD, 'negative', 'neutral'))
+
+
+def aggregate(compound: 'np.ndarray', keys: Sequence[Optional[str]],
+              max_groups: int = DEFAULT_MAX_GROUPS) -> List[Dict[str, Any]]:
+    """
+    Aggregate compound scores per key.
+
+    Args:
+        compound: Compound score of every source
+        keys: Group of every source (None to leave a source out)
+        max_groups: Largest groups returned
+
+    Returns:
+        Groups by descending size, each with 'name', 'sources', 'mean' and
+        'positive'/'neutral'/'negative' counts
+    """
+    known = np.fromiter((key is not None for key in keys), dtype=bool, count=len(keys))
+    if not known.any():
+        return []
+    names, inverse = np.unique(np.array([key for key in keys if key is not None], dtype=object),
+                               return_inverse=True)
+    scores = compound[known]
+    size = len(names)
+    counts = np.bincount(inverse, minlength=size)
+    sums = np.bincount(inverse, weights=scores, minlength=size)
+    positive = np.bincount(inverse, weights=scores >= LABEL_THRESHOLD, minlength=size)
+    negative = np.bincount(inverse, weights=scores <= -LABEL_THRESHOLD, minlength=size)
+    order = np.lexsort((names.astype(str), -counts))[:max_groups]
+    return [{
+        'name': str(names[i]),
+        'sources': int(counts[i]),
+        'mean': round(float(sums[i] / counts[i]), 4),
+        'positive': int(positive[i]),
+        'neutral': int(counts[i] - positive[i] - negative[i]),
+        'negative': int(negative[i]),
+    } for i in order.tolist()]
+
+
+def _platform(source: Any) -> Optional[str]:
+    return source.get('platform') or source.get('type') or None
+
+
+def _author(source: Any) -> Optional[str]:
+    metadata = source.get('metadata')
+    author = metadata.get('author') if isinstance(metadata, dict) else None
+    return author if isinstance(author, str) and author else None
+
+
+def classify_ambiguous(texts: List[str], executor) -> List[Optional[str]]:
+    """
+    Ask the model for the sentiment label of ambiguous texts.
+
+    Args:
+        texts: Texts to classify
+        executor: ``InferenceExecutor`` used for the prompts
+
+    Returns:
+        'positive', 'negative' or 'neutral' per text, or None where the
+        response was not a label
+    """
+    prompts = [SENTIMENT_PROMPT.format(text=text[:MAX_PROMPT_TEXT]) for text in texts]
+    results = []
+    for response in executor.run(prompts):
+        words = _WORD_RE.findall((response or '').lower())
+        results.append(words[0] if words and words[0] in MODEL_LABEL_SCORES else None)
+    return results
+
+
+def analyze_sentiment(sources: Sequence[Any], config: Optional[Dict[str, Any]] = None,
+                      themes: Optional[List[Dict[str, Any]]] = None,
+                      executor=None) -> Dict[str, Any]:
+    """
+    Convenience function to score and aggregate the sentiment of sources.
+
+    Args:
+        sources: Source dictionaries or a ``SourceTable``
+        config: Optional settings: ``sentiment_lexicon`` (file of extra
+            word valences), ``sentiment_workers`` (processes, default CPU
+            count), ``sentiment_ambiguity`` and ``max_sentiment_groups``
+        themes: Optional themes with 'name' or 'label' and member
+            'sources' (positions in ``sources``)
+        executor: Optional ``InferenceExecutor``; ambiguous sources are
+            then labelled by the model
+
+    Returns:
+        Overall mean and label distribution, ambiguity counts and the
+        'by_platform', 'by_author' and 'by_theme' aggregates
+    """
+    config = config or {}
+    lexicon = None
+    if config.get('sentiment_lexicon'):
+        lexicon = dict(LEXICON, **load_lexicon(config['sentiment_lexicon']))
+    scorer = SentimentScorer(lexicon, config.get('sentiment_workers'),
+                             config.get('sentiment_ambiguity', DEFAULT_AMBIGUITY))
+    scores = scorer.score(sources)
+    compound = scores['compound']
+
+    ambiguous = np.flatnonzero(scores['ambiguous'])
+    model_scored = 0
+    if executor is not None and len(ambiguous):
+        found = classify_ambiguous([source_text(sources[i]) for i in ambiguous.tolist()], executor)
+        for i, label in zip(ambiguous.tolist(), found):
+            if label is not None:
+                compound[i] = MODEL_LABEL_SCORES[label]
+                model_scored += 1
+        logger.info(f"Model labelled {model_scored} of {len(ambiguous)} ambiguous sources")
+
+    max_groups = config.get('max_sentiment_groups', DEFAULT_MAX_GROUPS)
+    theme_keys: List[Optional[str]] = [None] * len(compound)
+    for theme in themes or []:
+        for position in theme['sources']:
+            theme_keys[position] = theme.get('name') or theme['label']
+
+    distribution = dict(zip(*np.unique(labels(compound), return_counts=True))) if len(compound) else {}
+    return {
+        'sources': len(compound),
+        'mean': round(float(compound.mean()), 4) if len(compound) else 0.0,
+        'distribution': {label: int(distribution.get(label, 0))
+                         for label in ('positive', 'neutral', 'negative')},
+        'ambiguous': len(ambiguous),
+        'model_scored': model_scored,
+        'by_platform': aggregate(compound, [_platform(source) for source in sources], max_groups),
+        'by_author': aggregate(compound, [_author(source) for source in sources], max_groups),
+        'by_theme': aggregate(compound, theme_keys, max_groups),
+    }
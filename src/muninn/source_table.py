@@ -0,0 +1,329 @@
+"""
+Compact columnar storage for Huginn sources.
+
+A ``SourceTable`` holds millions of sources without the per-dict overhead of
+``List[Dict[str, Any]]``. Repeated strings (``type``, ``platform``,
+``metadata.author``) are interned into a shared pool and stored as integer
+codes, ``timestamp`` and ``metadata.relevance_score`` are kept in
+``array('d')`` columns, and variable-length text (``url``, ``title``,
+``content``) lives in one shared UTF-8 buffer addressed by offsets.
+
+Rows are exposed as read-only ``Mapping`` views, so code written against
+source dictionaries (``source.get('url')``, ``source['metadata']``) works
+unchanged.
+"""
+
+import json
+import logging
+import math
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fields stored in the shared text buffer, in segment order
+TEXT_FIELDS = ('url', 'title', 'content')
+
+# Interned string columns: field name -> (location, key)
+INTERNED_FIELDS = {
+    'type': ('source', 'type'),
+    'platform': ('source', 'platform'),
+    'author': ('metadata', 'author'),
+}
+
+_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+_MISSING = -1
+_NAN = float('nan')
+
+# One extra buffer segment per row holds any fields without a dedicated column
+_EXTRA_SEGMENT = len(TEXT_FIELDS)
+_SEGMENTS = len(TEXT_FIELDS) + 1
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Parse a canonical ``YYYY-MM-DDTHH:MM:SSZ`` timestamp to epoch seconds.
+
+    Args:
+        value: Timestamp string from a Huginn source
+
+    Returns:
+        Epoch seconds, or None if the value is not in canonical UTC form
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.strptime(value, _TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=timezone.utc).timestamp()
+
+
+def format_timestamp(epoch: float) -> str:
+    """Format epoch seconds back into the canonical Huginn timestamp form."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime(_TIMESTAMP_FORMAT)
+
+
+class SourceRow(Mapping):
+    """
+    Read-only dictionary view of one row of a ``SourceTable``.
+
+    Values are materialized from the table columns on access; nothing is
+    copied when the view is created. Fields without a dedicated column are
+    decoded from their JSON segment once per view, on first access.
+    """
+
+    __slots__ = ('_table', '_index', '_extra')
+
+    def __init__(self, table: 'SourceTable', index: int):
+        self._table = table
+        self._index = index
+        self._extra: Optional[Dict[str, Any]] = None
+
+    def _extras(self) -> Dict[str, Any]:
+        if self._extra is None:
+            self._extra = self._table._extra(self._index)
+        return self._extra
+
+    def _keys(self) -> List[str]:
+        table = self._table
+        i = self._index
+        keys = []
+        if table._codes['type'][i] != _MISSING:
+            keys.append('type')
+        if table._codes['platform'][i] != _MISSING:
+            keys.append('platform')
+        for field in TEXT_FIELDS:
+            if table._has_segment(i, TEXT_FIELDS.index(field)):
+                keys.append(field)
+        extra = self._extras()
+        if not math.isnan(table._timestamps[i]) or 'timestamp' in extra:
+            keys.append('timestamp')
+        keys.extend(k for k in extra if k not in ('timestamp', 'metadata'))
+        if table._has_metadata(i, extra):
+            keys.append('metadata')
+        return keys
+
+    def __getitem__(self, key: str) -> Any:
+        table = self._table
+        i = self._index
+        if key in ('type', 'platform'):
+            code = table._codes[key][i]
+            if code != _MISSING:
+                return table._strings[code]
+        elif key in TEXT_FIELDS:
+            segment = TEXT_FIELDS.index(key)
+            if table._has_segment(i, segment):
+                return table._text(i, segment)
+        elif key == 'timestamp':
+            ts = table._timestamps[i]
+            if not math.isnan(ts):
+                return format_timestamp(ts)
+        elif key == 'metadata':
+            extra = self._extras()
+            if not table._has_metadata(i, extra):
+                raise KeyError(key)
+            return table._metadata(i, extra)
+        return self._extras()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"SourceRow({dict(self)!r})"
+
+
+class SourceTable(Sequence):
+    """
+    Columnar, append-only container of Huginn sources.
+
+    Behaves like a sequence of source dictionaries: ``len(table)``,
+    ``table[i]`` and iteration all work, with each row returned as a
+    ``SourceRow`` mapping view.
+    """
+
+    def __init__(self, sources: Optional[Iterable[Dict[str, Any]]] = None):
+        """
+        Initialize the table.
+
+        Args:
+            sources: Optional iterable of source dictionaries to append
+        """
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+        self._codes = {field: array('i') for field in INTERNED_FIELDS}
+        self._timestamps = array('d')
+        self._relevance = array('d')
+        self._buffer = bytearray()
+        # Segment boundaries: row i, segment j spans
+        # offsets[i * _SEGMENTS + j] .. offsets[i * _SEGMENTS + j + 1]
+        self._offsets = array('Q', [0])
+        # Bit j set if text segment j is present (distinguishes '' from missing)
+        self._present = array('B')
+
+        if sources is not None:
+            self.extend(sources)
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SourceRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SourceTable index out of range")
+        return SourceRow(self, index)
+
+    def __iter__(self) -> Iterator[SourceRow]:
+        for i in range(len(self)):
+            yield SourceRow(self, i)
+
+    def __repr__(self) -> str:
+        return f"SourceTable({len(self)} sources, {len(self._strings)} interned strings)"
+
+    @property
+    def timestamps(self) -> array:
+        """Epoch-second timestamp column (NaN where missing or non-canonical)."""
+        return self._timestamps
+
+    @property
+    def relevance_scores(self) -> array:
+        """``metadata.relevance_score`` column (NaN where missing)."""
+        return self._relevance
+
+    def column(self, field: str) -> List[Optional[str]]:
+        """
+        Materialize an interned string column.
+
+        Args:
+            field: One of 'type', 'platform' or 'author'
+
+        Returns:
+            List with one value (or None) per row
+        """
+        strings = self._strings
+        return [strings[code] if code != _MISSING else None for code in self._codes[field]]
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column storage in bytes."""
+        columns = [self._timestamps, self._relevance, self._offsets, self._present]
+        columns.extend(self._codes.values())
+        return (len(self._buffer)
+                + sum(col.itemsize * len(col) for col in columns)
+                + sum(len(s) for s in self._strings))
+
+    def append(self, source: Dict[str, Any]) -> None:
+        """
+        Append one source dictionary to the table.
+
+        Args:
+            source: Source dictionary in the Huginn schema
+        """
+        extra = {k: v for k, v in source.items()
+                 if k not in TEXT_FIELDS and k not in ('type', 'platform', 'timestamp', 'metadata')}
+        metadata = source.get('metadata')
+        extra_metadata = None
+        if isinstance(metadata, dict):
+            extra_metadata = dict(metadata)
+        elif 'metadata' in source:
+            extra['metadata'] = metadata
+
+        for field, (location, key) in INTERNED_FIELDS.items():
+            container = source if location == 'source' else (extra_metadata or {})
+            value = container.get(key)
+            if isinstance(value, str):
+                self._codes[field].append(self._intern(value))
+                if location == 'metadata':
+                    del extra_metadata[key]
+            else:
+                self._codes[field].append(_MISSING)
+                if location == 'source' and key in source:
+                    extra[key] = value
+
+        timestamp = source.get('timestamp')
+        epoch = parse_timestamp(timestamp)
+        if epoch is not None and format_timestamp(epoch) == timestamp:
+            self._timestamps.append(epoch)
+        else:
+            self._timestamps.append(_NAN)
+            if 'timestamp' in source:
+                extra['timestamp'] = timestamp
+
+        score = extra_metadata.get('relevance_score') if extra_metadata is not None else None
+        if type(score) is float and not math.isnan(score):
+            self._relevance.append(score)
+            del extra_metadata['relevance_score']
+        else:
+            self._relevance.append(_NAN)
+
+        if extra_metadata is not None:
+            # Empty dict still records that the source had a metadata object
+            extra['metadata'] = extra_metadata
+
+        present = 0
+        for segment, field in enumerate(TEXT_FIELDS):
+            value = source.get(field)
+            if isinstance(value, str):
+                present |= 1 << segment
+                self._buffer += value.encode('utf-8')
+            elif field in source:
+                extra[field] = value
+            self._offsets.append(len(self._buffer))
+
+        if extra:
+            self._buffer += json.dumps(extra, separators=(',', ':')).encode('utf-8')
+        self._offsets.append(len(self._buffer))
+        self._present.append(present)
+
+    def extend(self, sources: Iterable[Dict[str, Any]]) -> None:
+        """Append every source from an iterable (e.g. a streaming loader)."""
+        for source in sources:
+            self.append(source)
+
+    def _intern(self, value: str) -> int:
+        code = self._string_codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._string_codes[value] = code
+        return code
+
+    def _segment(self, index: int, segment: int) -> memoryview:
+        base = index * _SEGMENTS + segment
+        return memoryview(self._buffer)[self._offsets[base]:self._offsets[base + 1]]
+
+    def _has_segment(self, index: int, segment: int) -> bool:
+        return bool(self._present[index] & (1 << segment))
+
+    def _text(self, index: int, segment: int) -> str:
+        return str(self._segment(index, segment), 'utf-8')
+
+    def _extra(self, index: int) -> Dict[str, Any]:
+        raw = self._segment(index, _EXTRA_SEGMENT)
+        return json.loads(str(raw, 'utf-8')) if len(raw) else {}
+
+    def _has_metadata(self, index: int, extra: Dict[str, Any]) -> bool:
+        return (self._codes['author'][index] != _MISSING
+                or not math.isnan(self._relevance[index])
+                or 'metadata' in extra)
+
+    def _metadata(self, index: int, extra: Dict[str, Any]) -> Any:
+        metadata = extra.get('metadata', {})
+        if not isinstance(metadata, dict):
+            return metadata
+        # A copy, so the decoded extra fields of the view stay as stored
+        metadata = dict(metadata)
+        code = self._codes['author'][index]
+        if code != _MISSING:
+            metadata['author'] = self._strings[code]
+        score = self._relevance[index]
+        if not math.isnan(score):
+            metadata['relevance_score'] = score
+        return metadata
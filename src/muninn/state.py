@@ -0,0 +1,357 @@
+"""
+Incremental analysis state shared across successive Huginn collections.
+
+Consecutive Huginn runs overlap heavily, so re-analyzing every collection
+from scratch wastes most of the model budget. ``AnalysisState`` keeps a
+compact snapshot between runs:
+
+- a seen-source index (source key -> content hash, per-source results and a
+  minimal citation record),
+- aggregated finding/entity counts,
+- the theme engine centroids and document frequencies,
+- the running executive summary.
+
+A new collection only sends new or changed sources through the pipeline;
+their results are merged into the state and the report is regenerated from
+the merged state, so an hourly run costs roughly as much as its delta.
+
+The state is a SQLite database keyed by source key, so a run only reads
+the records of the sources it sees and writes the records it changes
+instead of loading and rewriting the whole history. Finding and entity
+counts are kept as rows that merges increment and decrement.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import _ImmediateTransaction
+from .dedup import content_hash, normalize_url
+from .report_generator import _atomic_write
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 2
+
+# Source fields kept in the state for citing sources in regenerated reports
+CITATION_FIELDS = ('type', 'platform', 'url', 'title', 'timestamp')
+
+# Source keys looked up per query
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state_sources (
+    key TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    theme INTEGER,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state_counts (
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (kind, item)
+);
+CREATE INDEX IF NOT EXISTS idx_state_counts_rank ON state_counts (kind, count);
+CREATE TABLE IF NOT EXISTS state_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def source_key(source: Dict[str, Any]) -> str:
+    """
+    Stable identity of a source across collections.
+
+    Uses the normalized URL when present, otherwise the content hash.
+    """
+    url = normalize_url(source.get('url'))
+    if url:
+        return url
+    digest = content_hash(source.get('content'))
+    if digest:
+        return f"content:{digest}"
+    encoded = json.dumps(dict(source), sort_keys=True, default=str)
+    return f"raw:{hashlib.sha1(encoded.encode('utf-8')).hexdigest()}"
+
+
+def source_signature(source: Dict[str, Any]) -> str:
+    """Hash of the parts of a source whose change requires re-analysis."""
+    parts = [source.get('title') or '', source.get('content') or '']
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class AnalysisState:
+    """
+    Persistent, mergeable analysis state.
+
+    The state lives in a directory holding ``state.sqlite3`` and, when
+    themes are tracked, ``themes.npz``. Merges are written to the database
+    in one transaction that ``save`` commits; closing the state without
+    saving discards them.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Open the state stored in a directory (empty if none exists yet).
+
+        Args:
+            path: Directory where the state is stored
+            timeout: Seconds to wait for a lock held by another process
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path / 'state.sqlite3'), timeout=timeout,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._themes_changed = False
+
+        version = self._meta('version')
+        if version is not None and version != STATE_VERSION:
+            logger.warning(f"Ignoring incompatible analysis state in {path}")
+            with _ImmediateTransaction(self._conn):
+                for table in ('state_sources', 'state_counts', 'state_meta'):
+                    self._conn.execute(f'DELETE FROM {table}')
+        self.collections: List[str] = self._meta('collections', [])
+        self.summary: str = self._meta('summary', '')
+        self.theme_state: Optional[Dict[str, Any]] = None
+
+        themes_file = self.path / 'themes.npz'
+        theme_terms = self._meta('theme_terms')
+        if themes_file.exists() and theme_terms is not None:
+            import numpy as np
+            with np.load(themes_file) as arrays:
+                self.theme_state = {name: arrays[name] for name in arrays.files}
+            self.theme_state['n_docs'] = int(self.theme_state['n_docs'])
+            self.theme_state['terms'] = theme_terms
+
+    @classmethod
+    def load(cls, path: str) -> 'AnalysisState':
+        """
+        Open a state directory, returning an empty state if none exists.
+
+        Args:
+            path: Directory where the state is stored
+        """
+        state = cls(path)
+        logger.info(f"Loaded analysis state with {len(state)} sources "
+                    f"from {len(state.collections)} collections")
+        return state
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM state_sources').fetchone()[0]
+
+    def _meta(self, key: str, default: Any = None) -> Any:
+        row = self._conn.execute('SELECT value FROM state_meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def _write(self) -> sqlite3.Connection:
+        """Connection inside the write transaction, which is started on first use."""
+        if not self._conn.in_transaction:
+            self._conn.execute('BEGIN IMMEDIATE')
+        return self._conn
+
+    def _lookup(self, columns: str, keys: List[str]) -> Dict[str, Tuple[Any, ...]]:
+        """Rows of ``state_sources`` for the given keys, in batches."""
+        rows: Dict[str, Tuple[Any, ...]] = {}
+        for start in range(0, len(keys), _LOOKUP_BATCH):
+            batch = keys[start:start + _LOOKUP_BATCH]
+            query = (f'SELECT key, {columns} FROM state_sources '
+                     f'WHERE key IN ({",".join("?" * len(batch))})')
+            for row in self._conn.execute(query, batch):
+                rows[row[0]] = row[1:]
+        return rows
+
+    def save(self) -> None:
+        """Commit the merged sources and write the summary and themes."""
+        conn = self._write()
+        meta = {
+            'version': STATE_VERSION,
+            'updated': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'collections': self.collections,
+            'summary': self.summary,
+            'theme_terms': self.theme_state['terms'] if self.theme_state else None,
+        }
+        conn.executemany('INSERT OR REPLACE INTO state_meta (key, value) VALUES (?, ?)',
+                         [(key, json.dumps(value)) for key, value in meta.items()])
+        if self.theme_state is not None and self._themes_changed:
+            import numpy as np
+            arrays = {k: v for k, v in self.theme_state.items() if k != 'terms'}
+            _atomic_write(self.path / 'themes.npz', lambda f: np.savez(f, **arrays), binary=True)
+            self._themes_changed = False
+        conn.execute('COMMIT')
+
+    def close(self) -> None:
+        """Discard unsaved merges and close the database."""
+        if self._conn.in_transaction:
+            self._conn.execute('ROLLBACK')
+        self._conn.close()
+
+    def delta(self, sources: Iterable[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Select sources that are new or whose content changed.
+
+        Args:
+            sources: Sources of the incoming collection
+
+        Returns:
+            List of (source key, source) pairs needing analysis
+        """
+        incoming: Dict[str, Dict[str, Any]] = {}
+        for source in sources:
+            incoming[source_key(source)] = source
+        known = self._lookup('signature', list(incoming))
+        return [(key, source) for key, source in incoming.items()
+                if key not in known or known[key][0] != source_signature(source)]
+
+    def merge(self, delta: List[Tuple[str, Dict[str, Any]]], results: List[Dict[str, Any]],
+              collection_id: Optional[str], theme_labels: Optional[List[int]] = None) -> None:
+        """
+        Merge per-source results for the delta into the state.
+
+        Args:
+            delta: (source key, source) pairs from ``delta``
+            results: Per-source analysis results, aligned with ``delta``
+            collection_id: ID of the collection the delta came from
+            theme_labels: Optional theme index per delta source
+        """
+        conn = self._write()
+        # Read inside the write transaction, so concurrent runs that merge
+        # the same source do not both subtract its old counts
+        old_records = self._lookup('record', [key for key, _ in delta])
+        counts: Dict[Tuple[str, str], int] = {}
+        for position, ((key, source), result) in enumerate(zip(delta, results)):
+            old = old_records.get(key)
+            if old is not None:
+                old = json.loads(old[0])
+                _count(counts, 'finding', old['findings'], -1)
+                _count(counts, 'entity', old['entities'], -1)
+            record = {
+                'signature': source_signature(source),
+                'findings': list(result.get('findings', [])),
+                'entities': list(result.get('entities', [])),
+                'citation': {f: source[f] for f in CITATION_FIELDS if source.get(f) is not None},
+                'collection_id': collection_id,
+                'theme': int(theme_labels[position]) if theme_labels is not None else None,
+            }
+            metadata = source.get('metadata') or {}
+            if isinstance(metadata, dict) and metadata.get('duplicate_count'):
+                record['citation']['metadata'] = {'duplicate_count': metadata['duplicate_count']}
+            row = (record['signature'], record['theme'],
+                   json.dumps(record, separators=(',', ':')), key)
+            if old is not None:
+                # Updated in place, so sources keep their first-seen order
+                conn.execute('UPDATE state_sources SET signature = ?, theme = ?, record = ? '
+                             'WHERE key = ?', row)
+            else:
+                conn.execute('INSERT INTO state_sources (signature, theme, record, key) '
+                             'VALUES (?, ?, ?, ?)', row)
+            old_records[key] = (row[2],)
+            _count(counts, 'finding', record['findings'], 1)
+            _count(counts, 'entity', record['entities'], 1)
+
+        changes = [(kind, item, step) for (kind, item), step in counts.items() if step]
+        conn.executemany('INSERT OR IGNORE INTO state_counts (kind, item, count) VALUES (?, ?, 0)',
+                         [change[:2] for change in changes])
+        conn.executemany('UPDATE state_counts SET count = count + ? WHERE kind = ? AND item = ?',
+                         [(step, kind, item) for kind, item, step in changes])
+        conn.executemany('DELETE FROM state_counts WHERE kind = ? AND item = ? AND count <= 0',
+                         [change[:2] for change in changes])
+
+        if collection_id and collection_id not in self.collections:
+            self.collections.append(collection_id)
+
+    def _ranked(self, kind: str, limit: int = -1) -> List[Tuple[str, int]]:
+        return self._conn.execute(
+            'SELECT item, count FROM state_counts WHERE kind = ? '
+            'ORDER BY count DESC, rowid LIMIT ?', (kind, limit)).fetchall()
+
+    @property
+    def findings(self) -> Dict[str, int]:
+        """Number of sources reporting each finding."""
+        return dict(self._ranked('finding'))
+
+    @property
+    def entities(self) -> Dict[str, int]:
+        """Number of sources naming each entity."""
+        return dict(self._ranked('entity'))
+
+    def update_themes(self, delta: List[Tuple[str, Dict[str, Any]]],
+                      config: Dict[str, Any]) -> Optional[List[int]]:
+        """
+        Assign delta sources to the persisted theme centroids.
+
+        Args:
+            delta: (source key, source) pairs from ``delta``
+            config: Analysis settings passed to the theme engine
+
+        Returns:
+            Theme index per delta source, or None if themes are unavailable
+        """
+        from . import themes as themes_module
+        if themes_module.np is None or not delta:
+            return None
+        engine = themes_module.ThemeEngine(
+            n_themes=config.get('theme_count', 8),
+            n_features=config.get('theme_features', themes_module.DEFAULT_FEATURES))
+        if self.theme_state is not None:
+            engine.load_state(self.theme_state)
+        labels, _ = engine.partial_fit([source for _, source in delta])
+        if engine.centroids is None:
+            return None
+        self.theme_state = engine.state_dict()
+        self._themes_changed = True
+        return [int(label) for label in labels]
+
+    def theme_summaries(self) -> List[str]:
+        """Theme labels with member counts from the merged state."""
+        if self.theme_state is None:
+            return []
+        from . import themes as themes_module
+        engine = themes_module.ThemeEngine(n_features=self.theme_state['centroids'].shape[1])
+        engine.load_state(self.theme_state)
+        sizes = self._conn.execute(
+            'SELECT theme, COUNT(*) AS size FROM state_sources WHERE theme IS NOT NULL '
+            'GROUP BY theme ORDER BY size DESC, theme').fetchall()
+        themes = []
+        for index, size in sizes:
+            label = ', '.join(engine.top_keywords(engine.centroids[index]))
+            themes.append(f"{label} ({size} source{'s' if size != 1 else ''})")
+        return themes
+
+    def to_analysis(self, max_findings: int = 10, max_entities: int = 20) -> Dict[str, Any]:
+        """
+        Build report-ready analysis results from the merged state.
+
+        Args:
+            max_findings: Maximum number of key findings to include
+            max_entities: Maximum number of entities to include
+
+        Returns:
+            Dictionary with the keys expected by ``ReportGenerator``
+        """
+        return {
+            'summary': self.summary,
+            'key_findings': [finding for finding, _ in self._ranked('finding', max_findings)],
+            'themes': self.theme_summaries(),
+            'entities': [entity for entity, _ in self._ranked('entity', max_entities)],
+            'total_sources': len(self),
+            'collections': list(self.collections),
+        }
+
+    def citations(self) -> List[Dict[str, Any]]:
+        """Minimal source records for the report's sources section."""
+        rows = self._conn.execute('SELECT record FROM state_sources ORDER BY rowid')
+        return [json.loads(row[0])['citation'] for row in rows]
+
+
+def _count(counter: Dict[Tuple[str, str], int], kind: str, items: List[str], step: int) -> None:
+    for item in items:
+        counter[kind, item] = counter.get((kind, item), 0) + step
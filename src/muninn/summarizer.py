@@ -11,11 +11,84 @@ Phase 2 will implement integration with self-hosted/free AI models such as:
 - OpenAI API (if available)
 """
 
+import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+
+from .metrics import PipelineMetrics, stage
+
+if TYPE_CHECKING:
+    from .checkpoint import CheckpointLog
+    from .inference import ModelBackend
+
+# The cache (sqlite3), inference (asyncio, HTTP), hierarchical and themes
+# (numpy) modules are imported on first use so that importing the
+# summarizer stays cheap for runs that do not need them.
 
 logger = logging.getLogger(__name__)
 
+# Maximum characters of source content included in a per-source prompt
+MAX_PROMPT_CONTENT = 4000
+
+SOURCE_PROMPT = """You are an OSINT analyst. Analyze the following {type} source and respond
+with JSON only, using the keys "findings" (list of short key findings),
+"themes" (list of short theme labels) and "entities" (list of notable
+people, organisations, domains, IPs or other indicators).
+
+URL: {url}
+Title: {title}
+Content:
+{content}
+"""
+
+
+def build_source_prompt(source: Dict[str, Any]) -> str:
+    """
+    Build the per-source analysis prompt.
+    
+    Args:
+        source: Source dictionary from Huginn
+    
+    Returns:
+        Prompt text
+    """
+    return SOURCE_PROMPT.format(
+        type=source.get('type', 'unknown'),
+        url=source.get('url', 'N/A'),
+        title=source.get('title', 'N/A'),
+        content=(source.get('content') or '')[:MAX_PROMPT_CONTENT],
+    )
+
+
+def parse_source_response(response: str) -> Dict[str, List[str]]:
+    """
+    Parse a model response to a per-source prompt.
+    
+    Args:
+        response: Raw model output, expected to contain a JSON object
+    
+    Returns:
+        Dictionary with 'findings', 'themes' and 'entities' lists
+        (empty lists where the response could not be parsed)
+    """
+    result = {'findings': [], 'themes': [], 'entities': []}
+    start = response.find('{')
+    end = response.rfind('}')
+    if start == -1 or end < start:
+        return result
+    try:
+        parsed = json.loads(response[start:end + 1])
+    except ValueError:
+        logger.debug("Could not parse model response as JSON")
+        return result
+    if not isinstance(parsed, dict):
+        return result
+    for key in result:
+        values = parsed.get(key, [])
+        if isinstance(values, list):
+            result[key] = [str(v).strip() for v in values if str(v).strip()]
+    return result
+
 
 class IntelligenceSummarizer:
     """
@@ -25,15 +98,41 @@ class IntelligenceSummarizer:
     Phase 2: Will implement AI model integration for analysis.
     """
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 backend: Optional['ModelBackend'] = None,
+                 checkpoint: Optional['CheckpointLog'] = None):
         """
         Initialize the summarizer with configuration.
         
         Args:
             config: Configuration dictionary with AI model settings
+            backend: Optional model backend; created from ``config['model']``
+                if omitted (no backend means placeholder analysis)
+            checkpoint: Optional log recording every batch of model
+                responses (and supplying those of an interrupted run)
         """
         self.config = config or {}
         self.model_type = self.config.get('model_type', 'ollama')
+        self.model_config = dict(self.config.get('model', {}), type=self.model_type)
+        
+        performance = self.config.get('performance', {})
+        self.cache = None
+        if performance.get('enable_cache', False):
+            from .cache import AnalysisCache, DEFAULT_MAX_BYTES
+            max_bytes = int(performance.get('cache_max_mb', DEFAULT_MAX_BYTES >> 20)) << 20
+            self.cache = AnalysisCache(performance.get('cache_dir', '.cache'), max_bytes)
+        
+        self.themes: List[Dict[str, Any]] = []
+        self.checkpoint = checkpoint
+        if backend is None:
+            from .inference import create_backend
+            backend = create_backend(self.config)
+        self.backend = backend
+        self.executor = None
+        if self.backend is not None:
+            from .inference import InferenceExecutor
+            self.executor = InferenceExecutor.from_config(self.backend, self.config)
+        
         logger.info(f"Initialized summarizer with model type: {self.model_type}")
     
     def analyze_sources(self, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -47,32 +146,169 @@ class IntelligenceSummarizer:
             Dictionary containing analysis results
         """
         logger.info(f"Analyzing {len(sources)} sources")
+        return self.combine_results(self.analyze_batch(sources))
+    
+    def combine_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-source results (from ``analyze_batch``) into one analysis.
+        
+        Args:
+            results: One result dictionary per source
         
-        # Phase 1: Placeholder - returns basic structure
-        # Phase 2: Will implement AI-powered analysis
+        Returns:
+            Dictionary containing analysis results
+        """
+        # Dicts double as insertion-ordered sets for de-duplicated results
+        key_findings: Dict[str, None] = {}
+        themes: Dict[str, None] = {}
+        entities: Dict[str, None] = {}
+        for result in results:
+            key_findings.update(dict.fromkeys(result['findings']))
+            themes.update(dict.fromkeys(result['themes']))
+            entities.update(dict.fromkeys(result['entities']))
         
         analysis = {
-            'total_sources': len(sources),
-            'key_findings': [],
-            'themes': [],
+            'total_sources': len(results),
+            'key_findings': list(key_findings),
+            'themes': list(themes),
+            'entities': list(entities),
             'recommendations': [],
             'confidence_score': 0.0
         }
         
+        if self.cache is not None:
+            logger.info(f"Analysis cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        
         return analysis
     
-    def generate_summary(self, analysis: Dict[str, Any]) -> str:
+    def analyze_source(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze a single source, reusing a cached result when available.
+        
+        Results are cached by a digest of the source's prompt, model name and
+        model parameters, so an unchanged source never reaches the model twice.
+        
+        Args:
+            source: Source dictionary from Huginn
+        
+        Returns:
+            Dictionary with 'findings', 'themes' and 'entities' lists
+        """
+        return self.analyze_batch([source])[0]
+    
+    def analyze_batch(self, sources: List[Dict[str, Any]],
+                      failed: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Analyze many sources, sending only cache misses to the model.
+        
+        With a model backend, misses are sent through the batched
+        ``InferenceExecutor`` (``performance.workers`` concurrent workers,
+        ``performance.batch_size`` prompts per batch). Failed prompts yield
+        an empty result and are not cached, nor are placeholder results
+        produced without a backend. With a checkpoint log, every
+        finished batch is recorded and prompts it already answered are not
+        sent again.
+        
+        Args:
+            sources: Source dictionaries from Huginn
+            failed: Optional list extended with the positions of sources
+                whose prompt failed
+        
+        Returns:
+            One result dictionary per source, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+        misses = []
+        if self.cache is not None:
+            from .cache import make_cache_key
+            from .checkpoint import prompt_digest
+        for index, source in enumerate(sources):
+            key = prompt = None
+            if self.cache is not None or self.executor is not None:
+                prompt = build_source_prompt(source)
+            if self.cache is not None:
+                # Keyed on everything the model sees, not only the content
+                key = make_cache_key(prompt_digest(prompt), self.model_config)
+                results[index] = self.cache.get(key)
+            if results[index] is None:
+                misses.append((index, key, source, prompt))
+        
+        if self.executor is not None and misses:
+            responses = self._run_prompts([prompt for _, _, _, prompt in misses])
+            fresh = [parse_source_response(r) if r is not None else None for r in responses]
+        else:
+            fresh = [self._analyze_source_uncached(source) for _, _, source, _ in misses]
+        
+        for (index, key, _, _), result in zip(misses, fresh):
+            if result is None:
+                result = {'findings': [], 'themes': [], 'entities': []}
+                if failed is not None:
+                    failed.append(index)
+            elif key is not None and self.executor is not None:
+                # Placeholder results (no backend) would outlive configuring one
+                self.cache.put(key, result)
+            results[index] = result
+        
+        return results
+    
+    def _run_prompts(self, prompts: List[str]) -> List[Optional[str]]:
+        """Send prompts to the executor, through the checkpoint log if any."""
+        if self.checkpoint is None:
+            return self.executor.run(prompts)
+        
+        from .checkpoint import prompt_digest
+        responses = [self.checkpoint.get(prompt) for prompt in prompts]
+        pending = [index for index, response in enumerate(responses) if response is None]
+        if len(pending) < len(prompts):
+            logger.info(f"{len(prompts) - len(pending)} responses restored from the checkpoint")
+        
+        def record(batch):
+            self.checkpoint.record({prompt_digest(prompts[pending[i]]): response
+                                    for i, response in batch if response is not None})
+        
+        for index, response in zip(pending, self.executor.run((prompts[i] for i in pending),
+                                                              on_batch=record)):
+            responses[index] = response
+        self.checkpoint.failures += sum(response is None for response in responses)
+        return responses
+    
+    def _analyze_source_uncached(self, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Analyze a single source without a model backend.
+        
+        Placeholder used when no backend is configured; sources are
+        otherwise analyzed through ``self.executor``.
+        """
+        return {'findings': [], 'themes': [], 'entities': []}
+    
+    def generate_summary(self, analysis: Dict[str, Any],
+                         sources: Optional[List[Dict[str, Any]]] = None) -> str:
         """
         Generate executive summary from analysis results.
         
+        With a model backend and the analyzed sources, the summary is built
+        by hierarchical map-reduce summarization, so collections of any size
+        fit the model context window.
+        
         Args:
             analysis: Analysis results dictionary
+            sources: Optional sources the analysis was computed from
         
         Returns:
             Human-readable summary text
         """
         logger.info("Generating executive summary")
         
+        if self.executor is not None and sources:
+            from .hierarchical import HierarchicalSummarizer, source_text
+            hierarchical = HierarchicalSummarizer(
+                self.executor, self.model_config,
+                fan_in=self.config.get('analysis', {}).get('summary_fan_in', 8))
+            summary = hierarchical.summarize(source_text(source) for source in sources)
+            if summary:
+                return summary
+            logger.warning("Hierarchical summarization produced no output, using placeholder")
+        
         # Phase 1: Placeholder
         summary = """
 This is a placeholder summary. In Phase 2, this will contain:
@@ -90,6 +326,31 @@ The summarizer will use self-hosted AI models to ensure:
         
         return summary.strip()
     
+    def update_summary(self, previous: str, sources: List[Dict[str, Any]]) -> str:
+        """
+        Fold newly analyzed sources into an existing executive summary.
+        
+        Only the new sources are summarized; the result is then merged with
+        the previous summary in a single reduce step.
+        
+        Args:
+            previous: Summary of everything analyzed before
+            sources: New or changed sources
+        
+        Returns:
+            Updated summary text
+        """
+        if self.executor is None:
+            return previous or self.generate_summary({})
+        if not sources:
+            return previous
+        delta_summary = self.generate_summary({}, sources)
+        if not previous:
+            return delta_summary
+        from .hierarchical import HierarchicalSummarizer
+        hierarchical = HierarchicalSummarizer(self.executor, self.model_config)
+        return hierarchical.merge([previous, delta_summary]) or delta_summary
+    
     def extract_key_findings(self, sources: List[Dict[str, Any]], max_findings: int = 10) -> List[str]:
         """
         Extract most important findings from sources.
@@ -115,6 +376,10 @@ The summarizer will use self-hosted AI models to ensure:
         """
         Identify major themes across sources.
         
+        Uses the vectorized TF-IDF/k-means ``ThemeEngine``; the model backend
+        (if any) is only asked to name the resulting clusters when
+        ``analysis.llm_theme_names`` is enabled.
+        
         Args:
             sources: List of source dictionaries
         
@@ -123,10 +388,93 @@ The summarizer will use self-hosted AI models to ensure:
         """
         logger.info("Identifying themes")
         
-        # Phase 1: Placeholder
-        themes = ["Theme identification pending Phase 2 implementation"]
+        analysis_config = self.config.get('analysis', {})
+        if not analysis_config.get('theme_identification', True) or not sources:
+            return []
+        from . import themes as themes_module
+        if themes_module.np is None:
+            logger.warning("numpy not installed, theme identification disabled")
+            return ["Theme identification requires numpy (pip install muninn[full])"]
+        
+        executor = self.executor if analysis_config.get('llm_theme_names', False) else None
+        self.themes = themes_module.identify_themes(sources, analysis_config, executor)
+        return [f"{theme.get('name', theme['label'])} "
+                f"({theme['size']} source{'s' if theme['size'] != 1 else ''})"
+                for theme in self.themes]
+    
+    def analyze_sentiment(self, sources: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Score the sentiment of sources.
+        
+        Uses the vectorized lexicon ``SentimentScorer``; the model backend
+        (if any) is only asked about sources the lexicon finds ambiguous,
+        when ``analysis.llm_sentiment`` is enabled. Theme aggregates use
+        the clusters of the last ``identify_themes`` call.
+        
+        Args:
+            sources: List of source dictionaries
+        
+        Returns:
+            Sentiment aggregates, or None if disabled or numpy is missing
+        """
+        analysis_config = self.config.get('analysis', {})
+        if not analysis_config.get('sentiment_analysis', True) or not sources:
+            return None
+        from . import sentiment as sentiment_module
+        if sentiment_module.np is None:
+            logger.warning("numpy not installed, sentiment analysis disabled")
+            return None
+        
+        logger.info(f"Scoring sentiment of {len(sources)} sources")
+        executor = self.executor if analysis_config.get('llm_sentiment', False) else None
+        settings = dict(analysis_config,
+                        sentiment_workers=self.config.get('performance', {}).get('sentiment_workers'))
+        return sentiment_module.analyze_sentiment(sources, settings, self.themes, executor)
+    
+    def related_sources(self, sources: List[Dict[str, Any]],
+                        collection_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find the sources most similar to the top sources of a collection.
+        
+        Sources are embedded (by the backend's ``embedding_model``, else a
+        hashing vectorizer) into the persistent index in
+        ``performance.embedding_dir``, so similar sources are found across
+        every collection indexed so far.
+        
+        Args:
+            sources: List of source dictionaries (highest priority first)
+            collection_id: Collection the sources belong to
+        
+        Returns:
+            Similar sources per top source, or None if disabled, numpy is
+            missing or the embedding backend fails
+        """
+        analysis_config = self.config.get('analysis', {})
+        if not analysis_config.get('related_sources', False) or not sources:
+            return None
+        from . import embeddings as embeddings_module
+        if embeddings_module.np is None:
+            logger.warning("numpy not installed, related sources disabled")
+            return None
         
-        return themes
+        from .inference import InferenceError
+        performance = self.config.get('performance', {})
+        embedder = embeddings_module.create_embedder(self.config, self.backend)
+        index = embeddings_module.EmbeddingIndex(
+            performance.get('embedding_dir', embeddings_module.DEFAULT_INDEX_DIR),
+            nlist=performance.get('ivf_lists', embeddings_module.DEFAULT_LISTS),
+            nprobe=performance.get('ivf_probes', embeddings_module.DEFAULT_PROBES))
+        logger.info(f"Finding sources related to {len(sources)} sources ({embedder.name})")
+        try:
+            return embeddings_module.related_sources(
+                index, embedder, collection_id or 'unknown', sources,
+                analysis_config.get('related_per_source', 3),
+                analysis_config.get('related_sources_shown', 5))
+        except (InferenceError, ValueError) as e:
+            logger.warning(f"Related sources unavailable: {e}")
+            return None
+        finally:
+            index.close()
     
     def generate_recommendations(self, analysis: Dict[str, Any]) -> List[str]:
         """
@@ -150,24 +498,95 @@ The summarizer will use self-hosted AI models to ensure:
         return recommendations
 
 
-def summarize_findings(sources: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def summarize_sources(summarizer: IntelligenceSummarizer, sources: List[Dict[str, Any]],
+                      metrics: Optional[PipelineMetrics] = None,
+                      analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
-    Convenience function to summarize findings from sources.
+    Run the model-bound summarization stages (per-source analysis, summary).
     
     Args:
+        summarizer: Summarizer to run
         sources: List of source dictionaries from Huginn
-        config: Optional configuration dictionary
+        metrics: Optional collector timing each stage
+        analysis: Per-source analysis already computed (e.g. while the
+            sources were streamed); computed here if omitted
     
     Returns:
-        Dictionary containing summary and analysis results
+        Dictionary with 'analysis', 'summary', 'key_findings' and 'recommendations'
     """
-    summarizer = IntelligenceSummarizer(config)
-    analysis = summarizer.analyze_sources(sources)
-    
+    if analysis is None:
+        with stage(metrics, 'analyze'):
+            analysis = summarizer.analyze_sources(sources)
+    with stage(metrics, 'summarize'):
+        summary = summarizer.generate_summary(analysis, sources)
+        key_findings = summarizer.extract_key_findings(sources)
     return {
         'analysis': analysis,
-        'summary': summarizer.generate_summary(analysis),
-        'key_findings': summarizer.extract_key_findings(sources),
-        'themes': summarizer.identify_themes(sources),
+        'summary': summary,
+        'key_findings': key_findings,
         'recommendations': summarizer.generate_recommendations(analysis)
     }
+
+
+def aggregate_sources(summarizer: IntelligenceSummarizer, sources: List[Dict[str, Any]],
+                      metrics: Optional[PipelineMetrics] = None,
+                      collection_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the CPU-bound aggregation stages (themes, sentiment, related sources).
+    
+    These only call the model for opt-in extras (``llm_theme_names``,
+    ``llm_sentiment``), so they can run alongside ``summarize_sources``.
+    
+    Args:
+        summarizer: Summarizer to run
+        sources: List of source dictionaries from Huginn
+        metrics: Optional collector timing each stage
+        collection_id: Optional collection ID recorded in the embedding index
+    
+    Returns:
+        Dictionary with 'themes', 'theme_clusters' and, when enabled,
+        'sentiment' and 'related_sources'
+    """
+    with stage(metrics, 'themes'):
+        themes = summarizer.identify_themes(sources)
+    with stage(metrics, 'sentiment'):
+        sentiment = summarizer.analyze_sentiment(sources)
+    with stage(metrics, 'related'):
+        related = summarizer.related_sources(sources, collection_id)
+    
+    results = {
+        'themes': themes,
+        # Theme membership (positions in ``sources``) for trend analysis
+        'theme_clusters': [{'name': theme.get('name', theme['label']), 'sources': theme['sources']}
+                           for theme in summarizer.themes],
+    }
+    if sentiment is not None:
+        results['sentiment'] = sentiment
+    if related is not None:
+        results['related_sources'] = related
+    return results
+
+
+def summarize_findings(sources: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None,
+                       metrics: Optional[PipelineMetrics] = None,
+                       collection_id: Optional[str] = None,
+                       checkpoint: Optional['CheckpointLog'] = None) -> Dict[str, Any]:
+    """
+    Convenience function to summarize findings from sources.
+    
+    Args:
+        sources: List of source dictionaries from Huginn
+        config: Optional configuration dictionary
+        metrics: Optional collector timing each summarization stage
+        collection_id: Optional collection ID recorded in the embedding index
+        checkpoint: Optional checkpoint log of per-source model responses
+    
+    Returns:
+        Dictionary containing summary and analysis results
+    """
+    summarizer = IntelligenceSummarizer(config, checkpoint=checkpoint)
+    results = summarize_sources(summarizer, sources, metrics)
+    results.update(aggregate_sources(summarizer, sources, metrics, collection_id))
+    if metrics is not None and summarizer.executor is not None:
+        metrics.add_inference(summarizer.executor.stats)
+    return results
@@ -0,0 +1,232 @@
+"""
+Synthetic Huginn collection generator.
+
+Produces collections matching the ``EXAMPLE_HUGINN_DATA`` schema for tests
+and benchmarks, from a thousand up to tens of millions of sources. Sources
+are generated and written one at a time, so memory stays flat regardless
+of the collection size.
+
+Text is drawn from an OSINT-flavoured vocabulary with indicators (CVE IDs,
+IP addresses, domains, threat actors) mixed in; content lengths follow a
+log-normal distribution per source type (long web articles, short social
+posts). A configurable share of sources repeats an earlier one, either
+exactly or as a near-duplicate (tracking parameters, small edits), to
+exercise deduplication. Output is deterministic for a given seed.
+
+Usage:
+    python -m muninn.synthetic --sources 1000000 --output data/input/synthetic.jsonl
+"""
+
+import argparse
+import json
+import math
+import random
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from .data_loader import JSONL_SUFFIXES
+
+WORDS = (
+    'threat actor campaign malware ransomware phishing credential leak breach exploit '
+    'vulnerability patch advisory botnet infrastructure command control server domain '
+    'payload loader backdoor persistence lateral movement exfiltration encryption '
+    'extortion victim sector government energy healthcare finance telecom supply chain '
+    'attack intrusion indicator compromise report analysis researchers observed '
+    'targeting operators affiliate forum marketplace dump access broker wallet '
+    'cryptocurrency scam disinformation network accounts coordinated inauthentic '
+    'behavior election influence operation hacktivist defacement denial service '
+    'outage incident response mitigation detection signature sample hash variant '
+    'the a of in to and on with for from by was were has have been new recent '
+    'according said reported multiple several organizations users systems data'
+).split()
+
+ACTORS = ('LockBit', 'APT28', 'APT29', 'Lazarus', 'FIN7', 'Conti', 'BlackCat', 'Scattered Spider',
+          'Sandworm', 'Kimsuky', 'Cl0p', 'Volt Typhoon')
+
+PLATFORMS = ('twitter', 'mastodon', 'telegram', 'reddit', 'bluesky')
+
+SITES = ('example.com', 'securitynews.example', 'threatpost.example', 'osint.example',
+         'cyberwire.example', 'blog.example.org')
+
+TRACKING_SUFFIXES = ('?utm_source=feed', '?utm_medium=social&utm_campaign=osint', '?ref=rss')
+
+# Log-normal (mu, sigma) of content length in words per source type
+CONTENT_WORDS = {'web': (5.5, 0.6), 'social': (3.2, 0.5)}
+
+# Share of social sources
+SOCIAL_SHARE = 0.6
+
+# Recent sources kept as duplicate candidates
+DUPLICATE_POOL = 1024
+
+
+class SyntheticCollection:
+    """
+    Deterministic generator of synthetic Huginn sources.
+    """
+
+    def __init__(self, sources: int, duplicate_rate: float = 0.1,
+                 near_duplicate_share: float = 0.5, seed: int = 0,
+                 start: Optional[datetime] = None, span_hours: float = 24.0):
+        """
+        Initialize the generator.
+
+        Args:
+            sources: Number of sources to generate
+            duplicate_rate: Share of sources that repeat an earlier source
+            near_duplicate_share: Share of duplicates that are altered copies
+            seed: Random seed
+            start: Timestamp of the earliest source (default: 2025-10-31T00:00:00Z)
+            span_hours: Time span covered by the source timestamps
+        """
+        self.count = sources
+        self.duplicate_rate = duplicate_rate
+        self.near_duplicate_share = near_duplicate_share
+        self.seed = seed
+        self.start = start or datetime(2025, 10, 31, tzinfo=timezone.utc)
+        self.span_seconds = span_hours * 3600
+        self.collection_id = f"synthetic_{seed}_{sources}"
+
+    def header(self) -> Dict[str, Any]:
+        """Collection fields other than ``sources``."""
+        end = self.start + timedelta(seconds=self.span_seconds)
+        return {
+            'collection_date': end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'collection_id': self.collection_id,
+            'metadata': {
+                'total_sources': self.count,
+                'collection_duration_seconds': int(self.span_seconds),
+                'status': 'complete',
+                'synthetic': True,
+            },
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        rng = random.Random(self.seed)
+        recent: deque = deque(maxlen=DUPLICATE_POOL)
+        for index in range(self.count):
+            if recent and rng.random() < self.duplicate_rate:
+                source = dict(rng.choice(recent))
+                if rng.random() < self.near_duplicate_share:
+                    source = self._near_duplicate(rng, source)
+            else:
+                source = self._source(rng, index)
+                recent.append(source)
+            yield source
+
+    def _text(self, rng: random.Random, words: int) -> str:
+        tokens = []
+        for _ in range(words):
+            roll = rng.random()
+            if roll < 0.01:
+                tokens.append(f"CVE-{rng.randint(2019, 2025)}-{rng.randint(1000, 49999)}")
+            elif roll < 0.02:
+                tokens.append('.'.join(str(rng.randint(1, 254)) for _ in range(4)))
+            elif roll < 0.03:
+                tokens.append(rng.choice(ACTORS))
+            elif roll < 0.035:
+                tokens.append(f"{rng.choice(WORDS)}-{rng.randint(1, 999)}.example")
+            else:
+                tokens.append(rng.choice(WORDS))
+        return ' '.join(tokens)
+
+    def _source(self, rng: random.Random, index: int) -> Dict[str, Any]:
+        source_type = 'social' if rng.random() < SOCIAL_SHARE else 'web'
+        mu, sigma = CONTENT_WORDS[source_type]
+        words = max(3, int(math.exp(rng.gauss(mu, sigma))))
+        timestamp = self.start + timedelta(seconds=rng.uniform(0, self.span_seconds))
+        metadata: Dict[str, Any] = {'relevance_score': round(rng.betavariate(2, 2), 3)}
+
+        if source_type == 'social':
+            platform = rng.choice(PLATFORMS)
+            author = f"@user{rng.randint(1, 5000)}"
+            source = {
+                'type': 'social',
+                'platform': platform,
+                'url': f"https://{platform}.example/{author[1:]}/status/{index}",
+            }
+            metadata['author'] = author
+            # Same counters as the Huginn sample (see priority.ENGAGEMENT_WEIGHTS)
+            metadata['engagement'] = {'likes': rng.randint(0, 5000),
+                                      'retweets': rng.randint(0, 1000),
+                                      'replies': rng.randint(0, 500)}
+        else:
+            site = rng.choice(SITES)
+            source = {
+                'type': 'web',
+                'url': f"https://{site}/articles/{index}",
+                'title': self._text(rng, rng.randint(5, 12)).capitalize(),
+            }
+            metadata['author'] = f"Author {rng.randint(1, 500)}"
+            metadata['tags'] = rng.sample(('osint', 'intelligence', 'malware', 'ransomware',
+                                           'phishing', 'vulnerability', 'apt'), 2)
+
+        source['content'] = self._text(rng, words)
+        source['timestamp'] = timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')
+        source['metadata'] = metadata
+        return source
+
+    def _near_duplicate(self, rng: random.Random, source: Dict[str, Any]) -> Dict[str, Any]:
+        """Alter a copy the way reposts and syndicated articles differ."""
+        if rng.random() < 0.5:
+            source['url'] = source['url'] + rng.choice(TRACKING_SUFFIXES)
+        else:
+            words = source['content'].split()
+            position = rng.randrange(len(words))
+            words[position] = rng.choice(WORDS)
+            source['content'] = ' '.join(words)
+            source['url'] = source['url'] + f"-{rng.randint(1, 99)}"
+        return source
+
+
+def write_collection(path: str, sources: int, duplicate_rate: float = 0.1,
+                     seed: int = 0, **options) -> SyntheticCollection:
+    """
+    Write a synthetic collection as JSON, or as JSON Lines for ``.jsonl`` paths.
+
+    Args:
+        path: Output file
+        sources: Number of sources
+        duplicate_rate: Share of duplicated sources
+        seed: Random seed
+        **options: Further ``SyntheticCollection`` options
+
+    Returns:
+        The generator used, for its header and settings
+    """
+    collection = SyntheticCollection(sources, duplicate_rate, seed=seed, **options)
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        if output.suffix.lower() in JSONL_SUFFIXES:
+            for source in collection:
+                f.write(json.dumps(source))
+                f.write('\n')
+        else:
+            header = json.dumps(collection.header())
+            f.write(header[:-1] + ', "sources": [')
+            for index, source in enumerate(collection):
+                f.write(',\n' if index else '\n')
+                f.write(json.dumps(source))
+            f.write('\n]}\n')
+    return collection
+
+
+def main():
+    """
+    Command-line interface for generating synthetic collections.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic Huginn collection")
+    parser.add_argument('-n', '--sources', type=int, default=1000, help='Number of sources')
+    parser.add_argument('-o', '--output', required=True, help='Output file (.json or .jsonl)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.1,
+                        help='Share of sources repeating an earlier one (default: 0.1)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+    write_collection(args.output, args.sources, args.duplicate_rate, args.seed)
+
+
+if __name__ == "__main__":
+    main()
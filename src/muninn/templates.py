@@ -0,0 +1,230 @@
+"""
+Report templates for the Muninn report generator.
+
+A template is Markdown made of blocks separated by blank lines. A block is
+either a section placeholder on its own, such as ``{{ key_findings }}``, or
+literal text that may reference variables inline, such as
+``Collection {{ collection_id }}``. Rendered blocks are joined with a blank
+line; a section disabled by its ``report.include_*`` flag is dropped along
+with its separator.
+
+Templates are parsed once into a ``CompiledTemplate`` and cached: built-in
+templates by name, template files by path and modification time. Custom
+templates are loaded by setting ``report.template`` to a file path or by
+calling ``register_template``.
+"""
+
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Sections a template can place, rendered by ReportGenerator
+SECTIONS = (
+    'header',
+    'executive_summary',
+    'key_findings',
+    'detailed_analysis',
+    'trends',
+    'sentiment',
+    'entities',
+    'sources',
+    'recommendations',
+    'metrics',
+    'footer',
+)
+
+# Values available for inline substitution in literal blocks
+VARIABLES = ('collection_id', 'generated', 'status', 'source_count', 'template')
+
+# Sections that can be switched off with a report.include_* flag
+SECTION_FLAGS = {
+    'executive_summary': 'include_executive_summary',
+    'key_findings': 'include_key_findings',
+    'detailed_analysis': 'include_detailed_analysis',
+    'entities': 'include_detailed_analysis',
+    'sources': 'include_sources',
+    'recommendations': 'include_recommendations',
+    'trends': 'include_trends',
+    'sentiment': 'include_sentiment',
+    'metrics': 'include_metrics',
+}
+
+# Sections that are off unless their flag is set
+OPT_IN_SECTIONS = ('trends', 'sentiment', 'metrics')
+
+BUILTIN_TEMPLATES = {
+    'default': """{{ header }}
+
+{{ executive_summary }}
+
+{{ key_findings }}
+
+{{ detailed_analysis }}
+
+{{ trends }}
+
+{{ sentiment }}
+
+{{ sources }}
+
+{{ recommendations }}
+
+{{ metrics }}
+
+{{ footer }}""",
+    'detailed': """{{ header }}
+
+{{ executive_summary }}
+
+{{ key_findings }}
+
+{{ detailed_analysis }}
+
+{{ trends }}
+
+{{ sentiment }}
+
+{{ entities }}
+
+{{ sources }}
+
+{{ recommendations }}
+
+{{ metrics }}
+
+{{ footer }}""",
+    'executive': """{{ header }}
+
+{{ executive_summary }}
+
+{{ key_findings }}
+
+*Based on {{ source_count }} OSINT sources collected by Huginn.*
+
+{{ recommendations }}
+
+{{ metrics }}
+
+{{ footer }}""",
+}
+
+_PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+_BLOCK_SEPARATOR = re.compile(r'\n[ \t]*\n')
+
+
+class TemplateError(ValueError):
+    """Raised for invalid or missing report templates."""
+
+
+class Block(NamedTuple):
+    """
+    One compiled template block.
+
+    ``section`` is set for section placeholders; otherwise ``parts`` holds
+    alternating literal text and variable names (even and odd indexes).
+    """
+    section: Optional[str]
+    parts: Tuple[str, ...]
+
+
+class CompiledTemplate(NamedTuple):
+    """A parsed template ready for rendering."""
+    name: str
+    blocks: Tuple[Block, ...]
+
+    @property
+    def sections(self) -> List[str]:
+        """Section names used by the template, in order."""
+        return [block.section for block in self.blocks if block.section]
+
+
+def compile_template(text: str, name: str = '<string>') -> CompiledTemplate:
+    """
+    Parse template text into blocks.
+
+    Args:
+        text: Template source
+        name: Name used in error messages and the ``template`` variable
+
+    Returns:
+        Compiled template
+
+    Raises:
+        TemplateError: For unknown section or variable names
+    """
+    blocks = []
+    for raw in _BLOCK_SEPARATOR.split(text.strip('\n')):
+        if not raw.strip():
+            continue
+        whole = _PLACEHOLDER.fullmatch(raw.strip())
+        if whole and whole.group(1) in SECTIONS:
+            blocks.append(Block(whole.group(1), ()))
+            continue
+        parts = _PLACEHOLDER.split(raw)
+        for variable in parts[1::2]:
+            if variable in SECTIONS:
+                raise TemplateError(f"Section '{variable}' must be on its own block in template {name}")
+            if variable not in VARIABLES:
+                raise TemplateError(f"Unknown placeholder '{variable}' in template {name}")
+        blocks.append(Block(None, tuple(parts)))
+    return CompiledTemplate(name, tuple(blocks))
+
+
+_cache: Dict[Union[str, Tuple[str, int]], CompiledTemplate] = {}
+_cache_lock = threading.Lock()
+
+
+def register_template(name: str, text: str) -> None:
+    """
+    Register a custom template under a name usable as ``report.template``.
+
+    Args:
+        name: Template name
+        text: Template source
+    """
+    compiled = compile_template(text, name)
+    with _cache_lock:
+        _cache[name] = compiled
+
+
+def get_template(template: str) -> CompiledTemplate:
+    """
+    Return the compiled form of a template, compiling it on first use.
+
+    Args:
+        template: Built-in or registered template name, or a template file path
+
+    Returns:
+        Compiled template
+
+    Raises:
+        TemplateError: If the template does not exist or fails to compile
+    """
+    with _cache_lock:
+        compiled = _cache.get(template)
+    if compiled is not None:
+        return compiled
+
+    if template in BUILTIN_TEMPLATES:
+        compiled = compile_template(BUILTIN_TEMPLATES[template], template)
+        key: Union[str, Tuple[str, int]] = template
+    else:
+        path = Path(template)
+        if not path.is_file():
+            raise TemplateError(f"Unknown report template: {template}")
+        # File templates are cached per version, so edits are picked up
+        key = (str(path.resolve()), path.stat().st_mtime_ns)
+        with _cache_lock:
+            compiled = _cache.get(key)
+        if compiled is not None:
+            return compiled
+        compiled = compile_template(path.read_text(encoding='utf-8'), path.stem)
+        logger.info(f"Compiled report template {template}")
+
+    with _cache_lock:
+        _cache[key] = compiled
+    return compiled
@@ -0,0 +1,390 @@
+"""
+Fast, model-free theme identification.
+
+Themes are found with a NumPy-vectorized pipeline instead of LLM calls:
+
+1. ``content`` and ``metadata.tags`` are tokenized and hashed into a fixed
+   number of feature buckets (the hashing trick, so no vocabulary pass is
+   needed and results are stable across runs).
+2. The hashed counts form a sparse CSR matrix that is weighted with
+   sublinear TF-IDF and L2-normalized.
+3. Mini-batch spherical k-means clusters the rows; centroids are dense but
+   documents stay sparse, so each batch costs ``O(nnz * k)``.
+4. Each cluster is labelled with its highest-weighted terms.
+
+NumPy is an optional dependency (``pip install muninn[full]``); an LLM backend
+may optionally be used to turn the keyword labels into short theme names.
+"""
+
+import logging
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEATURES = 1 << 16
+
+# Tags are more reliable topic signals than free text
+TAG_WEIGHT = 3
+
+_TOKEN_RE = re.compile(r'[a-z][a-z0-9_\-]{2,}')
+
+STOPWORDS = frozenset("""
+about above after again against all also and any are because been before being
+below between both but can could did does doing down during each few for from
+further had has have having her here hers herself him himself his how http https
+into its itself just more most not now off once only other our ours out over own
+same she should some such than that the their theirs them then there these they
+this those through too under until very was were what when where which while who
+whom why will with would www you your yours com
+""".split())
+
+THEME_NAME_PROMPT = """Give a short (2-5 word) name for an OSINT intelligence theme
+described by these keywords. Respond with the name only.
+
+Keywords: {keywords}
+"""
+
+
+def require_numpy() -> None:
+    """Raise an informative ImportError if NumPy is not installed."""
+    if np is None:
+        raise ImportError("Theme identification requires numpy (pip install muninn[full])")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def feature_index(token: str, n_features: int) -> int:
+    """Stable hashed feature index of a token."""
+    return zlib.crc32(token.encode('utf-8')) % n_features
+
+
+class ThemeEngine:
+    """
+    Hashed TF-IDF + mini-batch k-means theme clustering.
+
+    After ``fit``, ``labels`` holds the cluster of every source and
+    ``centroids`` the L2-normalized cluster centres.
+    """
+
+    def __init__(self, n_themes: int = 8, n_features: int = DEFAULT_FEATURES,
+                 batch_size: int = 1024, n_iter: int = 50, top_terms: int = 3,
+                 min_similarity: float = 0.0, seed: int = 0):
+        """
+        Initialize the engine.
+
+        Args:
+            n_themes: Number of clusters
+            n_features: Number of hashed feature buckets
+            batch_size: Documents per mini-batch
+            n_iter: Number of mini-batch updates
+            top_terms: Keywords used in each theme label
+            min_similarity: Minimum cosine similarity for a source to count
+                towards its theme
+            seed: Random seed for initialization and batch sampling
+        """
+        require_numpy()
+        self.n_themes = n_themes
+        self.n_features = n_features
+        self.batch_size = batch_size
+        self.n_iter = n_iter
+        self.top_terms = top_terms
+        self.min_similarity = min_similarity
+        self.seed = seed
+        self.centroids = None
+        self.counts = None
+        self.labels = None
+        self.similarity = None
+        # Document frequencies accumulated over everything vectorized so far
+        self.df = None
+        self.n_docs = 0
+        self._terms: Dict[int, str] = {}
+
+    # -- Vectorization ----------------------------------------------------
+
+    def _tokens(self, source: Dict[str, Any]) -> List[str]:
+        tokens = tokenize(source.get('content') or '')
+        title = source.get('title')
+        if title:
+            tokens.extend(tokenize(title))
+        metadata = source.get('metadata') or {}
+        tags = metadata.get('tags') if isinstance(metadata, dict) else None
+        for tag in tags or ():
+            tag = str(tag).lower().strip()
+            if tag:
+                tokens.extend([tag] * TAG_WEIGHT)
+        return tokens
+
+    def vectorize(self, sources: Iterable[Dict[str, Any]]) -> Tuple[Any, Any, Any, int]:
+        """
+        Build the L2-normalized hashed TF-IDF matrix in CSR form.
+
+        Document frequencies accumulate in ``self.df`` across calls, so
+        later batches are weighted with IDF over every source seen so far.
+
+        Args:
+            sources: Source dictionaries
+
+        Returns:
+            Tuple of (indptr, indices, data, n_rows)
+        """
+        n_features = self.n_features
+        vocab: Dict[str, int] = {}
+        lengths: List[int] = []
+        ids: List[int] = []
+        for source in sources:
+            tokens = self._tokens(source)
+            new = set(tokens).difference(vocab)
+            for token in new:
+                vocab[token] = len(vocab)
+            ids.extend(map(vocab.__getitem__, tokens))
+            lengths.append(len(tokens))
+        n_rows = len(lengths)
+
+        terms = list(vocab)
+        buckets = np.fromiter((feature_index(t, n_features) for t in terms),
+                              dtype=np.int64, count=len(terms))
+        ids_arr = np.asarray(ids, dtype=np.int64)
+        cols = buckets[ids_arr]
+
+        # Remember the most frequent term of every bucket for theme labels
+        token_counts = np.bincount(ids_arr, minlength=len(terms))
+        for token_id in np.argsort(token_counts, kind='stable'):
+            self._terms[int(buckets[token_id])] = terms[token_id]
+
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+        keys = rows * n_features + np.asarray(cols, dtype=np.int64)
+        keys, counts = np.unique(keys, return_counts=True)
+        row_idx = keys // n_features
+        indices = (keys % n_features).astype(np.int32)
+
+        if self.df is None:
+            self.df = np.zeros(n_features, dtype=np.int64)
+        self.df += np.bincount(indices, minlength=n_features)
+        self.n_docs += n_rows
+        idf = np.log((1.0 + self.n_docs) / (1.0 + self.df)) + 1.0
+        data = ((1.0 + np.log(counts)) * idf[indices]).astype(np.float32)
+
+        norms = np.sqrt(np.bincount(row_idx, weights=data.astype(np.float64) ** 2, minlength=n_rows))
+        norms[norms == 0] = 1.0
+        data /= norms[row_idx].astype(np.float32)
+
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_idx, minlength=n_rows), out=indptr[1:])
+        return indptr, indices, data, n_rows
+
+    # -- Clustering -------------------------------------------------------
+
+    @staticmethod
+    def _rows(indptr, indices, data, rows):
+        """Gather a subset of CSR rows as flat (row_id, col, value) arrays."""
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        total = int(lengths.sum())
+        row_ids = np.repeat(np.arange(len(rows)), lengths)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + offsets
+        return row_ids, indices[positions], data[positions]
+
+    def _similarities(self, row_ids, cols, vals, n_rows):
+        """Cosine similarity of sparse rows to every centroid, shape (n_rows, k)."""
+        k = self.centroids.shape[0]
+        sims = np.zeros((n_rows, k), dtype=np.float32)
+        contrib = self.centroids[:, cols] * vals  # (k, nnz)
+        for j in range(k):
+            sims[:, j] = np.bincount(row_ids, weights=contrib[j], minlength=n_rows)
+        return sims
+
+    def _normalize_centroids(self) -> None:
+        norms = np.linalg.norm(self.centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.centroids /= norms
+
+    def fit(self, sources: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Cluster sources into themes.
+
+        Args:
+            sources: Source dictionaries (or dict-like rows)
+
+        Returns:
+            Themes sorted by size, each a dict with 'label', 'terms',
+            'size' and 'sources' (indices of member sources)
+        """
+        self._terms = {}
+        self.df = None
+        self.n_docs = 0
+        indptr, indices, data, n_rows = self.vectorize(sources)
+        if n_rows == 0 or len(data) == 0:
+            return []
+
+        rng = np.random.default_rng(self.seed)
+        k = min(self.n_themes, n_rows)
+        non_empty = np.flatnonzero(np.diff(indptr) > 0)
+        k = min(k, len(non_empty))
+        seeds = rng.choice(non_empty, size=k, replace=False)
+        self.centroids = np.zeros((k, self.n_features), dtype=np.float32)
+        row_ids, cols, vals = self._rows(indptr, indices, data, seeds)
+        np.add.at(self.centroids, (row_ids, cols), vals)
+
+        self.counts = np.zeros(k, dtype=np.float64)
+        batch_size = min(self.batch_size, n_rows)
+        for _ in range(self.n_iter):
+            batch = rng.integers(0, n_rows, size=batch_size)
+            row_ids, cols, vals = self._rows(indptr, indices, data, batch)
+            assign = self._similarities(row_ids, cols, vals, batch_size).argmax(axis=1)
+            self._update(assign, row_ids, cols, vals)
+
+        self.labels, self.similarity = self._assign(indptr, indices, data, n_rows)
+        return self._themes()
+
+    def partial_fit(self, sources: Sequence[Dict[str, Any]]) -> Tuple[Any, Any]:
+        """
+        Assign new sources to the existing themes and update the centroids.
+
+        Falls back to ``fit`` when no centroids exist yet.
+
+        Args:
+            sources: New source dictionaries
+
+        Returns:
+            Tuple of (theme index per source, cosine similarity per source)
+        """
+        if self.centroids is None:
+            self.fit(sources)
+            return self.labels, self.similarity
+
+        indptr, indices, data, n_rows = self.vectorize(sources)
+        labels, similarity = self._assign(indptr, indices, data, n_rows)
+        if n_rows:
+            row_ids, cols, vals = self._rows(indptr, indices, data, np.arange(n_rows))
+            self._update(labels, row_ids, cols, vals)
+        self.labels, self.similarity = labels, similarity
+        return labels, similarity
+
+    def _update(self, assign, row_ids, cols, vals) -> None:
+        """Mini-batch centroid update for rows assigned to clusters."""
+        k = self.centroids.shape[0]
+        sums = np.zeros_like(self.centroids)
+        np.add.at(sums, (assign[row_ids], cols), vals)
+        batch_counts = np.bincount(assign, minlength=k).astype(np.float64)
+        self.counts += batch_counts
+        updated = batch_counts > 0
+        # Per-centre learning rate 1/count (Sculley, 2010), applied per batch
+        eta = (batch_counts[updated] / self.counts[updated]).astype(np.float32)[:, None]
+        means = sums[updated] / batch_counts[updated].astype(np.float32)[:, None]
+        self.centroids[updated] = (1 - eta) * self.centroids[updated] + eta * means
+        self._normalize_centroids()
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Arrays and term labels needed to resume clustering later."""
+        return {
+            'centroids': self.centroids,
+            'counts': self.counts,
+            'df': self.df,
+            'n_docs': self.n_docs,
+            'terms': {str(col): term for col, term in self._terms.items()},
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restore clustering state produced by ``state_dict``."""
+        self.centroids = state['centroids']
+        self.counts = state['counts']
+        self.df = state['df']
+        self.n_docs = int(state['n_docs'])
+        self._terms = {int(col): term for col, term in state['terms'].items()}
+
+    def _assign(self, indptr, indices, data, n_rows, chunk: int = 8192):
+        labels = np.empty(n_rows, dtype=np.int32)
+        best = np.empty(n_rows, dtype=np.float32)
+        for start in range(0, n_rows, chunk):
+            rows = np.arange(start, min(start + chunk, n_rows))
+            row_ids, cols, vals = self._rows(indptr, indices, data, rows)
+            sims = self._similarities(row_ids, cols, vals, len(rows))
+            labels[rows] = sims.argmax(axis=1)
+            best[rows] = sims.max(axis=1)
+        return labels, best
+
+    def _themes(self) -> List[Dict[str, Any]]:
+        themes = []
+        members = self.similarity >= self.min_similarity
+        for j in range(self.centroids.shape[0]):
+            member_idx = np.flatnonzero((self.labels == j) & members & (self.similarity > 0))
+            if len(member_idx) == 0:
+                continue
+            terms = self.top_keywords(self.centroids[j])
+            themes.append({
+                'label': ', '.join(terms),
+                'terms': terms,
+                'size': int(len(member_idx)),
+                'sources': member_idx.tolist(),
+                'centroid_index': j,
+            })
+        themes.sort(key=lambda theme: theme['size'], reverse=True)
+        return themes
+
+    def top_keywords(self, centroid) -> List[str]:
+        """Most representative terms of a centroid."""
+        keywords: List[str] = []
+        for col in np.argsort(centroid)[::-1]:
+            if centroid[col] <= 0 or len(keywords) >= self.top_terms:
+                break
+            term = self._terms.get(int(col))
+            if term and term not in keywords:
+                keywords.append(term)
+        return keywords
+
+
+def name_themes(themes: List[Dict[str, Any]], executor) -> List[Dict[str, Any]]:
+    """
+    Ask the model for a short name for each theme.
+
+    Themes keep their keyword label when the model call fails.
+
+    Args:
+        themes: Themes from ``ThemeEngine.fit``
+        executor: ``InferenceExecutor`` used for the naming prompts
+
+    Returns:
+        The same theme dicts with 'name' set
+    """
+    prompts = [THEME_NAME_PROMPT.format(keywords=', '.join(theme['terms'])) for theme in themes]
+    for theme, response in zip(themes, executor.run(prompts)):
+        name = (response or '').strip().strip('"').splitlines()
+        theme['name'] = name[0].strip() if name and name[0].strip() else theme['label']
+    return themes
+
+
+def identify_themes(sources: Sequence[Dict[str, Any]], config: Optional[Dict[str, Any]] = None,
+                    executor=None) -> List[Dict[str, Any]]:
+    """
+    Convenience function to cluster sources into labelled themes.
+
+    Args:
+        sources: Source dictionaries
+        config: Optional engine settings (``theme_count``, ``theme_features``,
+            ``theme_min_similarity``)
+        executor: Optional ``InferenceExecutor`` for LLM theme naming
+
+    Returns:
+        List of theme dictionaries
+    """
+    config = config or {}
+    engine = ThemeEngine(
+        n_themes=config.get('theme_count', 8),
+        n_features=config.get('theme_features', DEFAULT_FEATURES),
+        min_similarity=config.get('theme_min_similarity', 0.0),
+    )
+    themes = engine.fit(sources)
+    if executor is not None and themes:
+        name_themes(themes, executor)
+    return themes
@@ -0,0 +1,410 @@
+"""
+Time-bucketed trend aggregation over source timestamps.
+
+Source timestamps are parsed in bulk into a NumPy ``datetime64`` array and
+assigned to fixed-width time buckets (``analysis.trend_bucket``, e.g.
+``1h``). Source counts, summed engagement and mean relevance are then
+aggregated per bucket with ``np.bincount`` -- for the whole collection and
+for every series of a group (sources of a theme, sources mentioning an
+entity) in one flat pass, so millions of rows aggregate in well under a
+second.
+
+Spikes are buckets whose count exceeds the rolling mean of the preceding
+``analysis.trend_window`` buckets by ``analysis.spike_threshold`` standard
+deviations (with a Poisson floor on the deviation, so a jump from a flat
+baseline still registers). The results feed the report's Trends section.
+
+NumPy is an optional dependency (``pip install muninn[full]``).
+"""
+
+import logging
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKET = '1h'
+DEFAULT_WINDOW = 6
+DEFAULT_SPIKE_THRESHOLD = 3.0
+DEFAULT_MIN_COUNT = 3
+
+# Buckets are widened (by whole multiples) beyond this many
+MAX_BUCKETS = 10000
+
+# Spikes kept in the results, strongest first
+MAX_SPIKES = 20
+
+# Engagement counts summed per source
+ENGAGEMENT_FIELDS = ('likes', 'retweets', 'reposts', 'replies')
+
+_BUCKET_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+_BUCKET_RE = re.compile(r'\s*(\d+)\s*([smhdw])\s*$')
+
+# Groups of series: kind -> series name -> positions of member sources
+Groups = Dict[str, Dict[str, Sequence[int]]]
+
+
+def require_numpy() -> None:
+    """Raise an informative ImportError if NumPy is not installed."""
+    if np is None:
+        raise ImportError("Trend analysis requires numpy (pip install muninn[full])")
+
+
+def parse_bucket(spec: Any) -> int:
+    """
+    Parse a bucket width such as ``15m``, ``1h`` or ``1d``.
+
+    Args:
+        spec: Width string, or a number of seconds
+
+    Returns:
+        Bucket width in seconds
+
+    Raises:
+        ValueError: If the width cannot be parsed or is not positive
+    """
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        seconds = int(spec)
+    else:
+        match = _BUCKET_RE.match(str(spec).lower())
+        if match is None:
+            raise ValueError(f"Invalid trend bucket: {spec!r} (expected e.g. 15m, 1h, 1d)")
+        seconds = int(match.group(1)) * _BUCKET_UNITS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError(f"Trend bucket must be positive: {spec!r}")
+    return seconds
+
+
+def parse_timestamps(values: Sequence[Any]) -> 'np.ndarray':
+    """
+    Parse ISO 8601 timestamps in bulk.
+
+    The strings are viewed as a matrix of code points, so the shape of
+    every value and its UTC offset (``Z``, ``+HH:MM`` or ``-HHMM`` after
+    the seconds and optional fraction) are checked and decoded with array
+    operations. Well-formed values are converted by NumPy in one call;
+    only values of another form are parsed individually.
+
+    Args:
+        values: Timestamp strings (``None`` or invalid values become NaT)
+
+    Returns:
+        ``datetime64[s]`` array in UTC
+    """
+    require_numpy()
+    texts = [value if isinstance(value, str) else '' for value in values]
+    width = max(26, max(map(len, texts), default=0))
+    strings = np.array(texts, dtype=f'U{width}')
+    codes = strings.view(np.uint32).reshape(len(texts), width).astype(np.int64)
+    lengths = np.char.str_len(strings)
+    parsed = np.full(len(texts), np.datetime64('NaT'), dtype='datetime64[s]')
+
+    digits = (codes >= 48) & (codes <= 57)
+    date = (digits[:, [0, 1, 2, 3, 5, 6, 8, 9]].all(axis=1)
+            & (codes[:, 4] == 45) & (codes[:, 7] == 45))
+    full = (date & (lengths >= 19) & ((codes[:, 10] == 84) | (codes[:, 10] == 32))
+            & digits[:, [11, 12, 14, 15, 17, 18]].all(axis=1)
+            & (codes[:, 13] == 58) & (codes[:, 16] == 58))
+    regular = full | (date & (lengths == 10))
+    head = strings[regular].astype('U19')
+    try:
+        parsed[regular] = head.astype('datetime64[s]')
+    except ValueError:
+        # Well-formed but out of range (e.g. month 13): decide per value
+        parsed[regular] = [_parse_one(value) for value in head.tolist()]
+    for i in np.flatnonzero(~regular & (lengths > 0)).tolist():
+        parsed[i] = _parse_one(texts[i])
+
+    # Offsets follow the seconds (and optional fraction): +HH:MM, -HHMM
+    signs = (codes[:, 19:] == 43) | (codes[:, 19:] == 45)
+    has_offset = full & signs.any(axis=1)
+    rows = np.arange(len(texts))
+
+    def back(count):
+        return codes[rows, np.maximum(lengths - count, 0)]
+
+    def number(tens, ones):
+        return (back(tens) - 48) * 10 + back(ones) - 48
+
+    def tail_digits(*counts):
+        return np.all([digits[rows, np.maximum(lengths - count, 0)] for count in counts], axis=0)
+
+    colon = (lengths >= 25) & (back(3) == 58) & tail_digits(5, 4, 2, 1)
+    compact = (lengths >= 24) & tail_digits(4, 3, 2, 1)
+    sign = np.where(colon, back(6), back(5))
+    valid = has_offset & (colon | compact) & ((sign == 43) | (sign == 45))
+    hours = np.where(colon, number(5, 4), number(4, 3))
+    minutes = number(2, 1)
+    offsets = (hours * 3600 + minutes * 60) * np.where(sign == 45, -1, 1)
+    parsed[has_offset & ~valid] = np.datetime64('NaT')
+    parsed[valid] -= offsets[valid].astype('timedelta64[s]')
+    return parsed
+
+
+def _parse_one(value: str) -> 'np.datetime64':
+    try:
+        return np.datetime64(value[:19], 's')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def source_columns(sources: Sequence[Any]) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """
+    Extract the timestamp, relevance and engagement columns of sources.
+
+    A ``SourceTable`` provides timestamps and relevance scores as columns
+    directly; other sequences are read source by source.
+
+    Args:
+        sources: Source dictionaries or a ``SourceTable``
+
+    Returns:
+        Tuple of (``datetime64[s]`` timestamps, relevance scores with NaN
+        for missing values, summed engagement counts)
+    """
+    require_numpy()
+    if hasattr(sources, 'timestamps') and hasattr(sources, 'relevance_scores'):
+        epochs = np.frombuffer(sources.timestamps, dtype=np.float64)
+        timestamps = np.full(len(epochs), np.datetime64('NaT'), dtype='datetime64[s]')
+        known = ~np.isnan(epochs)
+        timestamps[known] = epochs[known].astype(np.int64).astype('datetime64[s]')
+        # The column is NaN for non-canonical forms (offsets, dates); parse those
+        unknown = np.flatnonzero(~known)
+        if len(unknown):
+            timestamps[unknown] = parse_timestamps([sources[i].get('timestamp') for i in unknown.tolist()])
+        relevance = np.frombuffer(sources.relevance_scores, dtype=np.float64).copy()
+    else:
+        timestamps = parse_timestamps([source.get('timestamp') for source in sources])
+        relevance = np.array([_relevance(source) for source in sources], dtype=np.float64)
+    engagement = np.array([_engagement(source) for source in sources], dtype=np.float64)
+    return timestamps, relevance, engagement
+
+
+def _relevance(source: Any) -> float:
+    metadata = source.get('metadata')
+    value = metadata.get('relevance_score') if isinstance(metadata, dict) else None
+    return float(value) if isinstance(value, (int, float)) else math.nan
+
+
+def _engagement(source: Any) -> float:
+    metadata = source.get('metadata')
+    engagement = metadata.get('engagement') if isinstance(metadata, dict) else None
+    if not isinstance(engagement, dict):
+        return 0.0
+    return float(sum(value for value in (engagement.get(key) for key in ENGAGEMENT_FIELDS)
+                     if isinstance(value, (int, float))))
+
+
+class TrendEngine:
+    """
+    Aggregate sources into time buckets and detect spikes.
+    """
+
+    def __init__(self, bucket: Any = DEFAULT_BUCKET, window: int = DEFAULT_WINDOW,
+                 threshold: float = DEFAULT_SPIKE_THRESHOLD, min_count: int = DEFAULT_MIN_COUNT):
+        """
+        Initialize the engine.
+
+        Args:
+            bucket: Bucket width (``15m``, ``1h``, ``1d``, ... or seconds)
+            window: Preceding buckets forming the rolling baseline
+            threshold: Standard deviations above the baseline marking a spike
+            min_count: Minimum sources in a bucket for it to be a spike
+        """
+        require_numpy()
+        self.bucket_seconds = parse_bucket(bucket)
+        self.window = max(int(window), 1)
+        self.threshold = threshold
+        self.min_count = min_count
+
+    def aggregate(self, timestamps: 'np.ndarray', relevance: Optional['np.ndarray'] = None,
+                  engagement: Optional['np.ndarray'] = None,
+                  groups: Optional[Groups] = None) -> Dict[str, Any]:
+        """
+        Aggregate per-source columns into bucketed series.
+
+        Args:
+            timestamps: ``datetime64`` array, one entry per source
+            relevance: Optional relevance scores (NaN when missing)
+            engagement: Optional engagement counts
+            groups: Optional series to aggregate, as kind -> name ->
+                positions of member sources
+
+        Returns:
+            JSON-serializable trends: bucket layout, overall series, one
+            series per group member and the detected spikes
+        """
+        timestamps = np.asarray(timestamps).astype('datetime64[s]')
+        valid = ~np.isnat(timestamps)
+        seconds = timestamps.astype(np.int64)
+        result: Dict[str, Any] = {'sources': int(valid.sum()), 'undated': int((~valid).sum()),
+                                  'series': [], 'spikes': []}
+        if not valid.any():
+            return result
+
+        width = self.bucket_seconds
+        first, last = int(seconds[valid].min()), int(seconds[valid].max())
+        start = first - first % width
+        n_buckets = (last - start) // width + 1
+        if n_buckets > MAX_BUCKETS:
+            factor = -(-n_buckets // MAX_BUCKETS)
+            width *= factor
+            start = first - first % width
+            n_buckets = (last - start) // width + 1
+            logger.info(f"Widened trend buckets to {width}s to stay within {MAX_BUCKETS} buckets")
+
+        # Bucket of every source, -1 for undated ones
+        buckets = np.full(len(timestamps), -1, dtype=np.int64)
+        buckets[valid] = (seconds[valid] - start) // width
+
+        result.update({
+            'bucket_seconds': int(width),
+            'start': _isoformat(start),
+            'end': _isoformat(start + n_buckets * width),
+            'buckets': int(n_buckets),
+        })
+
+        names: List[Tuple[str, str]] = [('all', 'All sources')]
+        member_positions = [np.flatnonzero(valid)]
+        for kind, members in (groups or {}).items():
+            for name, positions in members.items():
+                names.append((kind, name))
+                member_positions.append(np.asarray(positions, dtype=np.int64))
+
+        series_ids = np.repeat(np.arange(len(names)), [len(p) for p in member_positions])
+        positions = np.concatenate(member_positions) if member_positions else np.empty(0, np.int64)
+        member_buckets = buckets[positions]
+        dated = member_buckets >= 0
+        flat = series_ids[dated] * n_buckets + member_buckets[dated]
+        size = len(names) * n_buckets
+        counts = np.bincount(flat, minlength=size).reshape(len(names), n_buckets)
+
+        engagement_sums = None
+        if engagement is not None:
+            engagement_sums = np.bincount(flat, weights=np.asarray(engagement, dtype=np.float64)
+                                          [positions[dated]], minlength=size).reshape(counts.shape)
+        relevance_means = None
+        if relevance is not None:
+            scores = np.asarray(relevance, dtype=np.float64)[positions[dated]]
+            scored = ~np.isnan(scores)
+            totals = np.bincount(flat[scored], weights=scores[scored], minlength=size)
+            scored_counts = np.bincount(flat[scored], minlength=size)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                relevance_means = (totals / scored_counts).reshape(counts.shape)
+
+        zscores, baselines = self.rolling_zscores(counts)
+        spikes = (zscores >= self.threshold) & (counts >= self.min_count)
+
+        for row, (kind, name) in enumerate(names):
+            peak = int(counts[row].argmax())
+            series = {
+                'kind': kind,
+                'name': name,
+                'total': int(counts[row].sum()),
+                'peak': int(counts[row, peak]),
+                'peak_bucket': _isoformat(start + peak * width),
+                'counts': counts[row].tolist(),
+            }
+            if engagement_sums is not None:
+                series['engagement'] = engagement_sums[row].tolist()
+            if relevance_means is not None:
+                series['relevance'] = [None if math.isnan(value) else round(value, 4)
+                                       for value in relevance_means[row].tolist()]
+            if row == 0:
+                result['overall'] = series
+            else:
+                result['series'].append(series)
+
+        rows, columns = np.nonzero(spikes)
+        found = sorted(zip(rows.tolist(), columns.tolist()),
+                       key=lambda cell: zscores[cell], reverse=True)[:MAX_SPIKES]
+        result['spikes'] = [{
+            'kind': names[row][0],
+            'name': names[row][1],
+            'bucket': _isoformat(start + column * width),
+            'count': int(counts[row, column]),
+            'baseline': round(float(baselines[row, column]), 3),
+            'zscore': round(float(zscores[row, column]), 2),
+        } for row, column in found]
+        return result
+
+    def rolling_zscores(self, counts: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Score every bucket against the rolling baseline of preceding buckets.
+
+        Args:
+            counts: Series x buckets count matrix
+
+        Returns:
+            Tuple of (z-scores, baseline means); the first bucket of every
+            series has no baseline and a z-score of 0
+        """
+        values = counts.astype(np.float64)
+        n = values.shape[1]
+        padded = np.zeros((values.shape[0], n + 1))
+        np.cumsum(values, axis=1, out=padded[:, 1:])
+        squares = np.zeros_like(padded)
+        np.cumsum(values * values, axis=1, out=squares[:, 1:])
+
+        # Baseline of bucket k: buckets max(0, k - window) .. k - 1
+        ends = np.arange(n)
+        begins = np.maximum(ends - self.window, 0)
+        history = (ends - begins).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (padded[:, ends] - padded[:, begins]) / history
+            variances = (squares[:, ends] - squares[:, begins]) / history - means * means
+        means[:, history == 0] = 0.0
+        variances[:, history == 0] = 0.0
+        deviation = np.maximum(np.sqrt(np.maximum(variances, 0.0)),
+                               np.sqrt(np.maximum(means, 1.0)))
+        zscores = (values - means) / deviation
+        zscores[:, history == 0] = 0.0
+        return zscores, means
+
+    def analyze(self, sources: Sequence[Any], groups: Optional[Groups] = None) -> Dict[str, Any]:
+        """
+        Compute trends for a collection.
+
+        Args:
+            sources: Source dictionaries or a ``SourceTable``
+            groups: Optional series as kind -> name -> positions in ``sources``
+
+        Returns:
+            Trends as returned by ``aggregate``
+        """
+        timestamps, relevance, engagement = source_columns(sources)
+        return self.aggregate(timestamps, relevance, engagement, groups)
+
+
+def _isoformat(epoch: int) -> str:
+    return str(np.datetime64(int(epoch), 's')) + 'Z'
+
+
+def analyze_trends(sources: Sequence[Any], groups: Optional[Groups] = None,
+                   config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Convenience function to compute trends for a collection.
+
+    Args:
+        sources: Source dictionaries or a ``SourceTable``
+        groups: Optional series as kind -> name -> positions in ``sources``
+        config: Optional settings (``trend_bucket``, ``trend_window``,
+            ``spike_threshold``, ``spike_min_count``)
+
+    Returns:
+        Trends dictionary
+    """
+    config = config or {}
+    engine = TrendEngine(
+        bucket=config.get('trend_bucket', DEFAULT_BUCKET),
+        window=config.get('trend_window', DEFAULT_WINDOW),
+        threshold=config.get('spike_threshold', DEFAULT_SPIKE_THRESHOLD),
+        min_count=config.get('spike_min_count', DEFAULT_MIN_COUNT),
+    )
+    return engine.analyze(sources, groups)
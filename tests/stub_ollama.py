@@ -0,0 +1,120 @@
+"""
+Local stub HTTP server mimicking the Ollama ``/api/generate`` endpoint.
+
+Used by the test suite and benchmarks; responses echo a JSON analysis so the
+summarizer can parse them.
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        # Clients that time out close the socket mid-response; ignore that
+        pass
+
+
+class StubOllamaServer:
+    """
+    Threaded stub server.
+    
+    Args:
+        delay: Seconds to sleep before answering each request
+        fail_first: Number of initial requests answered with HTTP 500
+    """
+    
+    def __init__(self, delay: float = 0.0, fail_first: int = 0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = _QuietServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.01}, daemon=True)
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def _handler(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately; avoid Nagle delays
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                with stub._lock:
+                    stub.requests.append(payload)
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    fail = len(stub.requests) <= stub.fail_first
+                try:
+                    time.sleep(stub.delay)
+                    if fail:
+                        self._send(500, {'error': 'stub failure'})
+                    else:
+                        self._respond(payload)
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+            
+            def _respond(self, payload):
+                prompt = payload.get('prompt', '')
+                answer = json.dumps({
+                    'findings': [f"Finding for {len(prompt)} chars"],
+                    'themes': ['stub'],
+                    'entities': [],
+                })
+                if not payload.get('stream', True):
+                    self._send(200, {'model': payload.get('model'), 'response': answer, 'done': True})
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                pieces = [answer[i:i + 16] for i in range(0, len(answer), 16)]
+                for piece in pieces:
+                    self._chunk({'response': piece, 'done': False})
+                self._chunk({'response': '', 'done': True})
+                self.wfile.write(b'0\r\n\r\n')
+            
+            def _chunk(self, obj):
+                data = (json.dumps(obj) + '\n').encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+            
+            def _send(self, status, obj):
+                body = json.dumps(obj).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        return Handler
@@ -116,5 +116,21 @@ def test_summarize_findings():
     assert "recommendations" in result
 
 
+def test_analyze_data_pipeline(tmp_path):
+    """Test the end-to-end pipeline on the sample collection."""
+    sample = Path(__file__).parent.parent / "data" / "input" / "sample_huginn_output.json"
+    output = tmp_path / "report.md"
+    
+    assert analyze_data(str(sample), str(output), {})
+    report = output.read_text(encoding="utf-8")
+    assert "huginn_sample_001" in report
+    assert "https://example.com/blog/post" in report
+
+
+def test_analyze_data_missing_input(tmp_path):
+    """Test that a missing input file fails cleanly."""
+    assert not analyze_data(str(tmp_path / "missing.json"), str(tmp_path / "report.md"))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
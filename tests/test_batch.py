@@ -0,0 +1,100 @@
+"""
+Test suite for Muninn batch and watch-mode processing.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.batch import BatchProcessor, ProcessedLedger, discover_inputs, report_path
+
+
+def _write_collection(path, count=3):
+    sources = [{"type": "web", "url": f"https://example.com/{path.stem}/{i}",
+                "content": f"collection {path.stem} source {i}"} for i in range(count)]
+    path.write_text(json.dumps({"collection_id": path.stem, "sources": sources}))
+
+
+def test_batch_processes_directory_and_isolates_failures(tmp_path):
+    """Test that every file gets a report and a bad file does not stop the batch."""
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    input_dir.mkdir()
+    for name in ("a", "b", "c"):
+        _write_collection(input_dir / f"{name}.json")
+    (input_dir / "broken.json").write_text("{not json")
+    (input_dir / "notes.txt").write_text("ignored")
+    
+    processor = BatchProcessor({}, str(input_dir), str(output_dir), workers=2)
+    assert processor.run() == {"processed": 3, "failed": 1, "skipped": 0}
+    for name in ("a", "b", "c"):
+        assert (output_dir / f"{name}.json_report.md").exists()
+    
+    # A rerun skips everything already handled, including the failure
+    processor = BatchProcessor({}, str(input_dir), str(output_dir), workers=2)
+    assert processor.run() == {"processed": 0, "failed": 0, "skipped": 4}
+
+
+def test_ledger_reprocesses_modified_files(tmp_path):
+    """Test that a changed file is no longer considered processed."""
+    path = tmp_path / "a.json"
+    _write_collection(path)
+    ledger = ProcessedLedger(str(tmp_path / ".processed.jsonl"))
+    ledger.record(ProcessedLedger.fingerprint(path), True, "report.md")
+    assert ProcessedLedger(str(tmp_path / ".processed.jsonl")).is_processed(path)
+    
+    _write_collection(path, count=5)
+    assert not ledger.is_processed(path)
+    assert discover_inputs(str(tmp_path)) == [path]
+
+
+def test_workers_do_not_start_inner_pools(tmp_path):
+    """Test that batch workers analyze with single-process inner stages."""
+    config = {"performance": {"entity_workers": 4, "workers": 8}}
+    processor = BatchProcessor(config, str(tmp_path), str(tmp_path), workers=2)
+    assert processor.worker_config["performance"] == {
+        "entity_workers": 1, "sentiment_workers": 1, "loader_workers": 1, "workers": 8}
+    assert config["performance"] == {"entity_workers": 4, "workers": 8}
+    assert BatchProcessor(config, str(tmp_path), str(tmp_path), workers=1).worker_config is config
+
+
+def test_json_and_jsonl_get_separate_reports(tmp_path):
+    """Test that collections differing only in suffix do not share a report."""
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    input_dir.mkdir()
+    _write_collection(input_dir / "a.json")
+    sources = json.loads((input_dir / "a.json").read_text())["sources"]
+    (input_dir / "a.jsonl").write_text("".join(json.dumps(s) + "\n" for s in sources))
+    assert report_path(input_dir / "a.json", str(output_dir)) != \
+        report_path(input_dir / "a.jsonl", str(output_dir))
+    
+    processor = BatchProcessor({}, str(input_dir), str(output_dir), workers=2)
+    assert processor.run() == {"processed": 2, "failed": 0, "skipped": 0}
+    assert (output_dir / "a.json_report.md").exists()
+    assert (output_dir / "a.jsonl_report.md").exists()
+
+
+def test_watch_picks_up_new_files(tmp_path):
+    """Test that watch mode processes files that land while it runs."""
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    input_dir.mkdir()
+    _write_collection(input_dir / "first.json")
+    
+    stop = threading.Event()
+    processor = BatchProcessor({}, str(input_dir), str(output_dir), workers=1)
+    
+    def drop_second():
+        _write_collection(input_dir / "second.json")
+    
+    timer = threading.Timer(0.2, drop_second)
+    timer.start()
+    stats = processor.watch(poll_interval=0.1, stop=stop, max_polls=15)
+    timer.join()
+    
+    assert stats["processed"] == 2
+    assert (output_dir / "first.json_report.md").exists()
+    assert (output_dir / "second.json_report.md").exists()
@@ -0,0 +1,113 @@
+"""
+Test suite for Muninn analysis cache.
+"""
+
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.cache import AnalysisCache, make_cache_key
+from muninn.inference import ModelBackend
+from muninn.summarizer import IntelligenceSummarizer
+
+
+def _write_entries(cache_dir, worker, count):
+    cache = AnalysisCache(cache_dir)
+    for idx in range(count):
+        cache.put(f"{worker}-{idx}", {"findings": [f"{worker}-{idx}"]})
+    cache.close()
+    return count
+
+
+def test_cache_key_depends_on_model():
+    """Test that model name and parameters are part of the key."""
+    model = {"type": "ollama", "name": "llama2", "temperature": 0.7}
+    key = make_cache_key("abc", model)
+    assert key == make_cache_key("abc", dict(model))
+    assert key != make_cache_key("abc", dict(model, name="mistral"))
+    assert key != make_cache_key("abc", dict(model, temperature=0.2))
+    assert key != make_cache_key("abd", model)
+
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used entries are evicted first."""
+    cache = AnalysisCache(str(tmp_path), max_bytes=100)
+    cache.put("a", {"v": "x" * 30})
+    cache.put("b", {"v": "x" * 30})
+    assert cache.get("a") is not None
+    cache.put("c", {"v": "x" * 30})
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.total_bytes <= 100
+
+
+def test_concurrent_writers(tmp_path):
+    """Test several processes writing to the same cache."""
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(_write_entries, str(tmp_path), worker, 25) for worker in range(4)]
+        assert sum(f.result() for f in futures) == 100
+    
+    assert len(AnalysisCache(str(tmp_path))) == 100
+
+
+class PromptBackend(ModelBackend):
+    """Backend answering with the content line of every prompt as its finding."""
+    
+    def __init__(self):
+        self.prompts = []
+    
+    def generate(self, prompt, timeout=None):
+        self.prompts.append(prompt)
+        return json.dumps({"findings": [prompt.rsplit("\n", 2)[-2]]})
+
+
+def test_summarizer_skips_model_on_hit(tmp_path):
+    """Test that cached sources never reach the model."""
+    config = {"performance": {"enable_cache": True, "cache_dir": str(tmp_path)}}
+    sources = [{"type": "web", "content": "New botnet observed"}]
+    backend = PromptBackend()
+    
+    first = IntelligenceSummarizer(config, backend).analyze_sources(sources)
+    second = IntelligenceSummarizer(config, backend).analyze_sources(sources)
+    
+    assert len(backend.prompts) == 1
+    assert first["key_findings"] == second["key_findings"] == ["New botnet observed"]
+
+
+def test_summarizer_cache_key_covers_prompt(tmp_path):
+    """Test that sources differing in indicators, URL or title do not share results."""
+    config = {"performance": {"enable_cache": True, "cache_dir": str(tmp_path)}}
+    backend = PromptBackend()
+    sources = [
+        {"type": "web", "url": "https://a.example/1", "content": "C2 at 1.2.3.4"},
+        {"type": "web", "url": "https://a.example/1", "content": "C2 at 1-2-3-4"},
+        {"type": "web", "url": "https://a.example/2", "content": "C2 at 1.2.3.4"},
+        {"type": "web", "url": "https://a.example/1", "title": "Beacon", "content": "C2 at 1.2.3.4"},
+    ]
+    results = IntelligenceSummarizer(config, backend).analyze_batch(sources)
+    assert len(backend.prompts) == 4
+    assert results[1]["findings"] == ["C2 at 1-2-3-4"]
+    
+    IntelligenceSummarizer(config, backend).analyze_batch(sources)
+    assert len(backend.prompts) == 4
+
+
+def test_placeholder_results_not_cached(tmp_path):
+    """Test that analysis without a backend does not hide a later backend's results."""
+    config = {"performance": {"enable_cache": True, "cache_dir": str(tmp_path)}}
+    sources = [{"type": "web", "url": "https://a.example/1", "content": "C2 at 1.2.3.4"}]
+    placeholder = IntelligenceSummarizer(config)
+    assert placeholder.analyze_batch(sources)[0]["findings"] == []
+    assert len(placeholder.cache) == 0
+    
+    backend = PromptBackend()
+    assert IntelligenceSummarizer(config, backend).analyze_batch(sources)[0]["findings"] == [
+        "C2 at 1.2.3.4"]
+    assert len(backend.prompts) == 1
@@ -0,0 +1,127 @@
+"""
+Test suite for Muninn checkpointed, resumable analysis runs.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from muninn.analyze import analyze_data
+from muninn.checkpoint import CheckpointLog, checkpoint_path, prompt_digest
+from muninn.inference import InferenceError, ModelBackend
+from muninn.summarizer import IntelligenceSummarizer
+from stub_ollama import StubOllamaServer
+
+MODEL = {"type": "stub", "name": "stub-model"}
+RESPONSE = json.dumps({"findings": ["Finding"], "themes": [], "entities": []})
+
+
+class DyingBackend(ModelBackend):
+    """Backend that fails every request after ``alive`` successful ones."""
+
+    name = "dying"
+
+    def __init__(self, alive=None):
+        self.alive = alive
+        self.prompts = []
+
+    def generate(self, prompt, timeout=None):
+        if self.alive is not None and len(self.prompts) >= self.alive:
+            raise InferenceError("backend died")
+        self.prompts.append(prompt)
+        return RESPONSE
+
+
+def _sources(count):
+    return [{"type": "web", "url": f"https://example.com/{i}", "content": f"Source {i}"}
+            for i in range(count)]
+
+
+def _summarizer(backend, checkpoint):
+    config = {"model_type": "stub", "model": dict(MODEL, retries=0),
+              "performance": {"workers": 1, "batch_size": 4}}
+    return IntelligenceSummarizer(config, backend=backend, checkpoint=checkpoint)
+
+
+def test_checkpoint_records_batches_and_resumes(tmp_path):
+    """Test that a rerun only sends the prompts of unfinished batches."""
+    sources = _sources(20)
+    checkpoint = CheckpointLog("c1", MODEL, str(tmp_path))
+    results = _summarizer(DyingBackend(alive=10), checkpoint).analyze_batch(sources)
+    checkpoint.finish()
+    assert [bool(r["findings"]) for r in results] == [True] * 10 + [False] * 10
+    assert checkpoint.failures == 10 and checkpoint.path.exists()
+    # Header plus the three batches with at least one response
+    assert len(checkpoint.path.read_text(encoding="utf-8").splitlines()) == 4
+
+    resumed = CheckpointLog("c1", MODEL, str(tmp_path), resume=True)
+    assert len(resumed.responses) == 10
+    backend = DyingBackend()
+    results = _summarizer(backend, resumed).analyze_batch(sources)
+    assert all(r["findings"] for r in results)
+    assert len(backend.prompts) == 10 and "Source 10" in backend.prompts[0]
+    resumed.finish()
+    assert not resumed.path.exists()
+
+
+def test_checkpoint_ignores_other_models_and_torn_lines(tmp_path):
+    """Test that logs of other model settings are not resumed and torn lines are skipped."""
+    log = CheckpointLog("c1", MODEL, str(tmp_path))
+    log.record({prompt_digest("a"): "A"})
+    log.record({prompt_digest("b"): "B"})
+    log.close()
+    with open(log.path, "a", encoding="utf-8") as f:
+        f.write('{"batch": 2, "respon')
+
+    resumed = CheckpointLog("c1", MODEL, str(tmp_path), resume=True)
+    assert resumed.get("a") == "A" and resumed.get("b") == "B" and resumed.batches == 2
+    assert CheckpointLog("c1", dict(MODEL, name="other"), str(tmp_path), resume=True).responses == {}
+    # Without --resume the log is replaced on the first write
+    fresh = CheckpointLog("c1", MODEL, str(tmp_path))
+    fresh.record({prompt_digest("c"): "C"})
+    fresh.close()
+    assert CheckpointLog("c1", MODEL, str(tmp_path), resume=True).responses == {
+        prompt_digest("c"): "C"}
+
+
+def test_checkpoint_path_is_safe():
+    """Test that collection IDs map to distinct, safe file names."""
+    path = checkpoint_path("ckpt", "../huginn/run 1")
+    assert path.parent == Path("ckpt") and "/" not in path.name and ".." not in path.name
+    assert checkpoint_path("ckpt", "a/b") != checkpoint_path("ckpt", "a_b")
+
+
+def test_analyze_data_resume(tmp_path):
+    """Test resuming a pipeline run whose backend failed part of the way."""
+    sample = tmp_path / "collection.json"
+    sample.write_text(json.dumps({"collection_id": "resume-test", "sources": _sources(6)}),
+                      encoding="utf-8")
+    output = tmp_path / "report.md"
+    performance = {"workers": 2, "batch_size": 2, "enable_cache": False, "metrics": False,
+                   "checkpoint_dir": str(tmp_path / "checkpoints")}
+    analysis = {"deduplicate": False, "theme_identification": False,
+                "sentiment_analysis": False}
+
+    with StubOllamaServer(fail_first=3) as server:
+        config = {"model": {"type": "ollama", "name": "stub", "api_url": server.url, "retries": 0},
+                  "analysis": analysis, "performance": performance}
+        assert analyze_data(str(sample), str(output), config)
+        first = [request["prompt"] for request in server.requests
+                 if "Analyze the following" in request["prompt"]]
+    log = checkpoint_path(performance["checkpoint_dir"], "resume-test")
+    assert log.exists()
+
+    with StubOllamaServer() as server:
+        config["model"]["api_url"] = server.url
+        config["performance"] = dict(performance, resume=True)
+        assert analyze_data(str(sample), str(output), config)
+        prompts = [request["prompt"] for request in server.requests
+                   if "Analyze the following" in request["prompt"]]
+    # Only the three prompts that failed are sent again
+    assert len(first) == 6 and len(prompts) == 3
+    assert not log.exists()
@@ -0,0 +1,122 @@
+"""
+Test suite for Muninn data loader module.
+"""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.data_loader import (HuginDataLoader, load_huginn_data, EXAMPLE_HUGINN_DATA,
+                                _StreamingCollectionParser)
+
+SAMPLE_FILE = Path(__file__).parent.parent / "data" / "input" / "sample_huginn_output.json"
+
+
+def test_load_sample():
+    """Test loading the bundled sample collection."""
+    data = load_huginn_data(str(SAMPLE_FILE))
+    assert data["collection_id"] == "huginn_sample_001"
+    assert len(data["sources"]) == 3
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_sources_matches_load(chunk_size):
+    """Test that streaming yields the same sources as a full load."""
+    expected = json.loads(SAMPLE_FILE.read_text(encoding="utf-8"))
+    loader = HuginDataLoader(str(SAMPLE_FILE), chunk_size=chunk_size)
+    
+    sources = list(loader.iter_sources())
+    assert sources == expected["sources"]
+    assert loader.collection_id == "huginn_sample_001"
+    assert loader.metadata == expected["metadata"]
+    assert loader.header["collection_date"] == expected["collection_date"]
+
+
+def test_iter_sources_header_after_sources(tmp_path):
+    """Test top-level fields written after the sources array."""
+    path = tmp_path / "collection.json"
+    payload = {"sources": EXAMPLE_HUGINN_DATA["sources"], "collection_id": "late", "count": 12345}
+    path.write_text(json.dumps(payload))
+    
+    loader = HuginDataLoader(str(path), chunk_size=3)
+    assert len(list(loader.iter_sources())) == 2
+    assert loader.collection_id == "late"
+    assert loader.header["count"] == 12345
+
+
+def test_iter_sources_invalid_json(tmp_path):
+    """Test that malformed input raises JSONDecodeError."""
+    path = tmp_path / "broken.json"
+    path.write_text('{"sources": [{"type": "web"} {"type": "social"}]}')
+    
+    loader = HuginDataLoader(str(path))
+    with pytest.raises(json.JSONDecodeError):
+        list(loader.iter_sources())
+
+
+def test_iter_sources_unterminated_value(tmp_path):
+    """Test that a value that never ends is not read to the end of the file."""
+    text = '{"sources": [{"type": "web"}, {"content": "' + "x" * 200000 + '"]}'
+    fp = io.StringIO(text)
+    parser = _StreamingCollectionParser(fp, 64, {}, max_value_chars=1000)
+    sources = parser.parse()
+    assert next(sources) == {"type": "web"}
+    with pytest.raises(json.JSONDecodeError, match="exceeds 1000 characters"):
+        next(sources)
+    assert fp.tell() < 3000
+    
+    # Long values within the limit are still decoded
+    path = tmp_path / "long.json"
+    path.write_text(json.dumps({"sources": [{"content": "y" * 50000}]}))
+    loader = HuginDataLoader(str(path), chunk_size=16, max_value_chars=60000)
+    assert [len(s["content"]) for s in loader.iter_sources()] == [50000]
+
+
+def test_iter_sources_missing_file():
+    """Test that a missing file raises FileNotFoundError."""
+    loader = HuginDataLoader("does_not_exist.json")
+    with pytest.raises(FileNotFoundError):
+        list(loader.iter_sources())
+
+
+def _write_jsonl(path, count, bad_lines=()):
+    """Write a JSON Lines file with optional malformed lines (1-based)."""
+    lines = []
+    for idx in range(1, count + 1):
+        if idx in bad_lines:
+            lines.append('{"type": "web", "url": ')
+        else:
+            lines.append(json.dumps({"type": "web", "url": f"https://example.com/{idx}"}))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_jsonl_detected_by_suffix(tmp_path):
+    """Test that .jsonl files are loaded as JSON Lines."""
+    path = tmp_path / "collection.jsonl"
+    _write_jsonl(path, 5)
+    
+    data = load_huginn_data(str(path))
+    assert data["collection_id"] == "collection"
+    assert [s["url"] for s in data["sources"]] == [f"https://example.com/{i}" for i in range(1, 6)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_jsonl_parallel_order_and_errors(tmp_path, workers):
+    """Test ordered parallel decoding with malformed lines reported by number."""
+    path = tmp_path / "collection.ndjson"
+    _write_jsonl(path, 200, bad_lines={3, 150})
+    
+    loader = HuginDataLoader(str(path), workers=workers, jsonl_chunk_bytes=256)
+    sources = list(loader.iter_sources())
+    
+    expected = [f"https://example.com/{i}" for i in range(1, 201) if i not in (3, 150)]
+    assert [s["url"] for s in sources] == expected
+    assert [line for line, _ in loader.errors] == [3, 150]
+    assert loader.metadata["malformed_lines"] == 2
@@ -0,0 +1,98 @@
+"""
+Test suite for Muninn source deduplication stage.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn import dedup
+from muninn.dedup import (Deduplicator, MinHasher, content_hash, deduplicate_sources,
+                         normalize_url)
+from muninn.report_generator import ReportGenerator
+
+ARTICLE = ("Researchers observed a new phishing campaign targeting regional banks "
+           "with credential harvesting pages hosted on compromised WordPress sites "
+           "and distributed through SMS messages impersonating support staff.")
+
+
+def test_normalize_url():
+    """Test that trivially different URLs normalize identically."""
+    assert normalize_url("HTTPS://www.Example.com:443/a/?utm_source=x&b=2&a=1#top") == \
+        normalize_url("https://example.com/a?a=1&b=2")
+    assert normalize_url("https://example.com/a") != normalize_url("https://example.com/b")
+    assert normalize_url(None) is None
+
+
+def test_exact_duplicates():
+    """Test URL and content-hash duplicate removal."""
+    sources = [
+        {"type": "web", "url": "https://example.com/a", "content": ARTICLE},
+        {"type": "web", "url": "https://www.example.com/a/", "content": "different"},
+        {"type": "web", "url": "https://mirror.example.org/a", "content": ARTICLE.upper()},
+        {"type": "web", "url": "https://example.com/other", "content": "Unrelated text entirely."},
+    ]
+    
+    dedup = Deduplicator()
+    result = dedup.deduplicate(sources)
+    
+    assert [s["url"] for s in result] == ["https://example.com/a", "https://example.com/other"]
+    assert result[0]["metadata"]["duplicate_count"] == 2
+    assert result[0]["metadata"]["duplicate_urls"] == [
+        "https://www.example.com/a/", "https://mirror.example.org/a"]
+    assert dedup.stats["url_duplicates"] == 1
+    assert dedup.stats["content_duplicates"] == 1
+    assert "metadata" not in sources[0]
+
+
+def test_content_hash_keeps_punctuation():
+    """Test that indicators differing only in punctuation are not exact duplicates."""
+    assert content_hash("C2 at 1.2.3.4") != content_hash("C2 at 1-2-3-4")
+    assert content_hash("evil.com beacon") != content_hash("evil com beacon")
+    assert content_hash("  Evil.com\n beacon ") == content_hash("evil.com beacon")
+    assert content_hash("   ") is None
+    result = deduplicate_sources([{"url": "https://a.example/1", "content": "C2 at 1.2.3.4"},
+                                  {"url": "https://a.example/2", "content": "C2 at 1-2-3-4"},
+                                  {"url": "https://a.example/3", "content": "C2 at 1.2.3.4!"}])
+    assert [source["url"] for source in result] == ["https://a.example/1", "https://a.example/2"]
+
+
+def test_vectorized_signatures_match_fallback(monkeypatch):
+    """Test that numpy and pure-Python MinHash signatures are identical."""
+    pytest.importorskip("numpy")
+    vectorized = MinHasher().signature(ARTICLE)
+    monkeypatch.setattr(dedup, "np", None)
+    assert MinHasher().signature(ARTICLE) == vectorized
+    assert all(isinstance(value, int) for value in vectorized)
+
+
+def test_near_duplicates():
+    """Test MinHash/LSH collapse of lightly edited copies."""
+    retweet = ARTICLE.replace("support staff.", "support staff. Stay safe!")
+    sources = [
+        {"type": "social", "url": "https://twitter.com/a/status/1", "content": ARTICLE},
+        {"type": "social", "url": "https://twitter.com/b/status/2", "content": retweet},
+        {"type": "social", "url": "https://twitter.com/c/status/3",
+         "content": "Completely different discussion about ransomware negotiations."},
+    ]
+    
+    result = deduplicate_sources(sources)
+    assert len(result) == 2
+    assert result[0]["metadata"]["duplicate_count"] == 1
+
+
+def test_report_cites_merged_copies():
+    """Test that the sources section cites each origin once."""
+    sources = deduplicate_sources([
+        {"type": "web", "url": "https://example.com/a", "content": ARTICLE},
+        {"type": "web", "url": "https://example.com/a?utm_medium=rss", "content": ARTICLE},
+    ])
+    
+    report = ReportGenerator().generate({"sources": sources}, {})
+    assert report.count("https://example.com/a") == 1
+    assert "(+1 duplicate merged)" in report
@@ -0,0 +1,159 @@
+"""
+Test suite for Muninn source embeddings and the nearest-neighbour index.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+np = pytest.importorskip("numpy")
+
+from muninn.embeddings import (EmbeddingIndex, HashingEmbedder, ModelEmbedder, create_embedder,
+                               related_sources)
+from muninn.report_generator import ReportGenerator
+from muninn.summarizer import IntelligenceSummarizer
+
+TOPICS = [
+    "ransomware gang encrypted hospital servers and demanded bitcoin ransom",
+    "phishing campaign spoofed bank login pages to harvest credentials",
+    "ddos botnet flooded government websites with junk traffic",
+    "data breach exposed customer passwords from retail database",
+]
+
+
+def _sources(count, prefix="https://example.com"):
+    """Sources cycling through TOPICS, each with a unique URL."""
+    return [{"url": f"{prefix}/{i}", "title": f"Report {i}",
+             "content": f"{TOPICS[i % len(TOPICS)]} item{i}"} for i in range(count)]
+
+
+class StubBackend:
+    """Backend embedding texts by the topic words they contain."""
+
+    name = "stub"
+    embedding_model = "topics"
+
+    def __init__(self):
+        self.requests = 0
+
+    def embed(self, texts, timeout=None):
+        self.requests += 1
+        return [[float(topic.split()[0] in text) for topic in TOPICS] for text in texts]
+
+
+def test_hashing_embedder():
+    """Test deterministic, unit-length vectors that reflect shared words."""
+    embedder = HashingEmbedder(dim=64)
+    sources = [{"content": TOPICS[0]}, {"content": "ransomware gang hospital ransom"},
+               {"content": TOPICS[2]}, {"content": ""}]
+    vectors = embedder.embed(sources)
+    assert vectors.shape == (4, 64) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0)
+    assert not vectors[3].any()
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+    assert np.array_equal(vectors, embedder.embed(sources))
+    assert embedder.embed([]).shape == (0, 64)
+
+
+def test_model_embedder_batches_requests():
+    """Test that the backend embeds in batches and vectors are normalized."""
+    backend = StubBackend()
+    embedder = create_embedder({}, backend)
+    assert isinstance(embedder, ModelEmbedder) and embedder.name == "stub:topics"
+    embedder.batch_size = 2
+    vectors = embedder.embed(_sources(5))
+    assert backend.requests == 3
+    assert np.allclose(vectors, np.eye(4, dtype=np.float32)[[0, 1, 2, 3, 0]])
+    assert isinstance(create_embedder({"performance": {"embedding_dim": 32}}), HashingEmbedder)
+
+
+def test_exact_search_before_training(tmp_path):
+    """Test adding, overwriting and searching a small (untrained) index."""
+    embedder = HashingEmbedder(dim=64)
+    index = EmbeddingIndex(str(tmp_path), nlist=16)
+    sources = _sources(8)
+    rows = index.add("c1", sources, embedder.embed(sources), embedder.name)
+    assert rows == list(range(8)) and index.centroids is None
+
+    (found,) = index.search(index.vectors[[0]], k=3, exclude=[0])
+    # Same topic first, best match first
+    assert found[0][0] == 4 and len(found) == 3
+    assert found[0][1] >= found[1][1] >= found[2][1]
+
+    # Re-adding a source replaces its vector in place
+    assert index.add("c2", sources[:1], embedder.embed(sources[2:3]), embedder.name) == [0]
+    assert index.rows == 8
+    assert index.describe([0])[0]["collection_id"] == "c2"
+
+    with pytest.raises(ValueError):
+        index.add("c3", sources[:1], np.ones((1, 8), dtype=np.float32), "other")
+    index.close()
+
+
+def test_ivf_index_is_trained_and_persisted(tmp_path):
+    """Test that the index trains its lists, keeps assigning rows and reloads."""
+    embedder = HashingEmbedder(dim=64)
+    index = EmbeddingIndex(str(tmp_path), nlist=4, nprobe=2)
+    sources = _sources(40)
+    index.add("c1", sources, embedder.embed(sources), embedder.name)
+    assert index.centroids is not None and index.centroids.shape == (4, 64)
+    assert (np.asarray(index.lists[:40]) >= 0).all()
+
+    later = _sources(4, prefix="https://later.example")
+    rows = index.add("c2", later, embedder.embed(later), embedder.name)
+    assert (np.asarray(index.lists[rows]) >= 0).all()
+    index.close()
+
+    reopened = EmbeddingIndex(str(tmp_path), nlist=4, nprobe=2)
+    assert reopened.rows == 44 and reopened.centroids is not None
+    query = embedder.embed([{"content": TOPICS[1]}])
+    found = reopened.search(query, k=5)[0]
+    assert all(row % len(TOPICS) == 1 for row, _ in found if row < 40)
+    reopened.close()
+
+
+def test_related_sources_across_collections(tmp_path):
+    """Test that related sources come from earlier collections and skip the source itself."""
+    embedder = HashingEmbedder(dim=64)
+    index = EmbeddingIndex(str(tmp_path), nlist=16)
+    related_sources(index, embedder, "earlier", _sources(8, prefix="https://old.example"))
+
+    current = _sources(4)
+    current[0]["metadata"] = {"priority_score": 0.1}
+    current[2]["metadata"] = {"priority_score": 0.9}
+    related = related_sources(index, embedder, "current", current, k=2, shown=2)
+    assert [entry["title"] for entry in related] == ["Report 2", "Report 0"]
+    for entry in related:
+        assert len(entry["similar"]) == 2
+        assert entry["url"] not in [similar["url"] for similar in entry["similar"]]
+    assert related[0]["similar"][0]["collection_id"] == "earlier"
+    assert index.rows == 12
+    index.close()
+
+
+def test_summarizer_related_sources(tmp_path):
+    """Test the summarizer hook and its configuration switch."""
+    config = {"analysis": {"related_sources": True, "related_per_source": 1},
+              "performance": {"embedding_dir": str(tmp_path), "embedding_dim": 64}}
+    summarizer = IntelligenceSummarizer(config)
+    related = summarizer.related_sources(_sources(6), "c1")
+    assert len(related) == 5 and all(len(entry["similar"]) == 1 for entry in related)
+    assert IntelligenceSummarizer({}).related_sources(_sources(6), "c1") is None
+
+
+def test_detailed_analysis_lists_similar_sources():
+    """Test the Similar Sources subsection of the detailed analysis."""
+    related = [{"title": "Report 0", "url": "https://example.com/0",
+                "similar": [{"title": "Old report", "url": "https://old.example/4",
+                             "collection_id": "earlier", "score": 0.873}]}]
+    generator = ReportGenerator({})
+    section = generator._generate_detailed_analysis({"sources": []}, {"related_sources": related})
+    assert "### Similar Sources" in section
+    assert "- **Report 0**" in section
+    assert "  - Old report https://old.example/4 (collection earlier, similarity 0.87)" in section
+    assert "Similar Sources" not in generator._generate_detailed_analysis({"sources": []}, {})
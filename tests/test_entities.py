@@ -0,0 +1,94 @@
+"""
+Test suite for Muninn entity extraction and index.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.entities import EntityExtractor, EntityIndex, extract_entities, index_collection
+
+TEXT = ("APT28 staged payloads on 203.0.113.7 and update-check.example.net, "
+        "exploiting CVE-2024-3400 (see cve-2024-3400). Contact soc@victim.example.org "
+        "or @threat_intel. MD5 D41D8CD98F00B204E9800998ECF8427E dropped as loader.exe; "
+        "version 1.2.3.4.5 and 999.1.1.1 are not addresses. Mirror: update-check.example.net.")
+
+SOURCES = [
+    {"type": "web", "url": "https://example.com/a", "title": "Campaign on 203.0.113.7",
+     "content": TEXT},
+    {"type": "social", "url": "https://social.example/b", "content": "Seen again: update-check.example.net"},
+    {"type": "social", "url": "https://social.example/c", "content": "Nothing to see here"},
+]
+
+
+def test_extract_entities():
+    """Test indicator patterns, normalization and mention counts."""
+    found = {(kind, value): mentions for kind, value, mentions in extract_entities(TEXT)}
+    assert found == {
+        ("ipv4", "203.0.113.7"): 1,
+        ("domain", "update-check.example.net"): 2,
+        ("cve", "CVE-2024-3400"): 2,
+        ("email", "soc@victim.example.org"): 1,
+        ("handle", "@threat_intel"): 1,
+        ("md5", "d41d8cd98f00b204e9800998ecf8427e"): 1,
+    }
+    assert extract_entities("") == []
+
+
+def test_parallel_extraction_matches_serial():
+    """Test that the process pool returns the same results in order."""
+    sources = SOURCES * 20
+    serial = EntityExtractor(workers=1).extract(sources)
+    with EntityExtractor(workers=2, min_parallel=1) as extractor:
+        parallel = extractor.extract(sources)
+    assert parallel == serial
+    assert serial[2] == []
+
+
+def test_chunked_extraction_reuses_one_pool():
+    """Test that chunks start the pool once enough sources were seen, then share it."""
+    sources = SOURCES * 20
+    with EntityExtractor(workers=2, min_parallel=len(sources) + 1) as extractor:
+        first = extractor.extract(sources)
+        assert extractor._pool is None
+        second = extractor.extract(sources)
+        pool = extractor._pool
+        assert pool is not None
+        third = extractor.extract(sources)
+        assert extractor._pool is pool
+    assert extractor._pool is None
+    assert first == second == third == EntityExtractor(workers=1).extract(sources)
+
+
+def test_index_lookup_and_reindex(tmp_path):
+    """Test inverted lookups across collections and re-indexing."""
+    index = EntityIndex(str(tmp_path / "entities.sqlite3"))
+    extractor = EntityExtractor(workers=1)
+    index.add("c1", SOURCES, extractor.extract(SOURCES))
+    index.add("c2", SOURCES[1:], extractor.extract(SOURCES[1:]))
+
+    assert set(index.collections("Update-Check.example.net")) == {"c1", "c2"}
+    assert index.collections("cve-2024-3400") == ["c1"]
+    assert index.collections("203.0.113.7", kind="domain") == []
+    postings = index.lookup("update-check.example.net")
+    assert {(p["collection_id"], p["source"]) for p in postings} == {
+        ("c1", "https://example.com/a"), ("c1", "https://social.example/b"),
+        ("c2", "https://social.example/b")}
+    assert index.top_entities("c1")[0]["value"] == "update-check.example.net"
+
+    # Re-indexing replaces the collection's postings
+    index.add("c1", SOURCES[2:], extractor.extract(SOURCES[2:]))
+    assert index.collections("update-check.example.net") == ["c2"]
+    index.close()
+
+
+def test_index_collection(tmp_path):
+    """Test the pipeline helper returning the collection's top entities."""
+    path = str(tmp_path / "entities.sqlite3")
+    top = index_collection("c1", SOURCES, {"entity_index": path, "entity_workers": 1,
+                                           "max_entities": 2})
+    assert [(entity["value"], entity["sources"], entity["mentions"]) for entity in top] == [
+        ("update-check.example.net", 2, 3), ("203.0.113.7", 1, 2)]
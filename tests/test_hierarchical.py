@@ -0,0 +1,84 @@
+"""
+Test suite for Muninn hierarchical map-reduce summarization.
+"""
+
+import math
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.hierarchical import (HierarchicalSummarizer, MAP_PROMPT, chunk_by_tokens,
+                                 estimate_tokens)
+from muninn.inference import InferenceExecutor, ModelBackend
+
+
+class CountingBackend(ModelBackend):
+    """Backend returning a short summary and recording every prompt."""
+    
+    def __init__(self):
+        self.prompts = []
+    
+    def generate(self, prompt, timeout=None):
+        self.prompts.append(prompt)
+        kind = "map" if prompt.startswith(MAP_PROMPT[:40]) else "reduce"
+        return f"{kind} summary {len(self.prompts)}"
+
+
+def test_chunk_by_tokens_respects_budget():
+    """Test greedy packing under a token budget and item limit."""
+    texts = ["a" * 40] * 10
+    chunks = list(chunk_by_tokens(texts, budget=25))
+    assert all(sum(estimate_tokens(t) for t in chunk) <= 25 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 10
+    assert [len(c) for c in chunk_by_tokens(texts, budget=1000, max_items=4)] == [4, 4, 2]
+    assert list(chunk_by_tokens(["x" * 1000], budget=10)) == [["x" * 40]]
+
+
+def test_summarize_builds_logarithmic_tree():
+    """Test that reduce depth grows logarithmically with chunk count."""
+    backend = CountingBackend()
+    executor = InferenceExecutor(backend, workers=4, batch_size=4)
+    summarizer = HierarchicalSummarizer(executor, {"context_window": 512, "max_tokens": 64},
+                                        fan_in=4)
+    
+    texts = [f"- [web] source {i} " + "word " * 60 for i in range(400)]
+    summary = summarizer.summarize(texts)
+    
+    assert summary.startswith("reduce summary")
+    stats = summarizer.stats
+    assert stats["map_calls"] > 64
+    assert stats["depth"] <= math.ceil(math.log(stats["map_calls"], 4)) + 2
+    assert stats["max_buffered"] <= summarizer.window + summarizer.fan_in * stats["depth"]
+    assert stats["map_calls"] + stats["reduce_calls"] == len(backend.prompts)
+    assert all(estimate_tokens(p) <= 512 for p in backend.prompts)
+
+
+def test_summarize_single_chunk():
+    """Test that a small collection needs a single map call."""
+    backend = CountingBackend()
+    summarizer = HierarchicalSummarizer(InferenceExecutor(backend), {})
+    assert summarizer.summarize(["- [web] tiny source"]) == "map summary 1"
+    assert summarizer.stats["reduce_calls"] == 0
+
+
+class VerboseBackend(CountingBackend):
+    """Backend whose summaries fill the whole output budget."""
+    
+    def generate(self, prompt, timeout=None):
+        super().generate(prompt, timeout)
+        return "r" * 1000
+
+
+def test_long_partial_summaries_are_all_merged():
+    """Test that summaries too long to pair up are shortened, not dropped."""
+    backend = VerboseBackend()
+    summarizer = HierarchicalSummarizer(InferenceExecutor(backend),
+                                        {"context_window": 256, "max_tokens": 64})
+    assert summarizer.merge(["a" * 300, "b" * 300, "c" * 300]) == "r" * 256
+    first = backend.prompts[0]
+    assert "a" * 100 in first and "b" * 100 in first
+    assert any("c" * 100 in prompt for prompt in backend.prompts)
+    assert all(estimate_tokens(p) <= 256 for p in backend.prompts)
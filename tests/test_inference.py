@@ -0,0 +1,146 @@
+"""
+Test suite for Muninn batched inference executor.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from muninn.inference import (InferenceExecutor, ModelBackend, OllamaBackend, TokenProgress,
+                              create_backend)
+from muninn.summarizer import IntelligenceSummarizer
+from stub_ollama import StubOllamaServer
+
+
+def test_create_backend():
+    """Test backend selection from config."""
+    assert create_backend({}) is None
+    backend = create_backend({"model_type": "ollama",
+                              "model": {"api_url": "http://localhost:11434", "name": "llama2"}})
+    assert isinstance(backend, OllamaBackend)
+    assert backend.model == "llama2"
+
+
+def test_executor_order_and_concurrency():
+    """Test ordered results with a bounded number of concurrent requests."""
+    with StubOllamaServer(delay=0.02) as server:
+        executor = InferenceExecutor(OllamaBackend(server.url), workers=3, batch_size=2)
+        prompts = ["x" * n for n in range(1, 13)]
+        results = executor.run(prompts)
+    
+    assert [r is not None for r in results] == [True] * 12
+    assert [f"Finding for" in r for r in results] == [True] * 12
+    assert [p["prompt"] for p in server.requests].count("x" * 5) == 1
+    assert 1 < server.max_active <= 3
+
+
+def test_executor_retries():
+    """Test that failed requests are retried."""
+    with StubOllamaServer(fail_first=2) as server:
+        executor = InferenceExecutor(OllamaBackend(server.url), workers=1, retries=2, backoff=0.01)
+        results = executor.run(["only prompt"])
+    
+    assert results[0] is not None
+    assert executor.stats["retries"] == 2
+
+
+def test_executor_timeout_and_circuit():
+    """Test per-request timeouts and fail-fast after repeated failures."""
+    with StubOllamaServer(delay=0.5) as server:
+        executor = InferenceExecutor(OllamaBackend(server.url), workers=1, timeout=0.05,
+                                     retries=0, max_consecutive_failures=2)
+        results = executor.run(["a", "b", "c", "d"])
+    
+    assert results == [None] * 4
+    assert executor.stats["requests"] == 2
+    assert executor.circuit_open
+
+
+def test_summarizer_with_backend():
+    """Test per-source analysis through the stub server."""
+    with StubOllamaServer() as server:
+        config = {"model_type": "ollama", "model": {"api_url": server.url},
+                  "performance": {"workers": 2, "batch_size": 2}}
+        analysis = IntelligenceSummarizer(config).analyze_sources(
+            [{"type": "web", "content": f"source {i}"} for i in range(5)])
+    
+    assert analysis["themes"] == ["stub"]
+    assert len(server.requests) == 5
+
+
+def test_connection_pool_reuse():
+    """Test that sequential requests share one keep-alive connection."""
+    with StubOllamaServer() as server:
+        backend = OllamaBackend(server.url, pool_size=2)
+        for _ in range(5):
+            backend.generate("prompt")
+        unpooled = OllamaBackend(server.url, pool_size=0)
+        for _ in range(5):
+            unpooled.generate("prompt")
+    
+    assert backend.pool.created == 1
+    assert unpooled.pool.created == 5
+
+
+def test_streaming_tokens():
+    """Test that tokens are delivered incrementally and the connection is reused."""
+    tokens = []
+    with StubOllamaServer() as server:
+        backend = OllamaBackend(server.url)
+        text = backend.generate_streaming("prompt", tokens.append)
+        assert backend.generate("prompt") == text
+    
+    assert len(tokens) > 1
+    assert "".join(tokens) == text
+    assert backend.pool.created == 1
+
+
+def test_progress_streams_executor_prompts(caplog):
+    """Test that progress reporting streams every completion through the executor."""
+    progress = TokenProgress(interval=0)
+    with StubOllamaServer() as server:
+        config = {"model": {"api_url": server.url}, "performance": {"progress": True}}
+        executor = InferenceExecutor.from_config(OllamaBackend(server.url), config)
+        executor.on_token = progress
+        with caplog.at_level("INFO", logger="muninn.inference"):
+            results = executor.run(["a", "b", "c"])
+    
+    assert all(request["stream"] for request in server.requests)
+    assert progress.chars == sum(len(r) for r in results) and progress.fragments > 3
+    assert "tokens streamed" in caplog.text
+    assert isinstance(InferenceExecutor.from_config(None, config).on_token, TokenProgress)
+    assert InferenceExecutor.from_config(None, {}).on_token is None
+
+
+class FlakyBackend(ModelBackend):
+    """Backend raising an unexpected error for one prompt."""
+    
+    name = "flaky"
+    
+    def generate(self, prompt, timeout=None):
+        if prompt == "bug":
+            raise RuntimeError("backend bug")
+        return f"done {prompt}"
+
+
+def test_executor_survives_failing_batches():
+    """Test that errors in the backend or on_batch fail only their batch."""
+    recorded = []
+    
+    def on_batch(batch):
+        if any(index == 4 for index, _ in batch):
+            raise OSError("disk full")
+        recorded.extend(index for index, _ in batch)
+    
+    executor = InferenceExecutor(FlakyBackend(), workers=1, batch_size=2, retries=0)
+    prompts = ["a", "b", "c", "bug", "d", "e"] + [f"p{i}" for i in range(20)]
+    results = executor.run(prompts, on_batch=on_batch)
+    
+    assert results[:6] == ["done a", "done b", None, None, None, None]
+    assert results[6:] == [f"done p{i}" for i in range(20)]
+    assert recorded == [0, 1] + list(range(6, 26))
+    assert executor.stats["failures"] == 4
@@ -0,0 +1,77 @@
+"""
+Test suite for Muninn pipeline instrumentation.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn import analyze
+from muninn.analyze import analyze_data
+from muninn.metrics import PipelineMetrics
+
+
+def _write_collection(path, count=20):
+    sources = [{"type": "web", "url": f"https://example.com/{i}", "content": f"source {i} content"}
+               for i in range(count)]
+    path.write_text(json.dumps({"collection_id": "c1", "sources": sources}))
+
+
+def test_stage_records_time_and_memory():
+    """Test that stages record timings, RSS and tracemalloc statistics."""
+    metrics = PipelineMetrics(trace_memory=True)
+    with metrics.stage("build"):
+        data = [bytes(1024) for _ in range(1000)]
+    metrics.count("sources", 1000)
+    metrics.add_inference({"seconds": 2.0, "prompt_tokens": 300, "completion_tokens": 100})
+    metrics.close()
+    
+    result = metrics.to_dict()
+    build = result["stages"][0]
+    assert build["name"] == "build"
+    assert build["wall_seconds"] >= 0 and build["cpu_seconds"] >= 0
+    assert build["traced_peak_bytes"] >= 1000 * 1024
+    assert build["top_allocations"]
+    assert result["totals"]["tokens_per_second"] == 200
+    assert result["totals"]["sources_per_second"] > 0
+    assert len(data) == 1000
+
+
+def test_analyze_writes_metrics_and_appendix(tmp_path):
+    """Test the metrics file and the optional report appendix."""
+    input_path, output_path = tmp_path / "c1.json", tmp_path / "report.md"
+    _write_collection(input_path)
+    config = {"report": {"include_metrics": True}}
+    assert analyze_data(str(input_path), str(output_path), config)
+    
+    metrics = json.loads((tmp_path / "report.metrics.json").read_text())
+    stages = [stage["name"] for stage in metrics["stages"]]
+    assert stages[:3] == ["load", "deduplicate", "analyze"]
+    assert stages[-1] == "report"
+    assert metrics["counters"]["sources"] == 20
+    
+    report = output_path.read_text(encoding="utf-8")
+    assert "## Appendix: Pipeline Metrics" in report
+    assert "| load |" in report
+    
+    assert analyze_data(str(input_path), str(output_path), {})
+    assert "Pipeline Metrics" not in output_path.read_text(encoding="utf-8")
+
+
+def test_profile_flag_writes_stats(tmp_path, monkeypatch):
+    """Test that --profile dumps cProfile statistics."""
+    input_path = tmp_path / "c1.json"
+    _write_collection(input_path)
+    profile = tmp_path / "run.prof"
+    monkeypatch.setattr(sys, "argv", ["muninn", "-i", str(input_path), "-o", str(tmp_path / "r.md"),
+                                      "-c", str(tmp_path / "missing.yaml"), "--profile", str(profile)])
+    with pytest.raises(SystemExit) as exit_info:
+        analyze.main()
+    assert exit_info.value.code == 0
+    assert profile.stat().st_size > 0
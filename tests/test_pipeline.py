@@ -0,0 +1,202 @@
+"""
+Test suite for the Muninn asynchronous analysis pipeline.
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.analyze import analyze_data, load_config
+from muninn.data_loader import HuginDataLoader
+from muninn.dedup import Deduplicator, deduplicate_sources
+from muninn.entities import EntityExtractor
+from muninn.metrics import PipelineMetrics
+from muninn.pipeline import AnalysisPipeline, chunked, run_pipeline
+from muninn.schema import SchemaError
+from muninn.summarizer import IntelligenceSummarizer, summarize_findings
+
+PERFORMANCE = {"metrics": False, "checkpoint": False, "enable_cache": False,
+               "queue_size": 1, "pipeline_chunk_size": 3}
+
+
+def _sources(count):
+    """Sources where every fifth one repeats the URL of the one before."""
+    return [{"type": "web", "url": f"https://example.com/{i - (i % 5 == 4)}",
+             "content": f"Report {i} mentions 10.0.{i}.1 and CVE-2024-{1000 + i}"}
+            for i in range(count)]
+
+
+def _write(path, sources):
+    path.write_text(json.dumps({"collection_id": "c1", "sources": sources}), encoding="utf-8")
+    return str(path)
+
+
+def test_chunked_and_streaming_dedup():
+    """Test that deduplicating chunk by chunk keeps the same sources as one batch."""
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+    sources = _sources(40)
+    deduplicator = Deduplicator()
+    kept = [source for chunk in chunked(sources, 7) for source in deduplicator.add(chunk)]
+    assert kept == deduplicator.finish() == deduplicate_sources(sources)
+    assert len(kept) == 32
+
+
+def test_pipeline_matches_sequential_stages(tmp_path):
+    """Test that the concurrent pipeline produces the sequential results."""
+    input_path = _write(tmp_path / "c1.json", _sources(40))
+    config = {"analysis": {"entity_extraction": True},
+              "performance": dict(PERFORMANCE, entity_index=str(tmp_path / "entities.sqlite3"))}
+    data, results = run_pipeline(input_path, str(tmp_path / "report.md"), config)
+
+    expected = summarize_findings(deduplicate_sources(_sources(40)), config)
+    assert len(data["sources"]) == 32 and data["collection_id"] == "c1"
+    for key in ("analysis", "summary", "key_findings", "themes", "recommendations"):
+        assert results[key] == expected[key]
+    assert results["entities"][0] == "10.0.0.1 (ipv4, 1 source)"
+    assert (tmp_path / "report.md").exists()
+
+
+def test_shipped_config_with_cache(tmp_path):
+    """Test a run with config/config.yaml, whose cache is shared by the stage threads."""
+    config = load_config(str(Path(__file__).parent.parent / "config" / "config.yaml"))
+    performance = config["performance"]
+    assert performance["enable_cache"]
+    for key in ("cache_dir", "checkpoint_dir", "state_dir", "embedding_dir"):
+        performance[key] = str(tmp_path / key)
+    performance["entity_index"] = str(tmp_path / "entities.sqlite3")
+    # No model server in the tests: the cache is opened but stays empty
+    config["model"]["api_url"] = ""
+    input_path = _write(tmp_path / "c1.json", _sources(20))
+
+    for run in range(2):
+        output = tmp_path / f"report{run}.md"
+        assert analyze_data(input_path, str(output), config)
+        assert "## Executive Summary" in output.read_text(encoding="utf-8")
+    assert (tmp_path / "cache_dir" / "analysis_cache.sqlite3").exists()
+
+
+def test_model_starts_while_sources_load(tmp_path, monkeypatch):
+    """Test that per-source analysis overlaps loading when nothing is prioritized."""
+    produced = []
+    started = []
+
+    def slow_sources(self):
+        self.header = {"collection_id": "c1"}
+        for source in _sources(60):
+            time.sleep(0.002)
+            produced.append(source)
+            yield source
+
+    analyze_batch = IntelligenceSummarizer.analyze_batch
+
+    def tracking(self, sources):
+        started.append(len(produced))
+        return analyze_batch(self, sources)
+
+    monkeypatch.setattr(HuginDataLoader, "iter_sources", slow_sources)
+    monkeypatch.setattr(IntelligenceSummarizer, "analyze_batch", tracking)
+    metrics = PipelineMetrics()
+    data, results = run_pipeline(str(tmp_path / "c1.json"), str(tmp_path / "report.md"),
+                                 {"performance": PERFORMANCE}, metrics)
+    assert started[0] < 60 and results["analysis"]["total_sources"] == len(data["sources"])
+    stages = {stage["name"]: stage for stage in metrics.to_dict()["stages"]}
+    load = stages["load"]
+    assert stages["analyze"]["start_seconds"] < load["start_seconds"] + load["wall_seconds"]
+
+
+def test_bounded_queues_apply_backpressure(tmp_path, monkeypatch):
+    """Test that a slow stage holds the loader back instead of buffering everything."""
+    produced = []
+    ahead = []
+    extract = EntityExtractor.extract
+
+    def counting_sources(self):
+        self.header = {"collection_id": "c1"}
+        for i in range(120):
+            produced.append(i)
+            yield {"type": "web", "url": f"https://example.com/{i}", "content": f"Source {i}"}
+
+    def slow_extract(self, sources):
+        time.sleep(0.01)
+        ahead.append(len(produced))
+        return extract(self, sources)
+
+    monkeypatch.setattr(HuginDataLoader, "iter_sources", counting_sources)
+    monkeypatch.setattr(EntityExtractor, "extract", slow_extract)
+    config = {"analysis": {"entity_extraction": True},
+              "performance": dict(PERFORMANCE, entity_index=str(tmp_path / "entities.sqlite3"))}
+    run_pipeline(str(tmp_path / "c1.json"), str(tmp_path / "report.md"), config)
+    # Chunks of 3 with one-chunk queues: a few chunks in flight at most
+    assert len(ahead) == 40
+    assert all(count - 3 * (i + 1) <= 3 * 8 for i, count in enumerate(ahead))
+
+
+def test_entity_workers_start_one_pool(tmp_path, monkeypatch):
+    """Test that chunked extraction in the pipeline uses one pool of entity_workers."""
+    from muninn import entities
+    pools = []
+    
+    class RecordingPool(entities.ProcessPoolExecutor):
+        def __init__(self, max_workers=None):
+            pools.append(max_workers)
+            super().__init__(max_workers=max_workers)
+    
+    monkeypatch.setattr(entities, "ProcessPoolExecutor", RecordingPool)
+    input_path = _write(tmp_path / "c1.json", _sources(entities.MIN_PARALLEL_SOURCES + 500))
+    config = {"analysis": {"entity_extraction": True},
+              "performance": dict(PERFORMANCE, pipeline_chunk_size=1000, queue_size=2,
+                                  entity_workers=2,
+                                  entity_index=str(tmp_path / "entities.sqlite3"))}
+    _, results = run_pipeline(input_path, str(tmp_path / "report.md"), config)
+    assert pools == [2]
+    assert results["entities"][0] == "10.0.0.1 (ipv4, 1 source)"
+
+
+def test_failing_stage_stops_pipeline(tmp_path, monkeypatch):
+    """Test that an error in one stage cancels the others instead of hanging."""
+    sources = _sources(30) + [{"url": "https://example.com/no-type"}] + _sources(30)
+    input_path = _write(tmp_path / "c1.json", sources)
+    config = {"data": {"invalid_sources": "strict"}, "performance": PERFORMANCE}
+    before = threading.active_count()
+    with pytest.raises(SchemaError):
+        run_pipeline(input_path, str(tmp_path / "report.md"), config)
+    assert threading.active_count() <= before
+    assert not (tmp_path / "report.md").exists()
+    assert not analyze_data(input_path, str(tmp_path / "report.md"), config)
+
+    # A downstream failure while the loader waits on a full queue
+    def broken_extract(self, sources):
+        raise RuntimeError("extractor crashed")
+
+    monkeypatch.setattr(EntityExtractor, "extract", broken_extract)
+    config = {"analysis": {"entity_extraction": True}, "performance": PERFORMANCE}
+    with pytest.raises(RuntimeError, match="extractor crashed"):
+        run_pipeline(_write(tmp_path / "c2.json", _sources(300)), str(tmp_path / "r2.md"), config)
+
+
+def test_custom_executor(tmp_path):
+    """Test that CPU stages run on a supplied executor, which is left open."""
+    input_path = _write(tmp_path / "c1.json", _sources(20))
+    names = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            names.append(getattr(fn, "__name__", ""))
+            return super().submit(fn, *args, **kwargs)
+
+    with RecordingExecutor(1) as executor:
+        pipeline = AnalysisPipeline({"performance": PERFORMANCE}, executor=executor)
+        data, _ = pipeline.run(input_path, str(tmp_path / "report.md"))
+        assert "add" in names and "aggregate_sources" in names
+        assert executor.submit(len, data["sources"]).result() == 16
@@ -0,0 +1,86 @@
+"""
+Test suite for Muninn source prioritization stage.
+"""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.priority import SourcePrioritizer, parse_timestamp, prioritize_sources
+
+NOW = datetime(2025, 10, 31, 12, 0, tzinfo=timezone.utc)
+
+
+def source(index, relevance=None, likes=None, timestamp="2025-10-31T11:00:00Z", kind="web"):
+    metadata = {}
+    if relevance is not None:
+        metadata["relevance_score"] = relevance
+    if likes is not None:
+        metadata["engagement"] = {"likes": likes, "retweets": likes // 10}
+    return {"type": kind, "url": f"https://example.com/{index}", "content": f"Source {index}",
+            "timestamp": timestamp, "metadata": metadata}
+
+
+def test_parse_timestamp():
+    """Test ISO 8601 parsing with and without time zones."""
+    assert parse_timestamp("2025-10-31T11:00:00Z") == datetime(2025, 10, 31, 11, tzinfo=timezone.utc)
+    assert parse_timestamp("2025-10-31T11:00:00").tzinfo is timezone.utc
+    assert parse_timestamp("yesterday") is None
+    assert parse_timestamp(None) is None
+
+
+def test_score_components():
+    """Test that each component raises the score."""
+    prioritizer = SourcePrioritizer(reference_time=NOW)
+    base = prioritizer.score(source(0, relevance=0.5))
+    assert prioritizer.score(source(0, relevance=0.9)) > base
+    assert prioritizer.score(source(0, relevance=0.5, likes=500)) > base
+    assert prioritizer.score(source(0, relevance=0.5, timestamp="2025-10-20T00:00:00Z")) < base
+    assert prioritizer.score(source(0, relevance=0.5, kind="social")) < base
+    assert 0.0 <= prioritizer.score(source(0, relevance=1.0, likes=10 ** 9)) <= 1.0
+
+
+def test_top_k_keeps_original_order():
+    """Test that the K best sources are kept in input order."""
+    sources = [source(i, relevance=r) for i, r in enumerate([0.2, 0.9, 0.5, 0.8, 0.1, 0.7])]
+    selected = prioritize_sources(iter(sources), {"max_sources": 3}, NOW)
+
+    assert [s["url"] for s in selected] == [sources[i]["url"] for i in (1, 3, 5)]
+    assert all("priority_score" in s["metadata"] for s in selected)
+    assert "priority_score" not in sources[1]["metadata"]
+
+
+def test_ties_prefer_earlier_sources():
+    """Test that equal scores keep the earliest sources."""
+    sources = [source(i, relevance=0.5) for i in range(5)]
+    selected = prioritize_sources(sources, {"max_sources": 2}, NOW)
+    assert [s["url"] for s in selected] == [sources[0]["url"], sources[1]["url"]]
+
+
+def test_threshold_and_token_budget():
+    """Test the relevance threshold and the prompt token budget."""
+    sources = [source(i, relevance=r) for i, r in enumerate([0.3, 0.9, 0.8, 0.7])]
+    sources.append(source(4))  # no relevance score: never below the threshold
+
+    prioritizer = SourcePrioritizer({"confidence_threshold": 0.6}, NOW)
+    assert len(prioritizer.select(sources)) == 4
+    assert prioritizer.stats["below_threshold"] == 1
+
+    one = SourcePrioritizer({"token_budget": 1}, NOW)
+    assert one.select(sources) == []
+    per_source = SourcePrioritizer({"token_budget": 10 ** 6}, NOW)
+    per_source.select(sources[1:2])
+    budget = SourcePrioritizer({"token_budget": per_source.stats["tokens"] * 2}, NOW)
+    selected = budget.select(sources)
+    assert [s["url"] for s in selected] == [sources[1]["url"], sources[2]["url"]]
+    assert budget.stats["over_budget"] == 3
+
+
+def test_disabled_without_limits():
+    """Test that no limits means the stage is skipped."""
+    assert not SourcePrioritizer({}).enabled
+    assert SourcePrioritizer({"max_sources": 10}).enabled
@@ -0,0 +1,152 @@
+"""
+Test suite for Muninn report generation.
+"""
+
+import json
+import os
+import stat
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.report_generator import ReportGenerator, generate_report, normalize_formats
+from muninn.templates import TemplateError, compile_template, get_template
+
+
+ANALYSIS = {"summary": "Summary", "key_findings": ["Finding"], "themes": ["Theme"],
+            "recommendations": ["Act"], "total_sources": 2}
+
+
+def _sources(count):
+    for i in range(count):
+        yield {"type": "web", "url": f"https://example.com/{i}", "timestamp": "2025-10-31T11:30:00Z"}
+
+
+def test_streamed_report_matches_generate(tmp_path):
+    """Test that the streamed file equals the in-memory report."""
+    data = {"collection_id": "c1", "sources": list(_sources(2))}
+    generator = ReportGenerator()
+    output = tmp_path / "out" / "report.md"
+    generator.write(data, ANALYSIS, str(output))
+    
+    expected = generator.generate(data, ANALYSIS)
+    # Only the generation timestamp may differ
+    strip = lambda text: [l for l in text.splitlines() if not l.startswith("**Generated:**")]
+    assert strip(output.read_text(encoding="utf-8")) == strip(expected)
+    assert "2. **Web**: https://example.com/1" in expected
+    assert "*No sources available.*" in generator.generate({"sources": []}, {})
+
+
+def test_failed_write_keeps_previous_report(tmp_path):
+    """Test that an interrupted write leaves the old report and no temp file."""
+    output = tmp_path / "report.md"
+    output.write_text("previous", encoding="utf-8")
+    
+    def broken():
+        yield from _sources(3)
+        raise RuntimeError("source stream failed")
+    
+    with pytest.raises(RuntimeError):
+        generate_report({"sources": broken()}, ANALYSIS, str(output))
+    assert output.read_text(encoding="utf-8") == "previous"
+    assert [p.name for p in tmp_path.iterdir()] == ["report.md"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_report_file_mode(tmp_path):
+    """Test that reports get the umask mode of new files, or keep the old file's mode."""
+    mode = lambda path: stat.S_IMODE(path.stat().st_mode)
+    previous = os.umask(0o022)
+    try:
+        output = tmp_path / "report.md"
+        generate_report({"sources": []}, ANALYSIS, str(output))
+        assert mode(output) == 0o644
+        output.chmod(0o640)
+        generate_report({"sources": []}, ANALYSIS, str(output))
+        assert mode(output) == 0o640
+    finally:
+        os.umask(previous)
+
+
+def test_streaming_memory_is_flat(tmp_path):
+    """Test that peak memory does not grow with the number of sources."""
+    def peak(count):
+        tracemalloc.start()
+        generate_report({"sources": _sources(count)}, ANALYSIS, str(tmp_path / f"{count}.md"))
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+    
+    small, large = peak(1_000), peak(50_000)
+    assert large < small * 2 + 256 * 1024
+    assert "50000. **Web**" in (tmp_path / "50000.md").read_text(encoding="utf-8")
+
+
+def test_templates_are_compiled_once_and_honor_flags(tmp_path):
+    """Test template caching, include flags and custom template files."""
+    assert get_template("executive") is get_template("executive")
+    
+    data = {"collection_id": "c1", "sources": list(_sources(2))}
+    report = ReportGenerator({"include_sources": False, "include_key_findings": False}).generate(data, ANALYSIS)
+    assert "## Sources and References" not in report
+    assert "## Key Findings" not in report
+    assert "## Recommendations" in report
+    assert "## Entities" in ReportGenerator({"template": "detailed"}).generate(data, ANALYSIS)
+    
+    custom = tmp_path / "brief.md"
+    custom.write_text("# Brief {{ collection_id }} ({{ source_count }} sources)\n\n{{ key_findings }}\n")
+    report = ReportGenerator({"template": str(custom)}).generate(data, ANALYSIS)
+    assert report == "# Brief c1 (2 sources)\n\n## Key Findings\n\n- Finding"
+    
+    with pytest.raises(TemplateError):
+        compile_template("{{ nonexistent }}")
+    with pytest.raises(TemplateError):
+        ReportGenerator({"template": "missing"})
+
+
+def test_write_templates_shares_sections(tmp_path, monkeypatch):
+    """Test that sections shared by several templates are rendered once."""
+    calls = []
+    original = ReportGenerator._generate_key_findings
+    
+    def counting(self, analysis):
+        calls.append(1)
+        return original(self, analysis)
+    
+    monkeypatch.setattr(ReportGenerator, "_generate_key_findings", counting)
+    outputs = {name: str(tmp_path / f"{name}.md") for name in ("default", "detailed", "executive")}
+    ReportGenerator().write_templates({"sources": list(_sources(2))}, ANALYSIS, outputs)
+    
+    assert len(calls) == 1
+    generated = {Path(path).read_text(encoding="utf-8").splitlines()[2] for path in outputs.values()}
+    assert len(generated) == 1
+
+
+def test_multi_format_output(tmp_path):
+    """Test that one call writes Markdown, HTML and JSON from the same analysis."""
+    data = {"collection_id": "c1", "sources": _sources(3)}
+    outputs = generate_report(data, ANALYSIS, str(tmp_path / "report.md"),
+                              {"format": ["markdown", "html", "json"]})
+    assert outputs == {"markdown": str(tmp_path / "report.md"),
+                       "html": str(tmp_path / "report.html"),
+                       "json": str(tmp_path / "report.json")}
+    
+    markdown = (tmp_path / "report.md").read_text(encoding="utf-8")
+    page = (tmp_path / "report.html").read_text(encoding="utf-8")
+    payload = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    
+    assert "3. **Web**: https://example.com/2" in markdown
+    assert "<h2>Key Findings</h2>\n<ul>\n<li>Finding</li>\n</ul>" in page
+    assert page.count("<li><strong>Web</strong>") == 3
+    assert payload["key_findings"] == ["Finding"]
+    assert len(payload["sources"]) == 3
+    assert payload["generated"] in markdown
+    
+    with pytest.raises(ValueError):
+        normalize_formats("pdf")
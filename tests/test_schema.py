@@ -0,0 +1,107 @@
+"""
+Test suite for Muninn schema validation.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.data_loader import EXAMPLE_HUGINN_DATA, HuginDataLoader, load_huginn_data
+from muninn.schema import SchemaError, SchemaValidator, get_validator
+
+INVALID_SOURCES = [
+    {"url": "https://example.com/no-type", "content": "Missing type"},
+    {"type": "web", "url": "ftp://example.com/file", "timestamp": "yesterday"},
+    {"type": "social", "title": "No url or content",
+     "metadata": {"relevance_score": 1.5, "tags": ["ok", 3]}},
+    ["not", "an", "object"],
+]
+
+
+def write_collection(path, sources):
+    path.write_text(json.dumps(dict(EXAMPLE_HUGINN_DATA, sources=sources)), encoding="utf-8")
+    return str(path)
+
+
+def test_example_sources_are_valid():
+    """Test that the documented example collection passes validation."""
+    validate = get_validator("1.0")
+    for source in EXAMPLE_HUGINN_DATA["sources"]:
+        assert validate(source) == []
+
+
+def test_validator_is_compiled_once():
+    """Test that validators are cached per schema version."""
+    assert get_validator("1.0") is get_validator("1.0")
+    with pytest.raises(SchemaError):
+        get_validator("9.9")
+
+
+def test_field_errors():
+    """Test the reported errors of malformed sources."""
+    validate = get_validator()
+    assert validate(INVALID_SOURCES[0]) == [("type", "is required")]
+    assert [field for field, _ in validate(INVALID_SOURCES[1])] == ["url", "timestamp"]
+    assert [field for field, _ in validate(INVALID_SOURCES[2])] == [
+        "metadata.tags", "metadata.relevance_score", "url|content"]
+    assert validate(INVALID_SOURCES[3]) == [("$", "must be an object")]
+    assert validate({"type": "web", "content": "x", "metadata": {"relevance_score": True}}) == [
+        ("metadata.relevance_score", "must be number")]
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_streaming_load_quarantines_invalid(tmp_path, suffix):
+    """Test that invalid sources are dropped, counted and quarantined while loading."""
+    # Non-object JSON Lines records are already rejected as malformed lines
+    sources = EXAMPLE_HUGINN_DATA["sources"] + INVALID_SOURCES[:3]
+    path = tmp_path / f"collection{suffix}"
+    if suffix == ".jsonl":
+        path.write_text("".join(json.dumps(s) + "\n" for s in sources), encoding="utf-8")
+    else:
+        write_collection(path, sources)
+    quarantine = tmp_path / "quarantine.jsonl"
+    validator = SchemaValidator("1.0", "quarantine", str(quarantine))
+
+    loader = HuginDataLoader(str(path), validator=validator, workers=1)
+    streamed = list(loader.iter_sources())
+
+    assert streamed == EXAMPLE_HUGINN_DATA["sources"]
+    summary = loader.metadata["validation"]
+    assert summary["valid"] == 2 and summary["invalid"] == 3
+    assert summary["field_errors"]["type"] == 1
+    assert summary["field_errors"]["url"] == 1
+    records = [json.loads(line) for line in quarantine.read_text(encoding="utf-8").splitlines()]
+    assert [record["index"] for record in records] == [2, 3, 4]
+    assert records[0]["errors"] == ["type is required"]
+
+
+def test_load_rejects_and_strict_mode(tmp_path):
+    """Test full loads in reject and strict mode."""
+    path = write_collection(tmp_path / "collection.json",
+                            EXAMPLE_HUGINN_DATA["sources"] + INVALID_SOURCES[:1])
+
+    data = load_huginn_data(path, validator=SchemaValidator(mode="reject"))
+    assert len(data["sources"]) == 2
+    assert data["metadata"]["validation"]["invalid"] == 1
+    assert not list(tmp_path.glob("*quarantine*"))
+
+    with pytest.raises(SchemaError, match="type is required"):
+        load_huginn_data(path, validator=SchemaValidator(mode="strict"))
+
+
+def test_from_config():
+    """Test building the validator from the configuration."""
+    assert SchemaValidator.from_config({"data": {"validate_schema": False}}) is None
+    validator = SchemaValidator.from_config({
+        "data": {"invalid_sources": "reject"},
+        "integration": {"huginn": {"expected_schema_version": 1.0}},
+    })
+    assert validator.version == "1.0" and validator.mode == "reject"
+    with pytest.raises(SchemaError):
+        SchemaValidator(mode="ignore")
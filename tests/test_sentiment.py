@@ -0,0 +1,134 @@
+"""
+Test suite for Muninn sentiment scoring.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+np = pytest.importorskip("numpy")
+
+from muninn.report_generator import ReportGenerator
+from muninn.sentiment import (Lexicon, SentimentScorer, aggregate, analyze_sentiment,
+                              load_lexicon)
+
+SOURCES = [
+    {"type": "social", "platform": "twitter", "content": "Great work, the outage is fixed!",
+     "metadata": {"author": "@ops"}},
+    {"type": "social", "platform": "twitter", "content": "This breach is not good. Very bad.",
+     "metadata": {"author": "@ops"}},
+    {"type": "social", "platform": "reddit", "content": "Nothing to report today",
+     "metadata": {"author": "@quiet"}},
+    {"type": "web", "title": "Ransomware attack", "content": "Victims lost data in the attack."},
+]
+
+
+class StubExecutor:
+    """Executor answering every prompt with the same label."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.prompts = []
+
+    def run(self, prompts):
+        prompts = list(prompts)
+        self.prompts.extend(prompts)
+        return [self.answer] * len(prompts)
+
+
+def test_negation_and_boosters():
+    """Test that negators flip and boosters amplify the following words."""
+    lexicon = Lexicon()
+    compound, positive, negative = lexicon.score(
+        ["good", "not good", "not a very good idea", "very bad", "bad", ""])
+    assert compound[0] > 0 > compound[1]
+    assert compound[2] < 0
+    assert compound[3] < compound[4] < 0
+    assert compound[5] == 0
+    assert positive.tolist() == [1, 0, 0, 0, 0, 0]
+    assert negative.tolist() == [0, 1, 1, 1, 1, 0]
+    assert np.all(np.abs(compound) < 1)
+
+
+def test_tokens_match_word_tokenization():
+    """Test that byte-level tokenization finds the same words as a regex."""
+    lexicon = Lexicon()
+    texts = ["Don't PANIC: it's not a 'breach'... very,very bad", "café-good naïve bad",
+             "scams\nscam", "", "no"]
+    positions, docs, ids = lexicon.tokens(texts)
+    expected = [(doc, lexicon.vocabulary[word]) for doc, text in enumerate(texts)
+                for word in re.findall(r"[a-z]+(?:'[a-z]+)*", text.lower())
+                if word in lexicon.vocabulary]
+    assert list(zip(docs.tolist(), ids.tolist())) == expected
+
+
+def test_custom_lexicon(tmp_path):
+    """Test loading extra lexicon entries from a file."""
+    path = tmp_path / "lexicon.txt"
+    path.write_text("# extra words\nsmishing -2.0\nkudos 2.5\n", encoding="utf-8")
+    entries = load_lexicon(str(path))
+    assert entries == {"smishing": -2.0, "kudos": 2.5}
+    compound, _, _ = Lexicon(entries).score(["kudos", "smishing", "good"])
+    assert compound[0] > 0 > compound[1] and compound[2] == 0
+
+    path.write_text("kudos\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_lexicon(str(path))
+
+
+def test_parallel_scoring_matches_serial():
+    """Test that the process pool returns the same scores in order."""
+    sources = SOURCES * 50
+    serial = SentimentScorer(workers=1).score(sources)
+    parallel = SentimentScorer(workers=2, min_parallel=1).score(sources)
+    for key in serial:
+        assert np.array_equal(serial[key], parallel[key])
+
+
+def test_aggregate():
+    """Test per-group means and label counts."""
+    compound = np.array([0.5, -0.5, 0.0, 0.3])
+    groups = aggregate(compound, ["a", "a", None, "b"])
+    assert groups == [
+        {"name": "a", "sources": 2, "mean": 0.0, "positive": 1, "neutral": 0, "negative": 1},
+        {"name": "b", "sources": 1, "mean": 0.3, "positive": 1, "neutral": 0, "negative": 0},
+    ]
+    assert aggregate(compound, [None] * 4) == []
+
+
+def test_analyze_sentiment_groups():
+    """Test the platform, author and theme aggregates."""
+    themes = [{"label": "outage, fixed", "name": "Outages", "sources": [0, 1]}]
+    result = analyze_sentiment(SOURCES, themes=themes)
+    assert result["sources"] == 4
+    assert result["distribution"] == {"positive": 1, "neutral": 1, "negative": 2}
+    assert [group["name"] for group in result["by_platform"]] == ["twitter", "reddit", "web"]
+    assert result["by_author"][0]["name"] == "@ops" and result["by_author"][0]["sources"] == 2
+    assert result["by_theme"][0]["name"] == "Outages"
+
+
+def test_ambiguous_sources_go_to_model():
+    """Test that only mixed, near-neutral sources are sent to the model."""
+    sources = [{"content": "good news and bad news"}, {"content": "great"}]
+    executor = StubExecutor("Negative.")
+    result = analyze_sentiment(sources, executor=executor)
+    assert result["ambiguous"] == 1 and result["model_scored"] == 1
+    assert len(executor.prompts) == 1 and "good news and bad news" in executor.prompts[0]
+    assert result["distribution"] == {"positive": 1, "neutral": 0, "negative": 1}
+
+
+def test_sentiment_report_section():
+    """Test the rendered Sentiment section."""
+    generator = ReportGenerator({"include_sentiment": True})
+    section = generator._generate_sentiment({"sentiment": analyze_sentiment(SOURCES)})
+    assert section.startswith("## Sentiment")
+    assert "across 4 sources: 1 positive, 1 neutral, 2 negative." in section
+    assert "| Platform | Sources | Mean | Positive | Neutral | Negative |" in section
+    assert "| @ops | 2 |" in section
+    assert "No sentiment scores" in generator._generate_sentiment({})
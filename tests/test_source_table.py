@@ -0,0 +1,80 @@
+"""
+Test suite for Muninn columnar source storage.
+"""
+
+import math
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.data_loader import EXAMPLE_HUGINN_DATA, load_huginn_data
+from muninn.report_generator import ReportGenerator
+from muninn.source_table import SourceTable
+from muninn.summarizer import IntelligenceSummarizer
+
+SAMPLE_FILE = Path(__file__).parent.parent / "data" / "input" / "sample_huginn_output.json"
+
+
+def test_rows_round_trip():
+    """Test that rows compare equal to the original source dictionaries."""
+    sources = EXAMPLE_HUGINN_DATA["sources"] + [
+        {"type": "web", "url": "", "timestamp": "yesterday", "extra": [1, 2]},
+        {"type": None, "metadata": {"relevance_score": 1}},
+    ]
+    table = SourceTable(sources)
+    
+    assert len(table) == len(sources)
+    for row, source in zip(table, sources):
+        assert dict(row) == source
+    assert table[-1]["type"] is None
+    assert table[0].get("platform") is None
+
+
+def test_extra_fields_decoded_once_per_row(monkeypatch):
+    """Test that a row view decodes its JSON fields once, however often it is read."""
+    table = SourceTable(EXAMPLE_HUGINN_DATA["sources"])
+    decoded = []
+    extra = SourceTable._extra
+    
+    def counting(self, index):
+        decoded.append(index)
+        return extra(self, index)
+    
+    monkeypatch.setattr(SourceTable, "_extra", counting)
+    row = table[1]
+    assert len(row) == 6 and row["metadata"]["engagement"]["likes"] == 42
+    row["metadata"]["author"] = "changed"
+    assert dict(row) == EXAMPLE_HUGINN_DATA["sources"][1]
+    assert decoded == [1]
+
+
+def test_columns_and_interning():
+    """Test array-backed columns and interned string codes."""
+    table = SourceTable([
+        {"type": "social", "platform": "twitter", "timestamp": "2025-10-31T10:15:00Z",
+         "metadata": {"author": "@a", "relevance_score": 0.5}},
+        {"type": "social", "platform": "twitter", "metadata": {"author": "@a"}},
+    ])
+    
+    assert table.column("type") == ["social", "social"]
+    assert table.column("author") == ["@a", "@a"]
+    assert len(table._strings) == 3
+    assert table.relevance_scores[0] == 0.5
+    assert math.isnan(table.relevance_scores[1])
+    assert math.isnan(table.timestamps[1])
+
+
+def test_table_with_summarizer_and_report():
+    """Test that existing consumers accept a table-backed collection."""
+    data = load_huginn_data(str(SAMPLE_FILE), as_table=True)
+    assert isinstance(data["sources"], SourceTable)
+    
+    analysis = IntelligenceSummarizer().analyze_sources(data["sources"])
+    assert analysis["total_sources"] == 3
+    
+    report = ReportGenerator().generate(data, {"summary": "Test"})
+    assert "https://example.com/blog/post" in report
+    assert "3 OSINT sources" in report
@@ -0,0 +1,68 @@
+"""
+Startup-time regression tests for the Muninn package and CLI.
+
+Each check runs in a fresh interpreter so previously imported modules do
+not hide slow imports.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+# Modules that must not be loaded just to import the package or show --help
+HEAVY_MODULES = ("numpy", "yaml", "sqlite3", "asyncio", "http.client",
+                 "concurrent.futures", "muninn.summarizer", "muninn.report_generator",
+                 "muninn.data_loader", "muninn.inference", "muninn.themes")
+
+# Generous bound on the import time of the package itself, in microseconds
+MAX_IMPORT_US = 50_000
+
+
+def _run(code):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=str(src_path), check=True)
+    return result.stdout, result.stderr
+
+
+def test_package_import_is_lazy():
+    """Test that importing the package loads no pipeline modules."""
+    stdout, stderr = _run("import sys, json, muninn; print(json.dumps(sorted(sys.modules)))")
+    loaded = set(json.loads(stdout))
+    assert not loaded & set(HEAVY_MODULES)
+    
+    cumulative = [int(line.split("|")[1]) for line in stderr.splitlines()
+                  if line.rstrip().endswith("| muninn")]
+    assert cumulative and cumulative[0] < MAX_IMPORT_US
+
+
+def test_cli_help_is_lazy():
+    """Test that the CLI parser can run without loading the pipeline."""
+    stdout, _ = _run("import sys, json\n"
+                     "sys.argv = ['muninn', '--help']\n"
+                     "from muninn import analyze\n"
+                     "try:\n"
+                     "    analyze.main()\n"
+                     "except SystemExit:\n"
+                     "    pass\n"
+                     "print('MODULES', json.dumps(sorted(sys.modules)))")
+    assert "--profile" in stdout
+    loaded = set(json.loads(stdout.split("MODULES", 1)[1]))
+    assert not loaded & set(HEAVY_MODULES)
+
+
+def test_lazy_attributes_resolve():
+    """Test that public functions load on first access."""
+    import muninn
+    from muninn.report_generator import generate_report
+    
+    assert muninn.generate_report is generate_report
+    assert "analyze_data" in dir(muninn)
+    with pytest.raises(AttributeError):
+        muninn.not_a_function
@@ -0,0 +1,118 @@
+"""
+Test suite for Muninn incremental analysis state.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.analyze import analyze_data
+from muninn.pipeline import run_pipeline
+from muninn.state import AnalysisState
+from muninn.summarizer import IntelligenceSummarizer
+
+
+def _source(idx, content=None):
+    return {"type": "web", "url": f"https://example.com/{idx}",
+            "content": content or f"ransomware report number {idx} lockbit extortion",
+            "timestamp": "2025-10-31T11:30:00Z"}
+
+
+def test_delta_and_merge(tmp_path):
+    """Test that only new or changed sources are selected and merged."""
+    state = AnalysisState(str(tmp_path))
+    first = [_source(1), _source(2)]
+    delta = state.delta(first)
+    assert len(delta) == 2
+    state.merge(delta, [{"findings": ["A"], "entities": []}, {"findings": ["A", "B"], "entities": []}],
+                "c1")
+    state.save()
+    
+    state = AnalysisState.load(str(tmp_path))
+    second = [_source(1), _source(2, "rewritten content"), _source(3)]
+    delta = state.delta(second)
+    assert [key for key, _ in delta] == ["https://example.com/2", "https://example.com/3"]
+    
+    state.merge(delta, [{"findings": ["C"], "entities": []}, {"findings": ["A"], "entities": []}], "c2")
+    assert state.findings == {"A": 2, "C": 1}
+    assert state.collections == ["c1", "c2"]
+    assert state.to_analysis()["key_findings"] == ["A", "C"]
+
+
+def test_incremental_runs_only_analyze_delta(tmp_path, monkeypatch):
+    """Test that a second overlapping collection only analyzes its delta."""
+    analyzed = []
+    original = IntelligenceSummarizer.analyze_batch
+    
+    def tracking(self, sources, *args):
+        analyzed.append(len(sources))
+        return original(self, sources, *args)
+    
+    monkeypatch.setattr(IntelligenceSummarizer, "analyze_batch", tracking)
+    config = {"analysis": {"incremental": True, "theme_count": 2},
+              "performance": {"state_dir": str(tmp_path / "state")}}
+    
+    for run, sources in enumerate([[_source(i) for i in range(10)],
+                                   [_source(i) for i in range(5, 15)]]):
+        path = tmp_path / f"collection_{run}.json"
+        path.write_text(json.dumps({"collection_id": f"c{run}", "sources": sources}))
+        assert analyze_data(str(path), str(tmp_path / f"report_{run}.md"), config)
+    
+    assert analyzed == [10, 5]
+    report = (tmp_path / "report_1.md").read_text(encoding="utf-8")
+    assert "https://example.com/0 " in report
+    assert "https://example.com/14 " in report
+    assert (tmp_path / "state" / "state.sqlite3").exists()
+
+
+def test_incremental_runs_aggregate_collection(tmp_path):
+    """Test that incremental runs still report sentiment, themes and related sources."""
+    pytest.importorskip("numpy")
+    config = {"analysis": {"incremental": True, "theme_count": 2, "sentiment_analysis": True,
+                           "related_sources": True},
+              "performance": {"state_dir": str(tmp_path / "state"), "metrics": False,
+                              "checkpoint": False, "enable_cache": False,
+                              "embedding_dir": str(tmp_path / "embeddings")}}
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps({"collection_id": "c0", "sources": [_source(i) for i in range(10)]}))
+    data, results = run_pipeline(str(path), str(tmp_path / "report.md"), config)
+    
+    assert results["total_sources"] == 10 and len(data["sources"]) == 10
+    assert results["sentiment"] and results["related_sources"]
+    assert sum(len(cluster["sources"]) for cluster in results["theme_clusters"]) == 10
+    # Themes come from the merged state, not the collection alone
+    assert results["themes"] == AnalysisState.load(str(tmp_path / "state")).theme_summaries()
+
+
+def test_failed_sources_return_in_next_delta(tmp_path, monkeypatch):
+    """Test that sources whose prompt failed are not recorded as analyzed."""
+    deltas = []
+    original = IntelligenceSummarizer.analyze_batch
+    
+    def tracking(self, sources, failed=None):
+        deltas.append(len(sources))
+        return original(self, sources, failed)
+    
+    monkeypatch.setattr(IntelligenceSummarizer, "analyze_batch", tracking)
+    path = tmp_path / "collection.json"
+    path.write_text(json.dumps({"collection_id": "c0", "sources": [_source(i) for i in range(3)]}))
+    performance = {"state_dir": str(tmp_path / "state"), "checkpoint": False, "metrics": False}
+    # Nothing listens on the discard port: every prompt fails
+    down = {"analysis": {"incremental": True}, "performance": performance,
+            "model": {"api_url": "http://127.0.0.1:9", "retries": 0, "timeout": 1}}
+    up = {"analysis": {"incremental": True}, "performance": performance}
+    
+    assert analyze_data(str(path), str(tmp_path / "report_0.md"), down)
+    assert AnalysisState.load(str(tmp_path / "state")).to_analysis()["total_sources"] == 0
+    assert analyze_data(str(path), str(tmp_path / "report_1.md"), up)
+    assert deltas == [3, 3]
+    
+    state = AnalysisState.load(str(tmp_path / "state"))
+    state.merge(state.delta([_source(9)]), [{"findings": [], "entities": ["a", "b"]}], "c1")
+    assert state.to_analysis(max_entities=1)["entities"] == ["a"]
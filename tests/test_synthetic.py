@@ -0,0 +1,47 @@
+"""
+Test suite for the synthetic Huginn collection generator.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from muninn.data_loader import HuginDataLoader, load_huginn_data
+from muninn.dedup import deduplicate_sources
+from muninn.synthetic import SyntheticCollection, write_collection
+
+
+def test_generated_collections_load_and_validate(tmp_path):
+    """Test that JSON and JSONL output match the Huginn schema."""
+    write_collection(str(tmp_path / "c.json"), 500, seed=3)
+    write_collection(str(tmp_path / "c.jsonl"), 500, seed=3)
+    
+    loader = HuginDataLoader(str(tmp_path / "c.json"))
+    loader.load()
+    assert loader.validate()
+    assert loader.collection_id == "synthetic_3_500"
+    assert loader.metadata["total_sources"] == 500
+    
+    sources = loader.get_sources()
+    assert sources == load_huginn_data(str(tmp_path / "c.jsonl"))["sources"]
+    assert {s["type"] for s in sources} == {"web", "social"}
+    assert all(s["timestamp"].endswith("Z") and s["content"] for s in sources)
+    assert all(set(s["metadata"]["engagement"]) == {"likes", "retweets", "replies"}
+               for s in sources if s["type"] == "social")
+    web = [len(s["content"]) for s in sources if s["type"] == "web"]
+    social = [len(s["content"]) for s in sources if s["type"] == "social"]
+    assert sum(web) / len(web) > 5 * sum(social) / len(social)
+
+
+def test_generation_is_deterministic_with_duplicates():
+    """Test seeding and the configured duplicate rate."""
+    first = list(SyntheticCollection(600, duplicate_rate=0.2, seed=1))
+    assert first == list(SyntheticCollection(600, duplicate_rate=0.2, seed=1))
+    assert first != list(SyntheticCollection(600, duplicate_rate=0.2, seed=2))
+    
+    unique = deduplicate_sources(first)
+    assert 0.7 * 600 < len(unique) < 0.9 * 600
+    assert len(deduplicate_sources(list(SyntheticCollection(200, duplicate_rate=0.0)))) == 200
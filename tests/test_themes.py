@@ -0,0 +1,71 @@
+"""
+Test suite for Muninn theme identification.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+pytest.importorskip("numpy")
+
+from muninn.summarizer import IntelligenceSummarizer
+from muninn.themes import ThemeEngine, tokenize
+
+TOPICS = {
+    "ransomware": "ransomware encryption extortion payment lockbit decryptor negotiation leak",
+    "phishing": "phishing credential harvesting email lure login spoofed domain",
+    "ddos": "ddos botnet amplification traffic flood mitigation outage",
+}
+
+
+def _sources(count, seed=0):
+    rng = random.Random(seed)
+    sources = []
+    for idx in range(count):
+        topic = list(TOPICS)[idx % len(TOPICS)]
+        words = TOPICS[topic].split()
+        content = " ".join(rng.choice(words) for _ in range(20))
+        sources.append({"type": "web", "content": content, "metadata": {"tags": [topic]}})
+    return sources
+
+
+def test_tokenize_drops_stopwords():
+    """Test tokenization and stopword removal."""
+    assert tokenize("The LockBit ransomware and the DDoS") == ["lockbit", "ransomware", "ddos"]
+
+
+def test_engine_separates_topics():
+    """Test that clearly separated topics land in separate themes."""
+    sources = _sources(300)
+    engine = ThemeEngine(n_themes=3, n_features=1 << 12)
+    themes = engine.fit(sources)
+    
+    assert len(themes) == 3
+    assert sum(theme["size"] for theme in themes) == 300
+    for theme in themes:
+        topics = {sources[i]["metadata"]["tags"][0] for i in theme["sources"]}
+        assert len(topics) == 1
+        assert topics.pop() in theme["terms"]
+
+
+def test_engine_scales():
+    """Test clustering throughput on a larger collection."""
+    sources = _sources(20000)
+    start = time.perf_counter()
+    themes = ThemeEngine(n_themes=6).fit(sources)
+    assert time.perf_counter() - start < 10
+    assert sum(theme["size"] for theme in themes) == 20000
+
+
+def test_summarizer_identify_themes():
+    """Test theme strings returned by the summarizer."""
+    themes = IntelligenceSummarizer({"analysis": {"theme_count": 3}}).identify_themes(_sources(30))
+    assert len(themes) == 3
+    assert all(theme.endswith("(10 sources)") for theme in themes)
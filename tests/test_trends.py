@@ -0,0 +1,130 @@
+"""
+Test suite for Muninn trend aggregation.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+np = pytest.importorskip("numpy")
+
+from muninn.analyze import trend_groups
+from muninn.report_generator import ReportGenerator, sparkline
+from muninn.source_table import SourceTable
+from muninn.trends import TrendEngine, analyze_trends, parse_bucket, parse_timestamps
+
+
+def _sources(hourly_counts, start_hour=0):
+    """One source per count in each consecutive hour of 2025-10-31."""
+    sources = []
+    for hour, count in enumerate(hourly_counts, start_hour):
+        for minute in range(count):
+            sources.append({"type": "social", "content": f"post {hour}:{minute}",
+                            "timestamp": f"2025-10-31T{hour:02d}:{minute % 60:02d}:00Z",
+                            "metadata": {"relevance_score": 0.5,
+                                         "engagement": {"likes": 1, "retweets": 1}}})
+    return sources
+
+
+def test_parse_timestamps():
+    """Test bulk parsing of ISO 8601 forms, offsets and invalid values."""
+    parsed = parse_timestamps(["2025-10-31T12:00:00Z", "2025-10-31T14:00:00+02:00",
+                               "2025-10-31T07:00:00.250-0500", "2025-10-31",
+                               "yesterday", None])
+    assert parsed.dtype == np.dtype("datetime64[s]")
+    assert [str(value) for value in parsed[:4]] == [
+        "2025-10-31T12:00:00", "2025-10-31T12:00:00", "2025-10-31T12:00:00",
+        "2025-10-31T00:00:00"]
+    assert np.isnat(parsed[4]) and np.isnat(parsed[5])
+
+
+def test_parse_timestamps_offsets_and_failures():
+    """Test that long forms survive and a bad value does not affect the others."""
+    parsed = parse_timestamps(["2025-10-31T14:00:00.123456789+02:00", "2025-13-31T14:00:00Z",
+                               "2025-10-31 10:30:00-0130", "2025-10-31T12:00",
+                               "2025-10-31T14:00:00+2:00", "2025-10-31T12:00:00Z"])
+    assert [str(value) for value in parsed] == [
+        "2025-10-31T12:00:00", "NaT", "2025-10-31T12:00:00", "2025-10-31T12:00:00",
+        "NaT", "2025-10-31T12:00:00"]
+
+
+def test_parse_bucket():
+    """Test bucket width specifications."""
+    assert parse_bucket("15m") == 900
+    assert parse_bucket("1h") == 3600
+    assert parse_bucket("2D") == 172800
+    assert parse_bucket(60) == 60
+    with pytest.raises(ValueError):
+        parse_bucket("hourly")
+    with pytest.raises(ValueError):
+        parse_bucket("0h")
+
+
+def test_aggregate_counts_and_groups():
+    """Test per-bucket counts, engagement, relevance and group series."""
+    sources = _sources([2, 0, 3]) + [{"type": "web", "content": "undated"}]
+    groups = {"theme": {"Early": [0, 1], "Late": [2, 3, 4, 5]}}
+    trends = analyze_trends(sources, groups)
+
+    assert trends["sources"] == 5 and trends["undated"] == 1
+    assert trends["bucket_seconds"] == 3600 and trends["buckets"] == 3
+    assert trends["start"] == "2025-10-31T00:00:00Z"
+    assert trends["overall"]["counts"] == [2, 0, 3]
+    assert trends["overall"]["engagement"] == [4.0, 0.0, 6.0]
+    assert trends["overall"]["relevance"] == [0.5, None, 0.5]
+    series = {item["name"]: item for item in trends["series"]}
+    assert series["Early"]["counts"] == [2, 0, 0]
+    # The undated member (position 5) is not counted
+    assert series["Late"]["counts"] == [0, 0, 3]
+    assert series["Late"]["peak_bucket"] == "2025-10-31T02:00:00Z"
+
+
+def test_spike_detection():
+    """Test that a burst over a flat baseline is reported as a spike."""
+    trends = TrendEngine(bucket="1h", window=4, threshold=3.0, min_count=3).analyze(
+        _sources([2, 2, 2, 2, 2, 2, 20, 2]))
+    assert [(spike["bucket"], spike["count"]) for spike in trends["spikes"]] == [
+        ("2025-10-31T06:00:00Z", 20)]
+    assert trends["spikes"][0]["baseline"] == 2.0
+
+    # Steady activity has no spikes
+    assert TrendEngine(window=4).analyze(_sources([5] * 8))["spikes"] == []
+
+
+def test_source_table_matches_dicts():
+    """Test that the columnar path aggregates like the dictionary path."""
+    sources = _sources([1, 4, 0, 2])
+    table = SourceTable(sources)
+    assert analyze_trends(table) == analyze_trends(sources)
+
+
+def test_trend_groups_maps_prioritized_positions():
+    """Test that theme members are mapped back to positions among all sources."""
+    clusters = [{"name": "Ransomware", "sources": [0, 2]}]
+    top = [{"value": "203.0.113.7", "kind": "ipv4"}]
+    extracted = [[], [("ipv4", "203.0.113.7", 1)], [("domain", "example.net", 1)],
+                 [("ipv4", "203.0.113.7", 2)]]
+    groups = trend_groups(clusters, [1, 3, 5], top, extracted)
+    assert groups == {"theme": {"Ransomware": [1, 5]}, "entity": {"203.0.113.7": [1, 3]}}
+    assert trend_groups(clusters, None, [], [])["theme"] == {"Ransomware": [0, 2]}
+
+
+def test_trends_report_section():
+    """Test the rendered Trends section and its sparkline."""
+    trends = TrendEngine(window=4).analyze(_sources([2, 2, 2, 2, 2, 20]),
+                                           {"entity": {"203.0.113.7": [0, 1, 2]}})
+    generator = ReportGenerator({"include_trends": True})
+    section = generator._generate_trends({"trends": trends})
+    assert section.startswith("## Trends")
+    assert "Sources per 1h bucket from 2025-10-31T00:00:00Z" in section
+    assert "| 203.0.113.7 | entity | 3 |" in section
+    assert "- All sources (all): 20 sources at 2025-10-31T05:00:00Z" in section
+    assert "No timestamped sources" in generator._generate_trends({"trends": {"overall": None}})
+
+    assert sparkline([0, 1, 7]) == "▁▂█"
+    assert len(sparkline(list(range(500)), width=50)) == 50